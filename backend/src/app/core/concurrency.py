@@ -5,7 +5,8 @@
 from __future__ import annotations
 
 import os
-from typing import Dict
+import sys
+from typing import Any, Callable, Dict, List, Sequence
 
 
 def _int_env(name: str, default: int) -> int:
@@ -104,6 +105,31 @@ def get_concurrency_config(high_performance: bool = False) -> Dict:
     }
 
 
+def map_cpu_bound(func: Callable[[Any], Any], items: Sequence[Any], chunksize: int = 1) -> List[Any]:
+    """
+    对互不依赖的纯CPU任务逐项调用 func，返回与输入顺序一致的结果
+
+    自由线程构建（无GIL）下使用线程池；开启 GLOBAL_ENABLE_PROCESS_POOL 时使用进程池绕开GIL
+    （func 与各项须可 pickle，即模块级函数）；否则以及任务少于两个时在当前线程依次执行。
+    """
+    if len(items) < 2:
+        return [func(item) for item in items]
+
+    import concurrent.futures as _f
+
+    global_config = _build_base_config()["global"]
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        executor_cls = _f.ThreadPoolExecutor
+    elif global_config.get("enable_process_pool", False):
+        executor_cls = _f.ProcessPoolExecutor
+    else:
+        return [func(item) for item in items]
+
+    max_workers = min(len(items), global_config.get("process_pool_workers", 4))
+    with executor_cls(max_workers=max_workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
 # 兼容现有用法（对象风格访问）
 _default = _CC(_build_base_config())
 _high = _CC(_build_base_config())
@@ -1,11 +1,21 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 
+logger = logging.getLogger(__name__)
+
 
 def register_lifecycle(app: FastAPI) -> None:
     @app.on_event("startup")
     async def on_startup() -> None:  # noqa: F811
-        # 预留：连接 Neo4j / 校验配置
-        return None
+        # 预热工作流注册中心：导入模块并编译各工作流图，首个请求无需承担编译开销
+        try:
+            from ..domain.workflows.registry import workflow_registry
+
+            await asyncio.to_thread(workflow_registry.warmup)
+        except Exception as e:
+            logger.warning(f"工作流预热失败: {e}")
 
     @app.on_event("shutdown")
     async def on_shutdown() -> None:  # noqa: F811
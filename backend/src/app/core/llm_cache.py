@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""LLM 响应缓存：按请求内容的 SHA-256 持久化到本地 SQLite，重复运行相同提示词时跳过调用。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 提示词模板或响应解析方式不兼容地变化时递增，使旧缓存整体失效
+PROMPT_VERSION = "1"
+
+_DEFAULT_TTL = 7 * 86400
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def request_hash(payload: Dict[str, Any]) -> str:
+    """请求内容（模型、消息、采样参数等）的稳定哈希"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """线程安全的 SQLite 响应缓存；数据库不可用时各操作退化为未命中/不写入"""
+
+    def __init__(self, path: str, ttl: int = _DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "input_hash TEXT NOT NULL, prompt_version TEXT NOT NULL, response TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (input_hash, prompt_version))"
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def check(self, input_hash: str, prompt_version: str = PROMPT_VERSION) -> Optional[str]:
+        """返回未过期的缓存响应；不存在时返回 None"""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT response FROM llm_cache WHERE input_hash = ? AND prompt_version = ? AND expires_at > ?",
+                    (input_hash, prompt_version, time.time()),
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"读取LLM缓存失败: {e}")
+            return None
+        return row[0] if row else None
+
+    def save(self, input_hash: str, prompt_version: str, response: str, ttl: Optional[int] = None) -> None:
+        """写入（覆盖）缓存响应"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (input_hash, prompt_version, response, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (input_hash, prompt_version, response, expires_at),
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"写入LLM缓存失败: {e}")
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    进程内共享的响应缓存；未开启时返回 None
+
+    通过 LLM_CACHE_ENABLED=true 开启（默认关闭：采样输出被缓存后，重新生成会得到相同结果）；
+    LLM_CACHE_PATH 指定数据库文件（默认位于输出目录下），LLM_CACHE_TTL 为过期秒数。
+    """
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "false").lower() != "true":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = os.getenv("LLM_CACHE_PATH")
+                if not path:
+                    from .settings import get_settings
+                    path = os.path.join(get_settings().output_dir, ".llm_cache.sqlite3")
+                _cache = LLMResponseCache(path, _int_env("LLM_CACHE_TTL", _DEFAULT_TTL))
+    return _cache
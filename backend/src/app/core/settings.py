@@ -41,6 +41,15 @@ class Neo4jSettings(BaseModel):
     user: Optional[str] = None
     password: Optional[str] = None
     database: Optional[str] = None
+    pool_size: int = 50
+    acq_timeout: float = 60.0
+    retry_time: float = 15.0
+    # 是否加密连接；None 时由 URI 协议决定（neo4j+s:// 等协议不能再显式指定）
+    tls: Optional[bool] = None
+    liveness_timeout: Optional[float] = 10.0
+    # KG 读接口进程级结果缓存；默认关闭，只有写入全部经过 KG 存储层（写后统一失效）时才应开启
+    read_cache_size: int = 0
+    read_cache_ttl: float = 300.0
 
 
 class AppSettings(BaseSettings):
@@ -90,6 +99,13 @@ def _merge_env_overrides(base: Dict[str, Any]) -> Dict[str, Any]:
         "user": os.getenv("NEO4J_USER"),
         "password": os.getenv("NEO4J_PASSWORD"),
         "database": os.getenv("NEO4J_DATABASE"),
+        "pool_size": os.getenv("NEO4J_POOL_SIZE"),
+        "acq_timeout": os.getenv("NEO4J_ACQ_TIMEOUT"),
+        "retry_time": os.getenv("NEO4J_RETRY_TIME"),
+        "tls": os.getenv("NEO4J_TLS"),
+        "liveness_timeout": os.getenv("NEO4J_LIVENESS_TIMEOUT"),
+        "read_cache_size": os.getenv("NEO4J_READ_CACHE_SIZE"),
+        "read_cache_ttl": os.getenv("NEO4J_READ_CACHE_TTL"),
     }
     if any(v for v in neo4j_env.values()):
         merged.setdefault("neo4j", {})
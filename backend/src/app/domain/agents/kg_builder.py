@@ -89,8 +89,9 @@ class KGBuilder:
                 # 收集存储统计信息
                 store_stats = pipeline_output.store_stats
                 if store_stats.get("success"):
-                    nodes_count = store_stats.get("nodes_created", 0) + store_stats.get("nodes_updated", 0)
-                    edges_count = store_stats.get("edges_created", 0) + store_stats.get("edges_updated", 0)
+                    # 大批量并行写入只报告已提交数（*_committed），不区分新建/更新
+                    nodes_count = store_stats.get("nodes_created", 0) + store_stats.get("nodes_updated", 0) + store_stats.get("nodes_committed", 0)
+                    edges_count = store_stats.get("edges_created", 0) + store_stats.get("edges_updated", 0) + store_stats.get("edges_committed", 0)
                     total_nodes_processed += nodes_count
                     total_edges_processed += edges_count
                     all_section_ids.append(pipeline_output.section_id)
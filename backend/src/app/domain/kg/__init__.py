@@ -1,4 +1,4 @@
-from .schemas import KGPipelineInput, KGPipelineOutput, KGInsights, KGDict, NodeDict, EdgeDict
+from .schemas import KGPipelineInput, KGPipelineOutput, KGInsights, KGDict, LegacyKGDict, NodeDict, EdgeDict
 from .ids import (
     generate_section_id,
     generate_content_hash,
@@ -19,6 +19,7 @@ __all__ = [
     "KGPipelineOutput",
     "KGInsights",
     "KGDict",
+    "LegacyKGDict",
     "NodeDict",
     "EdgeDict",
     "generate_section_id",
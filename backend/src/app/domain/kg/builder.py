@@ -5,17 +5,29 @@ KG Builder - LLM抽取 → JSON Schema
 工程化分层设计中的第一层：从文本内容抽取结构化知识图谱
 """
 
+import hashlib
 import logging
 from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 
 from .schemas import KGNode, KGEdge, KGDict
+from .ids import slug
 from ...services.llm_service import LLMService
 
 
 logger = logging.getLogger(__name__)
 
 
+def _section_hash_suffix(topic: str, chapter_title: str, subchapter_title: str) -> str:
+    content = f"{topic}|{chapter_title}|{subchapter_title}"
+    return hashlib.md5(content.encode("utf-8")).hexdigest()[:6]
+
+
+def _concept_id(name: str, hash_suffix: str) -> str:
+    return f"concept:{slug(name)}:{hash_suffix}"
+
+
 class BaseKGBuilder(ABC):
     """KG构建器基类，支持不同的构建策略"""
     
@@ -74,77 +86,67 @@ class LLMKGBuilder(BaseKGBuilder):
     
     def _parse_llm_output(self, raw_content: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """解析LLM输出的知识图谱内容"""
-        import re
-        import hashlib
-        from datetime import datetime
-        
-        current_time = datetime.utcnow().isoformat()
+        current_time = datetime.now(timezone.utc).isoformat(timespec="seconds")
         topic = context.get("topic", "")
         chapter_title = context.get("chapter_title", "")
         subchapter_title = context.get("subchapter_title", "")
+        # 同一小节内所有概念共享同一哈希后缀，只计算一次
+        hash_suffix = _section_hash_suffix(topic, chapter_title, subchapter_title)
         
-        def _slug(text: str) -> str:
-            cleaned = re.sub(r"[^\w\u4e00-\u9fff]+", "_", text)
-            return cleaned.strip("_").lower()
-        
-        def _generate_concept_id(name: str) -> str:
-            slug_name = _slug(name)
-            content = f"{topic}|{chapter_title}|{subchapter_title}"
-            hash_suffix = hashlib.md5(content.encode("utf-8")).hexdigest()[:6]
-            return f"concept:{slug_name}:{hash_suffix}"
-        
-        nodes = []
-        edges = []
+        nodes: List[Dict[str, Any]] = []
+        edges: List[Dict[str, Any]] = []
         
-        # 解析节点
+        # 解析节点：先筛出有效行，按行数预分配结果列表
+        # partition 只切出所需片段，不像 split 那样为整段响应的每个分段都分配子串
         if "### 节点" in raw_content:
-            nodes_section = raw_content.split("### 节点")[1].split("###")[0]
-            for line in nodes_section.split("\n"):
-                if line.strip().startswith("- "):
-                    node_text = line.strip()[2:]
-                    if ":" in node_text:
-                        node_name, node_desc = node_text.split(":", 1)
-                        node_name = node_name.strip()
-                        node_desc = node_desc.strip()
-                        nodes.append({
-                            "id": _generate_concept_id(node_name),
-                            "type": "concept",
-                            "name": node_name,
-                            "desc": node_desc,
-                            "aliases": [],
-                            "chapter": chapter_title,
-                            "subchapter": subchapter_title,
-                            "created_at": current_time,
-                        })
+            nodes_section = raw_content.partition("### 节点")[2].partition("###")[0]
+            node_texts = [
+                stripped[2:] for stripped in (line.strip() for line in nodes_section.split("\n"))
+                if stripped.startswith("- ") and ":" in stripped[2:]
+            ]
+            nodes = [None] * len(node_texts)
+            for i, node_text in enumerate(node_texts):
+                node_name, node_desc = node_text.split(":", 1)
+                node_name = node_name.strip()
+                nodes[i] = {
+                    "id": _concept_id(node_name, hash_suffix),
+                    "type": "concept",
+                    "name": node_name,
+                    "desc": node_desc.strip(),
+                    "aliases": [],
+                    "chapter": chapter_title,
+                    "subchapter": subchapter_title,
+                    "created_at": current_time,
+                }
         
         # 解析边
         if "### 关系" in raw_content:
-            edges_section = raw_content.split("### 关系")[1].split("###")[0]
-            for line in edges_section.split("\n"):
-                if line.strip().startswith("- ") and "->" in line and ":" in line:
-                    edge_parts, edge_type = line.strip()[2:].split(":", 1)
-                    source_name, target_name = edge_parts.split("->", 1)
-                    source_name = source_name.strip()
-                    target_name = target_name.strip()
-                    edge_type = edge_type.strip()
-                    
-                    source_id = _generate_concept_id(source_name)
-                    target_id = _generate_concept_id(target_name)
-                    
-                    edges.append({
-                        "source": source_id,
-                        "target": target_id,
-                        "type": edge_type.upper(),
-                        "desc": f"从文本中抽取的关系: {source_name} -> {target_name}",
-                        "confidence": 0.8,
-                        "weight": 1.0,
-                        "created_at": current_time,
-                    })
+            edges_section = raw_content.partition("### 关系")[2].partition("###")[0]
+            edge_lines = [
+                stripped for stripped in (line.strip() for line in edges_section.split("\n"))
+                if stripped.startswith("- ") and "->" in stripped and ":" in stripped
+            ]
+            edges = [None] * len(edge_lines)
+            for i, line in enumerate(edge_lines):
+                edge_parts, edge_type = line[2:].split(":", 1)
+                source_name, target_name = edge_parts.split("->", 1)
+                source_name = source_name.strip()
+                target_name = target_name.strip()
+                
+                edges[i] = {
+                    "source": _concept_id(source_name, hash_suffix),
+                    "target": _concept_id(target_name, hash_suffix),
+                    "type": edge_type.strip().upper(),
+                    "desc": f"从文本中抽取的关系: {source_name} -> {target_name}",
+                    "confidence": 0.8,
+                    "weight": 1.0,
+                    "created_at": current_time,
+                }
         
         # 解析层次结构
         hierarchy = ""
         if "### 层次结构" in raw_content:
-            hierarchy_section = raw_content.split("### 层次结构")[1]
+            hierarchy_section = raw_content.partition("### 层次结构")[2].partition("### 层次结构")[0]
             hierarchy = hierarchy_section.strip()
         
         return {
@@ -156,74 +158,75 @@ class LLMKGBuilder(BaseKGBuilder):
     
     def _convert_to_standard_format(self, raw_kg: Dict[str, Any], context: Dict[str, Any]) -> KGDict:
         """将原始KG数据转换为标准格式"""
+        if not isinstance(raw_kg, dict):
+            self.logger.error(f"KG格式转换失败: 非法的原始KG类型 {type(raw_kg).__name__}")
+            raise TypeError(f"raw_kg must be a dict, got {type(raw_kg).__name__}")
+        
+        scope = context.get("scope") or context.get("topic", "")
+        section_id = context.get("section_id", "")
+        nodes = []
+        edges = []
+        
+        # 转换节点
+        for node_data in raw_kg.get("nodes", []):
+            if not isinstance(node_data, dict):
+                continue
+            created_at = self._parse_timestamp(node_data.get("created_at"))
+            nodes.append(KGNode(
+                id=str(node_data.get("id", "")),
+                name=str(node_data.get("name", "")),
+                type=str(node_data.get("type", "Concept")),
+                desc=str(node_data.get("desc", "")),
+                aliases=node_data.get("aliases", []),
+                scope=scope,
+                created_at=created_at,
+                updated_at=created_at
+            ))
+        
+        # 转换边
+        for edge_data in raw_kg.get("edges", []):
+            if not isinstance(edge_data, dict):
+                continue
+            edges.append(KGEdge(
+                rid="",  # 将在idempotent步骤中生成
+                type=str(edge_data.get("type", "RELATED_TO")),
+                source=str(edge_data.get("source", "")),
+                target=str(edge_data.get("target", "")),
+                desc=str(edge_data.get("desc", "")),
+                confidence=self._to_float(edge_data.get("confidence"), 0.8),
+                weight=self._to_float(edge_data.get("weight"), 1.0),
+                scope=scope,
+                src_section=section_id,
+                created_at=self._parse_timestamp(edge_data.get("created_at"))
+            ))
+        
+        return KGDict(
+            nodes=nodes,
+            edges=edges,
+            hierarchy=raw_kg.get("hierarchy", ""),
+            total_nodes=len(nodes),
+            total_edges=len(edges),
+            chapters_covered=[context.get("chapter_title", "")]
+        )
+    
+    def _parse_timestamp(self, value: Any) -> Optional[datetime]:
+        """解析ISO时间戳，无法解析时回退为当前时间"""
+        if not value:
+            return None
         try:
-            from datetime import datetime
-            
-            nodes = []
-            edges = []
-            
-            # 转换节点
-            raw_nodes = raw_kg.get("nodes", [])
-            for node_data in raw_nodes:
-                if isinstance(node_data, dict):
-                    # 处理时间戳
-                    created_at = None
-                    if node_data.get("created_at"):
-                        try:
-                            created_at = datetime.fromisoformat(node_data["created_at"].replace('Z', '+00:00'))
-                        except:
-                            created_at = datetime.utcnow()
-                    
-                    node = KGNode(
-                        id=str(node_data.get("id", "")),
-                        name=str(node_data.get("name", "")),
-                        type=str(node_data.get("type", "Concept")),
-                        desc=str(node_data.get("desc", "")),
-                        aliases=node_data.get("aliases", []),
-                        scope=context.get("scope") or context.get("topic", ""),
-                        created_at=created_at,
-                        updated_at=created_at
-                    )
-                    nodes.append(node)
-            
-            # 转换边
-            raw_edges = raw_kg.get("edges", [])
-            for edge_data in raw_edges:
-                if isinstance(edge_data, dict):
-                    # 处理时间戳
-                    created_at = None
-                    if edge_data.get("created_at"):
-                        try:
-                            created_at = datetime.fromisoformat(edge_data["created_at"].replace('Z', '+00:00'))
-                        except:
-                            created_at = datetime.utcnow()
-                    
-                    edge = KGEdge(
-                        rid="",  # 将在idempotent步骤中生成
-                        type=str(edge_data.get("type", "RELATED_TO")),
-                        source=str(edge_data.get("source", "")),
-                        target=str(edge_data.get("target", "")),
-                        desc=str(edge_data.get("desc", "")),
-                        confidence=float(edge_data.get("confidence", 0.8)),
-                        weight=float(edge_data.get("weight", 1.0)),
-                        scope=context.get("scope") or context.get("topic", ""),
-                        src_section=context.get("section_id", ""),
-                        created_at=created_at
-                    )
-                    edges.append(edge)
-            
-            return KGDict(
-                nodes=nodes,
-                edges=edges,
-                hierarchy=raw_kg.get("hierarchy", ""),
-                total_nodes=len(nodes),
-                total_edges=len(edges),
-                chapters_covered=[context.get("chapter_title", "")]
-            )
-            
-        except Exception as e:
-            self.logger.error(f"KG格式转换失败: {e}")
-            return self._create_empty_kg()
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return datetime.now(timezone.utc).replace(microsecond=0)
+    
+    def _to_float(self, value: Any, default: float) -> float:
+        """将LLM输出的数值字段转换为float，非法输入回退为默认值"""
+        if value is None:
+            return default
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            self.logger.warning(f"非法数值 {value!r}，使用默认值 {default}")
+            return default
     
     def _create_empty_kg(self) -> KGDict:
         """创建空的KG结构"""
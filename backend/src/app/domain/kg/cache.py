@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KG 读缓存的失效钩子与请求级缓存
+
+查询服务在启用缓存时登记自身；存储层写入后调用 clear_kg_read_cache 统一失效，两层之间无需互相引用。
+"""
+
+import contextlib
+import contextvars
+import weakref
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# 所有启用缓存的服务实例（需提供 clear_cache()）；任一写入发生时统一失效
+_caching_services: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+# 请求级读缓存：同一请求内重复的子图展开/详情查询直接复用，请求结束即丢弃；未进入请求作用域时为 None
+request_cache: "contextvars.ContextVar[Optional[Dict[Tuple[Any, ...], Any]]]" = contextvars.ContextVar(
+    "kg_traversal_cache", default=None
+)
+
+
+def register_caching_service(service: Any) -> None:
+    """登记启用了进程级读缓存的服务实例（弱引用，实例回收后自动移除）"""
+    _caching_services.add(service)
+
+
+@contextlib.contextmanager
+def kg_request_scope() -> Iterator[None]:
+    """
+    为当前上下文开启请求级读缓存（由 HTTP 中间件在每个请求外层进入）
+
+    作用域内的读结果在请求内保持一致，不受进程级缓存过期或容量淘汰影响；
+    作用域结束后缓存随之丢弃，不会跨请求产生陈旧数据。
+    """
+    token = request_cache.set({})
+    try:
+        yield
+    finally:
+        request_cache.reset(token)
+
+
+def clear_kg_read_cache() -> None:
+    """清空所有 KG 服务实例的读缓存以及当前请求的请求级缓存；KG 写入后由存储层调用"""
+    for service in list(_caching_services):
+        service.clear_cache()
+    local = request_cache.get()
+    if local:
+        local.clear()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KG 共用的 Cypher 定义：节点标签、约束/索引DDL 与 APOC 探测语句
+
+存储层（store）与查询服务层（service）均依赖这些定义，放在独立模块中，两层之间无需互相引用内部名称。
+"""
+
+import re
+from typing import List, Tuple
+
+# 带唯一约束的节点标签；约束与按标签特化的写入语句均由此生成
+NODE_LABELS = ("Concept", "Chunk", "Chapter", "Subchapter", "Method", "Example", "Dataset", "Equation", "Doc")
+
+# Neo4jClient.merge_node 写入的旧版标签；没有约束，但同样需要被名称搜索覆盖
+LEGACY_NODE_LABELS = ("ConceptNode", "ChapterNode", "SubchapterNode", "Node")
+
+# 探测 APOC 过程是否可用：先用 Neo4j 4.3+/5 的 SHOW PROCEDURES，失败再用旧版 dbms.procedures()
+APOC_PROBE_QUERIES = (
+    "SHOW PROCEDURES YIELD name WHERE name = $name RETURN name",
+    "CALL dbms.procedures() YIELD name WHERE name = $name RETURN name",
+)
+
+
+def kg_index_statements() -> List[str]:
+    """
+    节点约束与索引DDL：按标签生成（Neo4j 的属性索引必须指定标签）
+
+    id 唯一约束自带索引；另建 scope、name、name_lc 与 (scope, id) 组合索引，以及覆盖全部标签（含旧版标签）的名称/别名全文索引（供 search_nodes 使用）。
+    """
+    statements = []
+    for label in NODE_LABELS:
+        prefix = label.lower()
+        statements.extend([
+            f"CREATE CONSTRAINT {prefix}_id IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE",
+            f"CREATE INDEX {prefix}_scope IF NOT EXISTS FOR (n:{label}) ON (n.scope)",
+            f"CREATE INDEX {prefix}_name IF NOT EXISTS FOR (n:{label}) ON (n.name)",
+            f"CREATE INDEX {prefix}_name_lc IF NOT EXISTS FOR (n:{label}) ON (n.name_lc)",
+            f"CREATE INDEX {prefix}_scope_id IF NOT EXISTS FOR (n:{label}) ON (n.scope, n.id)",
+        ])
+    statements.append(
+        f"CREATE FULLTEXT INDEX node_name_fts IF NOT EXISTS "
+        f"FOR (n:{'|'.join(NODE_LABELS + LEGACY_NODE_LABELS)}) ON EACH [n.name, n.aliases]"
+    )
+    return statements
+
+
+SCHEMA_NAME_PATTERN = re.compile(r"CREATE (?:FULLTEXT )?(?:CONSTRAINT|INDEX) (\w+)")
+
+# (约束/索引名, DDL)，启动时按名称比对服务端已有的 schema，只执行缺失项
+KG_SCHEMA_STATEMENTS: Tuple[Tuple[str, str], ...] = tuple(
+    (SCHEMA_NAME_PATTERN.match(statement).group(1), statement) for statement in kg_index_statements()
+)
+
+SHOW_SCHEMA_QUERIES = (
+    "SHOW CONSTRAINTS YIELD name RETURN name",
+    # 仍在填充中的索引不算就绪，热启动时按缺失处理并等待其上线
+    "SHOW INDEXES YIELD name, state WHERE state = 'ONLINE' RETURN name",
+)
@@ -8,8 +8,8 @@ KG Idempotent - 幂等ID生成与查重
 import hashlib
 import logging
 import time
-from typing import Dict, Any, List, Set
-from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from datetime import datetime, timezone
 
 from .schemas import KGNode, KGEdge, KGDict
 
@@ -35,93 +35,96 @@ class KGIdempotentProcessor:
             KGDict: 处理后的KG数据，包含幂等ID
         """
         try:
-            current_time = datetime.utcnow()
+            assign_id, assign_rid = self.stages(context)
+            return kg_data.transform([assign_id], [assign_rid])
             
-            # 处理节点
-            processed_nodes = []
-            node_id_map = {}  # 原始ID -> 幂等ID映射
+        except Exception as e:
+            self.logger.error(f"KG幂等性处理失败: {e}")
+            return kg_data  # 返回原始数据
+    
+    def stages(self, context: Dict[str, Any]) -> Tuple[Callable[[KGNode], KGNode], Callable[[KGEdge], Optional[KGEdge]]]:
+        """
+        生成单个KG的逐项幂等处理函数 (assign_id, assign_rid)，供 KGDict.transform 使用
+        
+        两个函数共享本KG的原始ID -> 幂等ID映射与边去重指纹，每个KG需重新生成；
+        assign_rid 须在所有节点经过 assign_id 之后调用。
+        """
+        # 与标准化阶段一致：带 UTC 时区、精确到秒
+        current_time = datetime.now(timezone.utc).replace(microsecond=0)
+        scope = context.get("scope", "")
+        section_id = context.get("section_id", "")
+        node_id_map: Dict[str, str] = {}  # 原始ID -> 幂等ID映射
+        valid_ids: Set[str] = set()
+        edge_fingerprints: Set[Tuple[str, str, str]] = set()  # 用于去重
+        
+        def assign_id(node: KGNode) -> KGNode:
+            # 生成幂等节点ID
+            canonical_name = self._canonicalize_name(node.name)
+            node_id = self._generate_node_id(canonical_name, node.type, scope)
+            node_id_map[node.id] = node_id
+            
+            return KGNode(
+                id=node_id,
+                name=canonical_name,
+                type=node.type,
+                desc=node.desc,
+                aliases=self._deduplicate_aliases(node.aliases, canonical_name),
+                scope=context.get("scope", node.scope),
+                created_at=current_time,
+                updated_at=current_time
+            )
+        
+        def assign_rid(edge: KGEdge) -> Optional[KGEdge]:
+            # 有效ID集合在第一条边时从最终映射一次性构建（同ID节点会覆盖映射），避免逐边线性扫描 values()
+            if not valid_ids:
+                valid_ids.update(node_id_map.values())
             
-            for node in kg_data.nodes:
-                # 生成幂等节点ID
-                canonical_name = self._canonicalize_name(node.name)
-                node_id = self._generate_node_id(canonical_name, node.type, context.get("scope", ""))
-                
-                # 创建新的节点对象
-                processed_node = KGNode(
-                    id=node_id,
-                    name=canonical_name,
-                    type=node.type,
-                    desc=node.desc,
-                    aliases=self._deduplicate_aliases(node.aliases, canonical_name),
-                    scope=context.get("scope", node.scope),
-                    created_at=current_time,
-                    updated_at=current_time
-                )
-                
-                processed_nodes.append(processed_node)
-                node_id_map[node.id] = node_id
+            # 映射源和目标节点ID
+            source_id = node_id_map.get(edge.source, edge.source)
+            target_id = node_id_map.get(edge.target, edge.target)
             
-            # 处理边
-            processed_edges = []
-            edge_fingerprints = set()  # 用于去重
+            # 跳过无效的边（节点不存在）
+            if source_id not in valid_ids or target_id not in valid_ids:
+                self.logger.warning(f"跳过无效边: {edge.source} -> {edge.target}")
+                return None
             
-            for edge in kg_data.edges:
-                # 映射源和目标节点ID
-                source_id = node_id_map.get(edge.source, edge.source)
-                target_id = node_id_map.get(edge.target, edge.target)
-                
-                # 跳过无效的边（节点不存在）
-                if source_id not in node_id_map.values() or target_id not in node_id_map.values():
-                    self.logger.warning(f"跳过无效边: {edge.source} -> {edge.target}")
-                    continue
-                
-                # 生成关系ID
-                rid = self._generate_relation_id(
-                    source_id, 
-                    target_id, 
-                    edge.type, 
-                    context.get("scope", ""),
-                    edge.desc
-                )
-                
-                # 创建边的指纹用于去重
-                edge_fingerprint = f"{source_id}|{target_id}|{edge.type}|{context.get('scope', '')}"
-                
-                if edge_fingerprint in edge_fingerprints:
-                    self.logger.debug(f"跳过重复边: {edge_fingerprint}")
-                    continue
-                
-                edge_fingerprints.add(edge_fingerprint)
-                
-                # 创建新的边对象
-                processed_edge = KGEdge(
-                    rid=rid,
-                    type=edge.type,
-                    source=source_id,
-                    target=target_id,
-                    desc=edge.desc,
-                    confidence=edge.confidence,
-                    weight=edge.weight,
-                    scope=context.get("scope", edge.scope),
-                    src_section=context.get("section_id", ""),
-                    created_at=current_time
-                )
-                
-                processed_edges.append(processed_edge)
+            # 同一KG内 scope 固定，指纹只需端点与类型
+            edge_fingerprint = (source_id, target_id, edge.type)
+            if edge_fingerprint in edge_fingerprints:
+                self.logger.debug(f"跳过重复边: {source_id}|{target_id}|{edge.type}|{scope}")
+                return None
+            edge_fingerprints.add(edge_fingerprint)
             
-            # 返回处理后的KG数据
-            return KGDict(
-                nodes=processed_nodes,
-                edges=processed_edges,
-                hierarchy=kg_data.hierarchy,
-                total_nodes=len(processed_nodes),
-                total_edges=len(processed_edges),
-                chapters_covered=kg_data.chapters_covered
+            return KGEdge(
+                rid=self._generate_relation_id(source_id, target_id, edge.type, scope, edge.desc),
+                type=edge.type,
+                source=source_id,
+                target=target_id,
+                desc=edge.desc,
+                confidence=edge.confidence,
+                weight=edge.weight,
+                scope=context.get("scope", edge.scope),
+                src_section=section_id,
+                created_at=current_time
             )
+        
+        return assign_id, assign_rid
+    
+    def process_kg_batch(self, items: List[Tuple[KGDict, Dict[str, Any]]]) -> List[KGDict]:
+        """
+        批量对多个小节的KG进行幂等性处理
+        
+        各小节互不依赖且为纯CPU计算（哈希+字符串标准化），启用进程池时
+        并行处理以绕开GIL；自由线程构建（无GIL）下改用线程池。
+        
+        Args:
+            items: [(kg_data, context), ...] 小节KG及其上下文
             
-        except Exception as e:
-            self.logger.error(f"KG幂等性处理失败: {e}")
-            return kg_data  # 返回原始数据
+        Returns:
+            List[KGDict]: 与输入顺序一致的处理结果
+        """
+        from ...core.concurrency import map_cpu_bound
+        return map_cpu_bound(_process_one, items)
     
     def _canonicalize_name(self, name: str) -> str:
         """标准化名称"""
@@ -220,6 +223,12 @@ class KGIdempotentProcessor:
         return sorted(list(unique_aliases))
 
 
+def _process_one(item: Tuple[KGDict, Dict[str, Any]]) -> KGDict:
+    """进程池工作函数：需为模块级函数以便pickle"""
+    kg_data, context = item
+    return KGIdempotentProcessor().process_kg(kg_data, context)
+
+
 def generate_content_hash(content: str) -> str:
     """生成内容哈希（保持与现有系统兼容）"""
     if not content:
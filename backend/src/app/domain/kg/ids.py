@@ -6,7 +6,7 @@ KG ID 生成与规范化工具（域层）
 
 import hashlib
 import re
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 
 
 def generate_section_id(topic: str, chapter: str, subchapter: str) -> str:
@@ -14,13 +14,31 @@ def generate_section_id(topic: str, chapter: str, subchapter: str) -> str:
     return hashlib.md5(content.encode('utf-8')).hexdigest()[:12]
 
 
-def generate_content_hash(content: str) -> str:
-    normalized = re.sub(r'\s+', ' ', content.strip())
-    return hashlib.md5(normalized.encode('utf-8')).hexdigest()[:12]
+def generate_content_hash(content: Union[str, bytes]) -> str:
+    """
+    生成小节内容指纹（12位十六进制），空白差异不影响结果。
+    
+    内容哈希只用于进程内的变更检测、不落库，因此使用 blake2b 而非 md5；
+    digest_size=6 保持原有12位长度。也可传入 UTF-8 bytes，先解码再按与 str
+    相同的规则折叠空白，同一内容的两种形式得到相同指纹。
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    data = ' '.join(content.split()).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=6).hexdigest()
+
+
+_SLUG_RE = re.compile(r'[^\w\u4e00-\u9fff]+')
+# ASCII 快速路径：非单词字符映射为空格，再由 split/join 折叠为单个下划线，
+# 与 _SLUG_RE 的 "连续非单词字符 -> '_'" 语义一致
+_ASCII_SLUG_TABLE = {i: ' ' for i in range(128) if not (chr(i).isalnum() or chr(i) == '_')}
 
 
 def slug(text: str) -> str:
-    cleaned = re.sub(r'[^\w\u4e00-\u9fff]+', '_', text)
+    if text.isascii():
+        cleaned = '_'.join(text.translate(_ASCII_SLUG_TABLE).split())
+    else:
+        cleaned = _SLUG_RE.sub('_', text)
     return cleaned.strip('_').lower()
 
 
@@ -77,3 +95,21 @@ def generate_relation_rid(edge_type: str, source_id: str, target_id: str, scope:
     raw = f"{edge_type}|{source_id}|{target_id}|{scope}"
     return hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]
 
+
+def generate_relation_rids_bulk(edges: List[Dict[str, Any]], scope: str) -> List[str]:
+    """
+    批量生成一组边的关系唯一标识符，结果与逐条调用 generate_relation_rid 完全一致。
+    
+    Args:
+        edges: 边字典列表（读取 type/source_id/target_id）
+        scope: 范围标识
+        
+    Returns:
+        与 edges 顺序一致的rid列表
+    """
+    md5 = hashlib.md5
+    suffix = f"|{scope}"
+    return [
+        md5(f"{e.get('type', '')}|{e.get('source_id', '')}|{e.get('target_id', '')}{suffix}".encode("utf-8")).hexdigest()[:16]
+        for e in edges
+    ]
@@ -4,8 +4,11 @@
 域层 KG 合并器，实现展示用合并与去重
 """
 
+import hashlib
 import logging
-from typing import Dict, List, Any
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Tuple
 
 
 logger = logging.getLogger(__name__)
@@ -19,17 +22,11 @@ class KGMerger:
         try:
             if not kg_list:
                 return {"nodes": [], "edges": [], "hierarchy": "", "total_nodes": 0, "total_edges": 0, "chapters_covered": []}
-            all_nodes: List[Dict[str, Any]] = []
-            all_edges: List[Dict[str, Any]] = []
-            all_chapters: set[str] = set()
-            for kg in kg_list:
-                if not isinstance(kg, dict):
-                    continue
-                all_nodes.extend(kg.get("nodes", []))
-                all_edges.extend(kg.get("edges", []))
-                all_chapters.update(kg.get("chapters_covered", []))
-            merged_nodes = self._merge_nodes(all_nodes)
-            merged_edges = self._merge_edges(all_edges)
+            kgs = [kg for kg in kg_list if isinstance(kg, dict)]
+            # 直接把各小节的节点/边串联成迭代器交给合并循环，不再先拷贝成两个大列表
+            merged_nodes = self._merge_nodes(chain.from_iterable(kg.get("nodes", []) for kg in kgs))
+            merged_edges = self._merge_edges(chain.from_iterable(kg.get("edges", []) for kg in kgs))
+            all_chapters = set().union(*(kg.get("chapters_covered", []) for kg in kgs))
             return {
                 "nodes": merged_nodes,
                 "edges": merged_edges,
@@ -42,35 +39,42 @@ class KGMerger:
             logger.error(f"KG 合并失败: {e}")
             return {"nodes": [], "edges": [], "hierarchy": "", "total_nodes": 0, "total_edges": 0, "chapters_covered": []}
 
-    def _merge_nodes(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        try:
-            concept_nodes: Dict[str, Dict[str, Any]] = {}
-            structural_nodes: Dict[str, Dict[str, Any]] = {}
-            for node in nodes:
-                if not isinstance(node, dict):
-                    continue
-                t = node.get("type", "")
+    def _merge_nodes(self, nodes: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        concept_groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        structural_nodes: Dict[str, Dict[str, Any]] = {}
+        for node in nodes:
+            if not isinstance(node, dict):
+                continue
+            t = node.get("type", "")
+            try:
                 if t == "concept":
                     key = node.get("canonical_key", node.get("name", ""))
-                    if not key:
-                        continue
-                    if key in concept_nodes:
-                        self._merge_concept_node(concept_nodes[key], node)
-                    else:
-                        concept_nodes[key] = node.copy()
+                    if key:
+                        concept_groups[key].append(node)
                 else:
                     nid = node.get("id", node.get("name", ""))
-                    if nid and nid not in structural_nodes:
-                        structural_nodes[nid] = node.copy()
-            return list(concept_nodes.values()) + list(structural_nodes.values())
-        except Exception as e:
-            logger.error(f"节点合并失败: {e}")
-            return nodes
+                    if nid:
+                        structural_nodes.setdefault(nid, node)
+            except TypeError as e:
+                # 键不可哈希的畸形节点只跳过该节点，不丢弃整本书的合并结果
+                logger.warning(f"跳过无法合并的节点: {e}")
+        concept_nodes = [self._reduce_concept_group(group) for group in concept_groups.values()]
+        return concept_nodes + list(structural_nodes.values())
+
+    def _reduce_concept_group(self, group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # 单节点组直接复用输入；多节点组仅复制一次作为折叠目标，避免改写调用方仍持有的小节KG
+        if len(group) == 1:
+            return group[0]
+        merged = dict(group[0])
+        aliases = set(merged.get("aliases", []))
+        for node in group[1:]:
+            self._merge_concept_node(merged, node, aliases)
+        merged["aliases"] = list(aliases)
+        return merged
 
-    def _merge_concept_node(self, existing: Dict[str, Any], new: Dict[str, Any]) -> None:
+    def _merge_concept_node(self, existing: Dict[str, Any], new: Dict[str, Any], aliases: set) -> None:
         try:
-            existing_aliases = set(existing.get("aliases", [])) | set(new.get("aliases", []))
-            existing["aliases"] = list(existing_aliases)
+            aliases.update(new.get("aliases", []))
             if len(new.get("description", "")) > len(existing.get("description", "")):
                 existing["description"] = new.get("description", "")
             existing["score"] = max(existing.get("score", 0.0), new.get("score", 0.0))
@@ -79,41 +83,52 @@ class KGMerger:
         except Exception as e:
             logger.error(f"概念节点合并失败: {e}")
 
-    def _merge_edges(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        try:
-            edge_map: Dict[str, Dict[str, Any]] = {}
-            for edge in edges:
-                if not isinstance(edge, dict):
-                    continue
-                s = edge.get("source_id", "")
-                t = edge.get("target_id", "")
-                et = edge.get("type", "")
-                if not (s and t and et):
-                    continue
+    def _merge_edges(self, edges: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        edge_map: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        # 被多次合并的边的证据片段（dict 作有序集合），循环结束后统一拼接，避免反复子串查找与字符串重建
+        evidence_map: Dict[Tuple[str, ...], Dict[str, None]] = {}
+        for edge in edges:
+            if not isinstance(edge, dict):
+                continue
+            s = edge.get("source_id", "")
+            t = edge.get("target_id", "")
+            et = edge.get("type", "")
+            if not (s and t and et):
+                continue
+            try:
+                # 元组键直接复用各字符串已缓存的哈希，无需每条边格式化新字符串
                 evidence = edge.get("evidence", "")
                 if evidence and len(evidence) > 20:
-                    import hashlib
-                    evi_hash = hashlib.md5(evidence.encode("utf-8")).hexdigest()[:8]
-                    key = f"{s}->{t}:{et}:{evi_hash}"
-                else:
-                    key = f"{s}->{t}:{et}"
-                if key not in edge_map:
-                    edge_map[key] = edge.copy()
+                    # 长证据追加短指纹区分同端点的不同关系；blake2b 比 md5 更快
+                    evi_hash = hashlib.blake2b(evidence.encode("utf-8"), digest_size=4).hexdigest()
+                    key = (s, t, et, evi_hash)
                 else:
-                    self._merge_edge_info(edge_map[key], edge)
-            return list(edge_map.values())
-        except Exception as e:
-            logger.error(f"边合并失败: {e}")
-            return edges
+                    key = (s, t, et)
+                # setdefault 一次探测完成"查找或插入"；首次出现的边不复制，需要折叠时才写时复制
+                existing = edge_map.setdefault(key, edge)
+                if existing is edge:
+                    continue
+                fragments = evidence_map.get(key)
+                if fragments is None:
+                    existing = edge_map[key] = dict(existing)
+                    ev_old = existing.get("evidence", "")
+                    fragments = evidence_map[key] = {ev_old: None} if ev_old else {}
+            except (TypeError, AttributeError) as e:
+                # 端点或证据字段畸形的边只跳过该边，不丢弃整本书的合并结果
+                logger.warning(f"跳过无法合并的边: {e}")
+                continue
+            self._merge_edge_info(existing, edge, fragments)
+        for key, fragments in evidence_map.items():
+            edge_map[key]["evidence"] = "; ".join(map(str, fragments))
+        return list(edge_map.values())
 
-    def _merge_edge_info(self, existing: Dict[str, Any], new: Dict[str, Any]) -> None:
+    def _merge_edge_info(self, existing: Dict[str, Any], new: Dict[str, Any], fragments: Dict[str, None]) -> None:
         try:
             existing["weight"] = (existing.get("weight", 1.0) + new.get("weight", 1.0)) / 2
             existing["confidence"] = max(existing.get("confidence", 0.0), new.get("confidence", 0.0))
-            ev_old = existing.get("evidence", "")
             ev_new = new.get("evidence", "")
-            if ev_new and ev_new not in ev_old:
-                existing["evidence"] = f"{ev_old}; {ev_new}" if ev_old else ev_new
+            if ev_new:
+                fragments[ev_new] = None
             if new.get("updated_at"):
                 existing["updated_at"] = new["updated_at"]
         except Exception as e:
@@ -6,8 +6,10 @@ KG Merger - 整书级合并，跨节归并/去重
 """
 
 import logging
-from typing import Dict, Any, List, Set, Tuple
-from collections import defaultdict
+import sys
+from dataclasses import replace
+from itertools import compress
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .schemas import KGNode, KGEdge, KGDict
 from .normalizer import KGNormalizer
@@ -19,81 +21,176 @@ logger = logging.getLogger(__name__)
 class KGMerger:
     """KG合并器 - 负责整书级别的知识图谱合并"""
     
-    def __init__(self, normalizer: KGNormalizer = None):
+    def __init__(self, normalizer: KGNormalizer = None, trust_inputs: bool = False):
         self.normalizer = normalizer or KGNormalizer()
         self.logger = logging.getLogger(__name__)
+        # 输入已保证边端点均存在于合并后节点中时，可跳过端点校验
+        self._trust_inputs = trust_inputs
+        self.begin_book({})
     
-    def merge_book_kg(self, section_kgs: List[Tuple[str, KGDict]], book_context: Dict[str, Any]) -> KGDict:
+    def merge_book_kg(self, section_kgs: Iterable[Tuple[str, KGDict]], book_context: Dict[str, Any]) -> KGDict:
         """
         合并多个小节的KG为整书KG
         
+        小节按流式逐个并入增量索引，传入生成器时无需先把全部小节KG载入内存。
+        
         Args:
-            section_kgs: [(section_id, kg_dict), ...] 小节KG列表
+            section_kgs: 可迭代的 (section_id, kg_dict) 小节KG序列
             book_context: 整书上下文信息 (book_id, topic等)
             
         Returns:
             KGDict: 合并后的整书KG
         """
         try:
-            if not section_kgs:
-                self.logger.warning("没有小节KG需要合并")
-                return self._create_empty_book_kg(book_context)
-            
-            self.logger.info(f"开始合并 {len(section_kgs)} 个小节的KG")
-            
-            # 收集所有节点和边
-            all_nodes = []
-            all_edges = []
-            chapters_covered = set()
+            if isinstance(section_kgs, (list, tuple)):
+                if not section_kgs:
+                    self.logger.warning("没有小节KG需要合并")
+                    return self._create_empty_book_kg(book_context)
+                self.logger.info(f"开始合并 {len(section_kgs)} 个小节的KG")
+            else:
+                self.logger.info("开始流式合并小节KG")
             
+            self.begin_book(book_context)
             for section_id, kg_data in section_kgs:
-                all_nodes.extend(kg_data.nodes)
-                all_edges.extend(kg_data.edges)
-                chapters_covered.update(kg_data.chapters_covered)
-            
-            # 节点合并和去重
-            merged_nodes = self._merge_nodes(all_nodes, book_context)
-            
-            # 边合并和去重
-            merged_edges = self._merge_edges(all_edges, merged_nodes, book_context)
-            
-            # 创建整书层级结构
-            hierarchy = self._build_book_hierarchy(chapters_covered, book_context)
-            
-            merged_kg = KGDict(
-                nodes=merged_nodes,
-                edges=merged_edges,
-                hierarchy=hierarchy,
-                total_nodes=len(merged_nodes),
-                total_edges=len(merged_edges),
-                chapters_covered=sorted(list(chapters_covered))
-            )
-            
-            self.logger.info(f"KG合并完成: {len(merged_nodes)} 节点, {len(merged_edges)} 边")
-            return merged_kg
+                self.add_section(section_id, kg_data)
+            if not self._section_totals[0]:
+                self.logger.warning("没有小节KG需要合并")
+                return self._create_empty_book_kg(book_context)
+            return self.finalize_book()
             
         except Exception as e:
             self.logger.error(f"KG合并失败: {e}")
             return self._create_empty_book_kg(book_context)
     
-    def _merge_nodes(self, all_nodes: List[KGNode], book_context: Dict[str, Any]) -> List[KGNode]:
-        """合并和去重节点"""
-        # 使用名称和类型作为合并键
-        node_groups = defaultdict(list)
+    def iter_merged_batches(self, section_kgs: Iterable[Tuple[str, KGDict]], book_context: Dict[str, Any],
+                            batch_size: int = 5000) -> Iterator[KGDict]:
+        """
+        合并整书KG并按批次产出，便于下游分批写入（UNWIND/MERGE）
+        
+        每批包含 batch_size 个节点，以及两端节点均已在本批或之前批次中产出的边，
+        因此按顺序消费时写边前其端点一定已写入。
+        
+        Args:
+            section_kgs: 可迭代的 (section_id, kg_dict) 小节KG序列
+            book_context: 整书上下文信息
+            batch_size: 每批节点数
+            
+        Yields:
+            KGDict: 整书KG的一个批次
+        """
+        merged_kg = self.merge_book_kg(section_kgs, book_context)
+        nodes = merged_kg.nodes
+        if not nodes:
+            return
+        
+        # 边归入其较晚产出的端点所在批次
+        batch_of = {node.id: i // batch_size for i, node in enumerate(nodes)}
+        edge_batches: Dict[int, List[KGEdge]] = {}
+        for edge in merged_kg.edges:
+            batch_index = max(batch_of[edge.source], batch_of[edge.target])
+            edge_batches.setdefault(batch_index, []).append(edge)
+        
+        for batch_index, start in enumerate(range(0, len(nodes), batch_size)):
+            batch_nodes = nodes[start:start + batch_size]
+            batch_edges = edge_batches.pop(batch_index, [])
+            yield KGDict(
+                nodes=batch_nodes,
+                edges=batch_edges,
+                hierarchy=merged_kg.hierarchy,
+                total_nodes=len(batch_nodes),
+                total_edges=len(batch_edges),
+                chapters_covered=merged_kg.chapters_covered
+            )
+    
+    def begin_book(self, book_context: Dict[str, Any]) -> None:
+        """开始一次整书合并，重置增量索引"""
+        self._book_context = book_context
+        # 合并键 -> 同组节点；合并键 -> 已合并节点（保持首次出现顺序）
+        self._node_groups: Dict[Tuple[str, str], List[KGNode]] = {}
+        self._merged_node_index: Dict[Tuple[str, str], KGNode] = {}
+        # 自上次 finalize 以来新增成员的组，仅这些组需要重新合并
+        self._dirty_groups: Dict[Tuple[str, str], None] = {}
+        # 已合并节点的ID集合（每组取首个节点ID），增量维护，供边端点校验复用
+        self._node_ids: Set[str] = set()
+        # 边指纹 -> 首次出现的边
+        self._edge_index: Dict[Tuple[str, str, str], KGEdge] = {}
+        self._chapters: Set[str] = set()
+        # 已并入小节的原始规模：[小节数, 节点数, 边数]，供流式合并后计算去重统计
+        self._section_totals: List[int] = [0, 0, 0]
+        self._last_book_kg: Optional[KGDict] = None
+        # 上次生成时的节点/边列表及其长度；调用方原地增删后不再视为同一份整书KG
+        self._last_book_shape: Optional[Tuple[List[KGNode], List[KGEdge], int, int]] = None
+    
+    def add_section(self, section_id: str, kg_data: KGDict) -> None:
+        """将一个小节的KG并入当前整书索引，仅处理新增的节点和边"""
+        self._absorb_nodes(kg_data.nodes)
+        edge_index = self._edge_index
+        intern = sys.intern
+        for edge in kg_data.edges:
+            edge_index.setdefault((intern(edge.source), intern(edge.target), edge.type), edge)
+        self._chapters.update(kg_data.chapters_covered)
+        totals = self._section_totals
+        totals[0] += 1
+        totals[1] += kg_data.total_nodes
+        totals[2] += kg_data.total_edges
+    
+    def finalize_book(self) -> KGDict:
+        """根据当前索引生成整书KG；只重新合并有变化的节点组"""
+        book_context = self._book_context
+        node_groups = self._node_groups
+        merged_node_index = self._merged_node_index
+        merge_node_group = self._merge_node_group
+        for merge_key in self._dirty_groups:
+            merged_node_index[merge_key] = merge_node_group(node_groups[merge_key], book_context)
+        self._dirty_groups.clear()
+        
+        merged_nodes = list(self._merged_node_index.values())
+        merged_edges = self._merge_edges(self._edge_index.values(), merged_nodes, book_context, self._node_ids)
+        
+        # 创建整书层级结构
+        hierarchy = self._build_book_hierarchy(self._chapters, book_context)
         
-        for node in all_nodes:
-            # 标准化名称
-            canonical_name = self.normalizer._normalize_name(node.name)
-            merge_key = f"{canonical_name}|{node.type}"
-            node_groups[merge_key].append(node)
+        merged_kg = KGDict(
+            nodes=merged_nodes,
+            edges=merged_edges,
+            hierarchy=hierarchy,
+            total_nodes=len(merged_nodes),
+            total_edges=len(merged_edges),
+            chapters_covered=sorted(self._chapters),
+            chapters_frozen=frozenset(self._chapters)
+        )
+        self._last_book_kg = merged_kg
+        self._last_book_shape = (merged_nodes, merged_edges, len(merged_nodes), len(merged_edges))
         
-        merged_nodes = []
-        for merge_key, nodes in node_groups.items():
-            merged_node = self._merge_node_group(nodes, book_context)
-            if merged_node:
-                merged_nodes.append(merged_node)
+        self.logger.info(f"KG合并完成: {len(merged_nodes)} 节点, {len(merged_edges)} 边")
+        return merged_kg
+    
+    def _is_last_book(self, kg: KGDict) -> bool:
+        """kg 是否为上次 finalize_book 的结果，且其节点/边列表未被替换或增删"""
+        if kg is not self._last_book_kg or self._last_book_shape is None:
+            return False
+        nodes, edges, node_count, edge_count = self._last_book_shape
+        return (kg.nodes is nodes and kg.edges is edges
+                and len(nodes) == node_count and len(edges) == edge_count)
+    
+    def _absorb_nodes(self, nodes: List[KGNode]) -> None:
+        """按名称和类型将节点归入合并组"""
+        node_groups = self._node_groups
+        dirty_groups = self._dirty_groups
+        node_ids_add = self._node_ids.add
+        normalize = self.normalizer._normalize_name
+        intern = sys.intern
         
-        return merged_nodes
+        for node in nodes:
+            # 标准化名称；驻留字符串并用元组作键，跨小节重复的名称共享同一对象（类型已在构造时驻留）
+            merge_key = (intern(normalize(node.name)), node.type)
+            group = node_groups.get(merge_key)
+            if group is None:
+                node_groups[merge_key] = [node]
+                node_ids_add(node.id)
+            else:
+                group.append(node)
+            dirty_groups[merge_key] = None
     
     def _merge_node_group(self, nodes: List[KGNode], book_context: Dict[str, Any]) -> KGNode:
         """合并一组相似的节点"""
@@ -101,31 +198,24 @@ class KGMerger:
             return None
         
         if len(nodes) == 1:
-            # 更新scope为book级别
+            # 更新scope为book级别；scope已正确时直接复用原节点，不再重建dataclass
             node = nodes[0]
-            return KGNode(
-                id=node.id,
-                name=node.name,
-                type=node.type,
-                desc=node.desc,
-                aliases=node.aliases,
-                scope=book_context.get("book_id", node.scope),
-                created_at=node.created_at,
-                updated_at=node.updated_at
-            )
+            scope = book_context.get("book_id", node.scope)
+            return node if node.scope == scope else replace(node, scope=scope)
         
         # 多个节点需要合并
-        # 选择最详细的描述
-        best_desc = ""
-        for node in nodes:
-            if node.desc and len(node.desc) > len(best_desc):
-                best_desc = node.desc
+        # 选择最详细的描述（等长时取最先出现者）
+        best_desc = max((node.desc for node in nodes if node.desc), key=len, default="")
         
-        # 合并别名
-        all_aliases = set()
-        for node in nodes:
-            if node.aliases:
-                all_aliases.update(node.aliases)
+        # 合并别名：较大的组用一次C层多参数并集代替逐节点 update，小组逐个 update 更快
+        if len(nodes) > 3:
+            alias_iters = [node.aliases for node in nodes if node.aliases]
+            all_aliases = set().union(*alias_iters) if alias_iters else set()
+        else:
+            all_aliases = set()
+            for node in nodes:
+                if node.aliases:
+                    all_aliases.update(node.aliases)
         
         # 使用第一个节点作为基础
         base_node = nodes[0]
@@ -135,49 +225,50 @@ class KGMerger:
             name=base_node.name,
             type=base_node.type,
             desc=best_desc,
-            aliases=sorted(list(all_aliases)),
+            aliases=sorted(all_aliases),
             scope=book_context.get("book_id", base_node.scope),
             created_at=base_node.created_at,
             updated_at=base_node.updated_at
         )
     
-    def _merge_edges(self, all_edges: List[KGEdge], merged_nodes: List[KGNode], book_context: Dict[str, Any]) -> List[KGEdge]:
+    def _merge_edges(self, all_edges: Iterable[KGEdge], merged_nodes: List[KGNode], book_context: Dict[str, Any],
+                     node_ids: Optional[Set[str]] = None) -> List[KGEdge]:
         """合并和去重边"""
-        # 创建节点ID映射
-        node_id_set = {node.id for node in merged_nodes}
+        if not isinstance(all_edges, list):
+            all_edges = list(all_edges)
         
-        # 去重边（基于源、目标、类型）
+        # 跳过无效边（节点不存在）：先一次性算出有效掩码，再由 compress 在C层跳过无效边
+        if self._trust_inputs:
+            valid_edges = all_edges
+        else:
+            if node_ids is None:
+                node_ids = {node.id for node in merged_nodes}
+            contains = node_ids.__contains__
+            valid_mask = [contains(edge.source) and contains(edge.target) for edge in all_edges]
+            valid_edges = compress(all_edges, valid_mask)
+        
+        # 去重边（基于源、目标、类型）；热循环内的方法与上下文查找提前绑定为局部变量
         edge_fingerprints = set()
         merged_edges = []
+        seen_add = edge_fingerprints.add
+        append = merged_edges.append
+        book_id = book_context.get("book_id")
+        intern = sys.intern
         
-        for edge in all_edges:
-            # 跳过无效边（节点不存在）
-            if edge.source not in node_id_set or edge.target not in node_id_set:
-                continue
+        for edge in valid_edges:
+            source, target, edge_type = edge.source, edge.target, edge.type
             
             # 创建边指纹
-            fingerprint = f"{edge.source}|{edge.target}|{edge.type}"
-            
+            fingerprint = (intern(source), intern(target), edge_type)
             if fingerprint in edge_fingerprints:
                 continue
+            seen_add(fingerprint)
             
-            edge_fingerprints.add(fingerprint)
-            
-            # 更新边的scope为book级别
-            merged_edge = KGEdge(
-                rid=edge.rid,
-                type=edge.type,
-                source=edge.source,
-                target=edge.target,
-                desc=edge.desc,
-                confidence=edge.confidence,
-                weight=edge.weight,
-                scope=book_context.get("book_id", edge.scope),
-                src_section=edge.src_section,  # 保留原始section信息
-                created_at=edge.created_at
-            )
-            
-            merged_edges.append(merged_edge)
+            # 更新边的scope为book级别，保留原始section信息；scope已正确时直接复用原边
+            if book_id is None or edge.scope == book_id:
+                append(edge)
+            else:
+                append(replace(edge, scope=book_id))
         
         return merged_edges
     
@@ -212,6 +303,9 @@ class KGMerger:
         """
         增量合并新的小节KG到现有的整书KG中
         
+        若 existing_kg 正是本合并器上次生成且未被修改过节点/边列表的整书KG，则直接复用内部索引，
+        只处理新小节的节点和边；否则以 existing_kg 重建索引后再合并。
+        
         Args:
             existing_kg: 现有的整书KG
             new_section_kg: 新的小节KG
@@ -223,14 +317,14 @@ class KGMerger:
         try:
             self.logger.info("开始增量合并KG")
             
-            # 将现有KG和新KG组合
-            section_kgs = [
-                ("existing", existing_kg),
-                (context.get("section_id", "new"), new_section_kg)
-            ]
+            if not self._is_last_book(existing_kg):
+                self.begin_book(context)
+                self.add_section("existing", existing_kg)
+            else:
+                self._book_context = context
             
-            # 使用完整合并逻辑
-            return self.merge_book_kg(section_kgs, context)
+            self.add_section(context.get("section_id", "new"), new_section_kg)
+            return self.finalize_book()
             
         except Exception as e:
             self.logger.error(f"增量合并失败: {e}")
@@ -242,29 +336,45 @@ class KGMerger:
             # 原始统计
             original_nodes = sum(kg.total_nodes for _, kg in section_kgs)
             original_edges = sum(kg.total_edges for _, kg in section_kgs)
+            return self._build_merge_stats(len(section_kgs), original_nodes, original_edges, merged_kg)
             
-            # 合并后统计
-            merged_nodes = merged_kg.total_nodes
-            merged_edges = merged_kg.total_edges
-            
-            # 计算去重比例
-            node_dedup_ratio = (original_nodes - merged_nodes) / original_nodes if original_nodes > 0 else 0
-            edge_dedup_ratio = (original_edges - merged_edges) / original_edges if original_edges > 0 else 0
-            
-            return {
-                "original_sections": len(section_kgs),
-                "original_nodes": original_nodes,
-                "original_edges": original_edges,
-                "merged_nodes": merged_nodes,
-                "merged_edges": merged_edges,
-                "node_dedup_ratio": round(node_dedup_ratio, 3),
-                "edge_dedup_ratio": round(edge_dedup_ratio, 3),
-                "chapters_covered": len(merged_kg.chapters_covered)
-            }
-            
         except Exception as e:
             self.logger.error(f"计算合并统计失败: {e}")
             return {}
+    
+    def merge_stats(self, merged_kg: KGDict) -> Dict[str, Any]:
+        """
+        基于最近一次 merge_book_kg 累计的小节规模计算合并统计
+        
+        与 calculate_merge_stats 结果相同，但无需再次遍历小节KG，适用于流式合并。
+        """
+        try:
+            sections, original_nodes, original_edges = self._section_totals
+            return self._build_merge_stats(sections, original_nodes, original_edges, merged_kg)
+        except Exception as e:
+            self.logger.error(f"计算合并统计失败: {e}")
+            return {}
+    
+    def _build_merge_stats(self, sections: int, original_nodes: int, original_edges: int,
+                           merged_kg: KGDict) -> Dict[str, Any]:
+        # 合并后统计
+        merged_nodes = merged_kg.total_nodes
+        merged_edges = merged_kg.total_edges
+        
+        # 计算去重比例
+        node_dedup_ratio = (original_nodes - merged_nodes) / original_nodes if original_nodes > 0 else 0
+        edge_dedup_ratio = (original_edges - merged_edges) / original_edges if original_edges > 0 else 0
+        
+        return {
+            "original_sections": sections,
+            "original_nodes": original_nodes,
+            "original_edges": original_edges,
+            "merged_nodes": merged_nodes,
+            "merged_edges": merged_edges,
+            "node_dedup_ratio": round(node_dedup_ratio, 3),
+            "edge_dedup_ratio": round(edge_dedup_ratio, 3),
+            "chapters_covered": len(merged_kg.chapters_covered)
+        }
 
 
 class ConceptMerger:
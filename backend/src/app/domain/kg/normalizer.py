@@ -1,20 +1,52 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import logging
-from datetime import datetime
-from typing import Dict, List, Any
+import re
+import sys
+from dataclasses import replace
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
 from .ids import generate_concept_id, slug
-from .schemas import NodeDict, EdgeDict, KGDict
+from .schemas import NodeDict, EdgeDict, KGDict, KGEdge, KGNode, LegacyKGDict
 
 
 logger = logging.getLogger(__name__)
 
+# 命中即说明需要空白标准化：首尾空白、连续空白、或除单个空格外的任意空白字符（含全角空格）
+_NEEDS_WS_NORMALIZE = re.compile(r'^\s|\s$|\s\s|[^\S ]')
+
+
+def _collapse_whitespace(text: str) -> str:
+    # 无参 split 在C层一次扫描完成切分并丢弃首尾空白，覆盖全部Unicode空白字符；
+    # 实测比 str.translate + 循环 replace 更快，中文文本上差距尤其明显
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=1 << 16)
+def _normalize_name_cached(name: str) -> str:
+    # 概念名称在各小节间高度重复，纯函数结果可直接缓存
+    # 移除首尾及多余空格
+    normalized = _collapse_whitespace(name)
+    
+    # TODO: 可以添加更多标准化规则
+    # - 统一术语
+    # - 缩写展开
+    # - 大小写标准化
+    
+    return normalized
+
 
 class KGNormalizer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
+    @staticmethod
+    def cache_clear() -> None:
+        """清空名称标准化缓存"""
+        _normalize_name_cached.cache_clear()
+    
     def normalize_kg_dict(self, raw_kg: 'KGDict', context: Dict[str, Any]) -> 'KGDict':
         """
         标准化KGDict格式的数据（新版本）
@@ -27,87 +59,50 @@ class KGNormalizer:
             KGDict: 标准化后的KG数据
         """
         try:
-            # 标准化节点
-            normalized_nodes = []
-            for node in raw_kg.nodes:
-                normalized_name = self._normalize_name(node.name)
-                if normalized_name:
-                    # 创建标准化的节点
-                    from .schemas import KGNode
-                    normalized_node = KGNode(
-                        id=node.id,
-                        name=normalized_name,
-                        type=node.type,
-                        desc=self._normalize_description(node.desc),
-                        aliases=self._normalize_aliases(node.aliases, normalized_name),
-                        scope=node.scope,
-                        created_at=node.created_at,
-                        updated_at=node.updated_at
-                    )
-                    normalized_nodes.append(normalized_node)
-            
-            # 标准化边（基本上保持不变，但可以添加描述标准化）
-            normalized_edges = []
-            for edge in raw_kg.edges:
-                from .schemas import KGEdge
-                normalized_edge = KGEdge(
-                    rid=edge.rid,
-                    type=edge.type,
-                    source=edge.source,
-                    target=edge.target,
-                    desc=self._normalize_description(edge.desc),
-                    confidence=edge.confidence,
-                    weight=edge.weight,
-                    scope=edge.scope,
-                    src_section=edge.src_section,
-                    created_at=edge.created_at
-                )
-                normalized_edges.append(normalized_edge)
-            
-            from .schemas import KGDict
-            return KGDict(
-                nodes=normalized_nodes,
-                edges=normalized_edges,
-                hierarchy=raw_kg.hierarchy,
-                total_nodes=len(normalized_nodes),
-                total_edges=len(normalized_edges),
-                chapters_covered=raw_kg.chapters_covered
-            )
-            
+            return raw_kg.transform([self.normalize_node], [self.normalize_edge])
         except Exception as e:
             self.logger.error(f"KG标准化失败: {e}")
             return raw_kg
     
+    def normalize_node(self, node: KGNode) -> Optional[KGNode]:
+        """标准化单个节点；名称为空时返回 None（丢弃），无需改动时直接复用原节点"""
+        normalized_name = self._normalize_name(node.name)
+        if not normalized_name:
+            return None
+        desc = self._normalize_description(node.desc)
+        aliases = self._normalize_aliases(node.aliases, normalized_name)
+        if normalized_name is node.name and desc is node.desc and aliases == node.aliases:
+            return node
+        return replace(node, name=normalized_name, desc=desc, aliases=aliases)
+    
+    def normalize_edge(self, edge: KGEdge) -> KGEdge:
+        """标准化单条边（目前只清理描述）"""
+        desc = self._normalize_description(edge.desc)
+        if desc is edge.desc:
+            return edge
+        return replace(edge, desc=desc)
+    
     def _normalize_name(self, name: str) -> str:
         """标准化名称"""
         if not name:
             return ""
         
-        # 基本清理
-        normalized = name.strip()
-        
-        # 移除多余空格
-        normalized = ' '.join(normalized.split())
-        
-        # TODO: 可以添加更多标准化规则
-        # - 统一术语
-        # - 缩写展开
-        # - 大小写标准化
+        # 快速路径：绝大多数LLM抽取的名称本身已是干净的
+        if _NEEDS_WS_NORMALIZE.search(name) is None:
+            return name
         
-        return normalized
+        return _normalize_name_cached(name)
     
     def _normalize_description(self, desc: str) -> str:
         """标准化描述"""
         if not desc:
             return ""
         
-        # 基本清理
-        normalized = desc.strip()
+        if _NEEDS_WS_NORMALIZE.search(desc) is None:
+            return desc
         
-        # 移除多余空格和换行
-        normalized = ' '.join(normalized.split())
-        
-        return normalized
+        # 基本清理：移除首尾及多余空格和换行
+        return _collapse_whitespace(desc)
     
     def _normalize_aliases(self, aliases: List[str], canonical_name: str) -> List[str]:
         """标准化别名列表"""
@@ -123,9 +118,23 @@ class KGNormalizer:
         
         return sorted(normalized_aliases)
 
-    def normalize_kg(self, raw_kg: Dict[str, Any], topic: str, chapter_title: str, subchapter_title: str, section_id: str) -> KGDict:
+    def normalize_batch(self, items: List[Tuple[Dict[str, Any], str, str, str, str]]) -> List[LegacyKGDict]:
+        """
+        批量标准化多个小节的原始KG
+        
+        Args:
+            items: [(raw_kg, topic, chapter_title, subchapter_title, section_id), ...]
+            
+        Returns:
+            List[LegacyKGDict]: 与输入顺序一致的标准化结果
+        """
+        from ...core.concurrency import map_cpu_bound
+        return map_cpu_bound(_normalize_one, items, chunksize=8)
+
+    def normalize_kg(self, raw_kg: Dict[str, Any], topic: str, chapter_title: str, subchapter_title: str, section_id: str) -> LegacyKGDict:
         try:
-            current_time = datetime.utcnow().isoformat()
+            # 单个时间戳对象被本小节所有节点/边共享引用
+            current_time = sys.intern(datetime.now(timezone.utc).isoformat(timespec="seconds"))
             normalized_nodes: List[NodeDict] = []
             for raw_node in raw_kg.get("nodes", []):
                 if not isinstance(raw_node, dict):
@@ -194,3 +203,7 @@ class KGNormalizer:
             logger.error(f"KG 标准化失败: {e}")
             return {"nodes": [], "edges": [], "hierarchy": "", "total_nodes": 0, "total_edges": 0, "chapters_covered": []}
 
+
+def _normalize_one(item: Tuple[Dict[str, Any], str, str, str, str]) -> LegacyKGDict:
+    """进程池工作函数：需为模块级函数以便pickle"""
+    return KGNormalizer().normalize_kg(*item)
@@ -6,22 +6,58 @@ KG Pipeline - 工程化分层流水线统一接口
 """
 
 import logging
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Set, Tuple
 
-from .schemas import KGPipelineInput, KGPipelineOutput, KGDict
-from .ids import generate_section_id, generate_content_hash
-from .builder import KGBuilderFactory, BaseKGBuilder
+from .schemas import KGPipelineInput, KGPipelineOutput, KGDict, LegacyKGDict
+from .ids import generate_section_id, generate_content_hash, generate_relation_rids_bulk
 from .normalizer import KGNormalizer
 from .idempotent import KGIdempotentProcessor, generate_book_id
-from .store import create_kg_store, BaseKGStore
 from .merger import KGMerger
-from .service import create_kg_service, BaseKGService
+from .store import with_edge_overrides
 from .evaluator import KGEvaluator
 from .thresholds import KGThresholds
 
+if TYPE_CHECKING:
+    from .builder import BaseKGBuilder
+    from .store import BaseKGStore
+    from .service import BaseKGService
+
 
 logger = logging.getLogger(__name__)
 
+# 后台写入队列中允许积压的最大小节数，超过后提交方阻塞等待
+_MAX_PENDING_WRITES = 16
+
+# 抽取结果缓存：(builder_type, section_id, content_hash, language, keywords) -> Builder 输出的原始KG。
+# 只跳过LLM抽取；标准化、幂等、阈值与存储写入每次照常执行，因此与存储实例和阈值配置无关。
+# 进程级共享，工作流每次运行新建的 KGPipeline 也能命中；按 LRU 淘汰
+_EXTRACTION_CACHE_SIZE = 1024
+_extraction_cache: "OrderedDict[Tuple[Any, ...], KGDict]" = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+
+
+def _get_cached_extraction(key: Tuple[Any, ...]) -> Optional[KGDict]:
+    with _extraction_cache_lock:
+        raw_kg = _extraction_cache.get(key)
+        if raw_kg is None:
+            return None
+        _extraction_cache.move_to_end(key)
+    # 返回列表副本：后续各层只生成新对象，不修改缓存中的节点/边
+    return replace(raw_kg, nodes=list(raw_kg.nodes), edges=list(raw_kg.edges))
+
+
+def _put_cached_extraction(key: Tuple[Any, ...], raw_kg: KGDict) -> None:
+    snapshot = replace(raw_kg, nodes=list(raw_kg.nodes), edges=list(raw_kg.edges))
+    with _extraction_cache_lock:
+        _extraction_cache[key] = snapshot
+        _extraction_cache.move_to_end(key)
+        while len(_extraction_cache) > _EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+
 
 class KGPipeline:
     """
@@ -40,110 +76,275 @@ class KGPipeline:
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
         
+        # 延迟导入：builder 会牵出 LLM 服务，store/service 牵出 Neo4j 客户端，
+        # 只导入 app.domain.kg 的调用方（如只用合并器/标准化器）无需承担这些导入开销
+        from .builder import KGBuilderFactory
+        from .store import create_kg_store
+        from .service import create_kg_service
+        
         # 初始化各层组件
-        self.builder: BaseKGBuilder = KGBuilderFactory.create_builder(
+        self.builder: "BaseKGBuilder" = KGBuilderFactory.create_builder(
             self.config.get("builder_type", "llm")
         )
         self.normalizer = KGNormalizer()
         self.idempotent_processor = KGIdempotentProcessor()
-        self.store: BaseKGStore = create_kg_store(
+        self.store: "BaseKGStore" = create_kg_store(
             self.config.get("store_type", "neo4j")
         )
+        # 约束和索引在流水线启动时确保一次
+        self.store.ensure_indexes()
+        # 存储的可选能力在启动时探测一次，写入路径按标志分支，无需靠捕获异常回退
+        self._store_supports_scope_delete = callable(getattr(self.store, "delete_edges_by_scope", None))
+        self._store_supports_bulk = (
+            callable(getattr(self.store, "merge_nodes_bulk", None))
+            and callable(getattr(self.store, "merge_edges_bulk", None))
+        )
         self.merger = KGMerger(self.normalizer)
-        self.service: BaseKGService = create_kg_service(
+        self.service: "BaseKGService" = create_kg_service(
             self.config.get("service_type", "neo4j")
         )
         
         # 保持向后兼容的组件
         self.evaluator = KGEvaluator()
         self.thresholds = KGThresholds(config)
+        
+        # 后台单写线程：抽取与Neo4j写入重叠执行，同时只占用一个写连接
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._writer_lock = threading.Lock()
+        self._write_slots = threading.BoundedSemaphore(_MAX_PENDING_WRITES)
+        self._pending_writes: Set[Future] = set()
 
-    def run_one_subchapter_new(self, input_data: KGPipelineInput) -> KGPipelineOutput:
+    def run_one_subchapter_new(self, input_data: KGPipelineInput, defer_store: bool = False) -> KGPipelineOutput:
         """
         新的工程化流水线：处理单个小节
         
         流程：Builder → Normalizer → Idempotent → Store → Evaluation
+        
+        Args:
+            input_data: 小节输入
+            defer_store: 为True时写入交给后台写线程，立即返回；store_stats["future"]
+                在写入完成后给出存储统计，进程退出前需调用 flush()
         """
         try:
-            # 生成基础信息
-            section_id = generate_section_id(input_data.topic, input_data.chapter_title, input_data.subchapter_title)
-            content_hash = generate_content_hash(input_data.content)
-            
-            self.logger.info(f"开始工程化KG流水线处理: {input_data.subchapter_title}")
-            
-            # 1. Builder: LLM抽取 → JSON Schema
-            context = {
-                "topic": input_data.topic,
-                "language": input_data.language,
-                "chapter_title": input_data.chapter_title,
-                "subchapter_title": input_data.subchapter_title,
-                "keywords": input_data.keywords,
-                "section_id": section_id,
-                "scope": generate_book_id(input_data.topic, input_data.language)
-            }
-            
-            raw_kg = self.builder.build_kg(input_data.content, context)
-            self.logger.debug(f"Builder完成: {raw_kg.total_nodes} 节点, {raw_kg.total_edges} 边")
-            
-            # 2. Normalizer: 别名/词形/同义词处理
-            normalized_kg = self.normalizer.normalize_kg_dict(raw_kg, context)
-            self.logger.debug(f"Normalizer完成: {normalized_kg.total_nodes} 节点, {normalized_kg.total_edges} 边")
-            
-            # 3. Idempotent: 幂等ID生成与查重
-            idempotent_kg = self.idempotent_processor.process_kg(normalized_kg, context)
-            self.logger.debug(f"Idempotent完成: {idempotent_kg.total_nodes} 节点, {idempotent_kg.total_edges} 边")
-            
-            # 4. 应用阈值过滤（保持兼容）
-            filtered_kg = self._apply_thresholds_new(idempotent_kg)
-            self.logger.debug(f"Thresholds完成: {filtered_kg.total_nodes} 节点, {filtered_kg.total_edges} 边")
+            section_id, content_hash = self._section_ids(input_data)
+            context, filtered_kg = self._prepare_section_new(input_data, section_id, content_hash)
             
             # 5. Store: Neo4j写入，唯一约束
-            store_stats = self.store.store_kg(filtered_kg, context)
-            self.logger.debug(f"Store完成: {store_stats}")
+            if defer_store:
+                store_stats = {"submitted": True, "future": self.submit_store(filtered_kg, context)}
+            else:
+                store_stats = self.store.store_kg(filtered_kg, context)
+                self.logger.debug(f"Store完成: {store_stats}")
             
-            # 6. Evaluation: 质量评估（保持兼容）
-            insights = self._evaluate_kg_new(filtered_kg, input_data)
+            # 6. Evaluation: 质量评估（保持兼容）；旧格式视图只构建一次，评估与输出共用
+            legacy_kg = self._kg_dict_to_legacy_format(filtered_kg)
+            insights = self._evaluate_kg_new(filtered_kg, input_data, legacy_kg)
             
             return KGPipelineOutput(
                 section_id=section_id,
                 content_hash=content_hash,
-                kg_part=self._kg_dict_to_legacy_format(filtered_kg),  # 转换为旧格式保持兼容
+                kg_part=legacy_kg,  # 转换为旧格式保持兼容
                 insights=insights,
                 store_stats=store_stats,
             )
             
         except Exception as e:
             self.logger.error(f"工程化KG流水线处理失败: {e}")
-            return KGPipelineOutput(
-                section_id="",
-                content_hash="",
-                kg_part={"nodes": [], "edges": [], "hierarchy": "", "total_nodes": 0, "total_edges": 0, "chapters_covered": []},
-                insights={},
-                store_stats={"success": False, "error": str(e)},
+            return self._failed_output(e)
+    
+    def run_sections(self, inputs: List[KGPipelineInput], concurrency: int = 8) -> List[KGPipelineOutput]:
+        """
+        并发处理多个小节
+        
+        抽取阶段（LLM调用为主）在有界线程池中并发执行；Neo4j写入交给后台单写线程
+        按完成顺序串行执行，避免抽取并发度放大数据库连接数。
+        
+        Args:
+            inputs: 小节输入列表
+            concurrency: 抽取阶段的最大并发数
+            
+        Returns:
+            List[KGPipelineOutput]: 与 inputs 顺序一致的处理结果
+        """
+        outputs: List[Optional[KGPipelineOutput]] = [None] * len(inputs)
+        submitted: List[Tuple[int, str, str, Dict[str, Any], Dict[str, Any], Future]] = []
+        
+        def _extract(input_data: KGPipelineInput):
+            section_id, content_hash = self._section_ids(input_data)
+            context, filtered_kg = self._prepare_section_new(input_data, section_id, content_hash)
+            legacy_kg = self._kg_dict_to_legacy_format(filtered_kg)
+            insights = self._evaluate_kg_new(filtered_kg, input_data, legacy_kg)
+            return section_id, content_hash, context, filtered_kg, legacy_kg, insights
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            future_to_index = {executor.submit(_extract, input_data): i for i, input_data in enumerate(inputs)}
+            for future in as_completed(future_to_index):
+                index = future_to_index[future]
+                try:
+                    section_id, content_hash, context, filtered_kg, legacy_kg, insights = future.result()
+                except Exception as e:
+                    self.logger.error(f"工程化KG流水线处理失败: {e}")
+                    outputs[index] = self._failed_output(e)
+                    continue
+                write_future = self.submit_store(filtered_kg, context)
+                submitted.append((index, section_id, content_hash, legacy_kg, insights, write_future))
+        
+        for index, section_id, content_hash, legacy_kg, insights, write_future in submitted:
+            try:
+                store_stats = write_future.result()
+            except Exception as e:
+                self.logger.error(f"小节KG写入失败: {e}")
+                store_stats = {"success": False, "error": str(e)}
+            outputs[index] = KGPipelineOutput(
+                section_id=section_id,
+                content_hash=content_hash,
+                kg_part=legacy_kg,
+                insights=insights,
+                store_stats=store_stats,
             )
+        
+        return outputs
     
-    def merge_book_kg(self, section_results: list, book_context: Dict[str, Any]) -> Dict[str, Any]:
+    def submit_store(self, kg_data: KGDict, context: Dict[str, Any]) -> Future:
+        """
+        将KG写入提交给后台单写线程
+        
+        积压的写入达到上限时阻塞，直到有写入完成。
+        
+        Returns:
+            Future: 结果为 store.store_kg 的存储统计
+        """
+        self._write_slots.acquire()
+        try:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kg-writer")
+                future = self._writer.submit(self.store.store_kg, kg_data, context)
+                self._pending_writes.add(future)
+        except Exception:
+            self._write_slots.release()
+            raise
+        future.add_done_callback(self._on_write_done)
+        return future
+    
+    def _on_write_done(self, future: Future) -> None:
+        with self._writer_lock:
+            self._pending_writes.discard(future)
+        self._write_slots.release()
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """等待所有已提交的后台写入完成"""
+        with self._writer_lock:
+            pending = list(self._pending_writes)
+        if pending:
+            wait(pending, timeout=timeout)
+    
+    def _section_ids(self, input_data: KGPipelineInput) -> Tuple[str, str]:
+        """生成小节ID与内容哈希"""
+        section_id = generate_section_id(input_data.topic, input_data.chapter_title, input_data.subchapter_title)
+        content_hash = generate_content_hash(input_data.content)
+        return section_id, content_hash
+    
+    def _extract_raw_kg(self, input_data: KGPipelineInput, context: Dict[str, Any]) -> KGDict:
+        """Builder 抽取；同一构建器对内容未变化的小节复用上次的抽取结果（语言与关键词同样影响抽取，一并计入）"""
+        cache_key = (
+            str(self.config.get("builder_type", "llm")).lower(),
+            context["section_id"],
+            context["content_hash"],
+            input_data.language,
+            tuple(input_data.keywords or ()),
+        )
+        raw_kg = _get_cached_extraction(cache_key)
+        if raw_kg is not None:
+            self.logger.info(f"小节内容未变化，复用已有抽取结果: {input_data.subchapter_title}")
+            return raw_kg
+        raw_kg = self.builder.build_kg(input_data.content, context)
+        if raw_kg.nodes or raw_kg.edges:
+            _put_cached_extraction(cache_key, raw_kg)
+        return raw_kg
+    
+    def _prepare_section_new(self, input_data: KGPipelineInput, section_id: str,
+                             content_hash: str) -> Tuple[Dict[str, Any], KGDict]:
+        """执行写入前的各层：Builder → Normalizer → Idempotent → Thresholds"""
+        self.logger.info(f"开始工程化KG流水线处理: {input_data.subchapter_title}")
+        
+        # 1. Builder: LLM抽取 → JSON Schema
+        context = {
+            "topic": input_data.topic,
+            "language": input_data.language,
+            "chapter_title": input_data.chapter_title,
+            "subchapter_title": input_data.subchapter_title,
+            "keywords": input_data.keywords,
+            "section_id": section_id,
+            "content_hash": content_hash,
+            "scope": generate_book_id(input_data.topic, input_data.language)
+        }
+        
+        raw_kg = self._extract_raw_kg(input_data, context)
+        self.logger.debug(f"Builder完成: {raw_kg.total_nodes} 节点, {raw_kg.total_edges} 边")
+        
+        # 2-4. Normalizer → Idempotent → Thresholds：各层以逐项函数形式融合为一次遍历，
+        # 每个节点/边依次经过全部阶段，不再物化中间KG
+        try:
+            assign_id, assign_rid = self.idempotent_processor.stages(context)
+            filtered_kg = raw_kg.transform(
+                [self.normalizer.normalize_node, assign_id],
+                [self.normalizer.normalize_edge, assign_rid, self.thresholds.storage_edge_stage()],
+            )
+            self.logger.debug(f"Normalizer/Idempotent/Thresholds完成: {filtered_kg.total_nodes} 节点, {filtered_kg.total_edges} 边")
+        except Exception as e:
+            self.logger.error(f"融合处理失败，改为逐层处理: {e}")
+            filtered_kg = self._process_layers_new(raw_kg, context)
+        
+        return context, filtered_kg
+    
+    def _process_layers_new(self, raw_kg: KGDict, context: Dict[str, Any]) -> KGDict:
+        """逐层执行 Normalizer → Idempotent → Thresholds，各层失败时原样返回输入"""
+        # 2. Normalizer: 别名/词形/同义词处理
+        normalized_kg = self.normalizer.normalize_kg_dict(raw_kg, context)
+        self.logger.debug(f"Normalizer完成: {normalized_kg.total_nodes} 节点, {normalized_kg.total_edges} 边")
+        
+        # 3. Idempotent: 幂等ID生成与查重
+        idempotent_kg = self.idempotent_processor.process_kg(normalized_kg, context)
+        self.logger.debug(f"Idempotent完成: {idempotent_kg.total_nodes} 节点, {idempotent_kg.total_edges} 边")
+        
+        # 4. 应用阈值过滤（保持兼容）
+        filtered_kg = self._apply_thresholds_new(idempotent_kg)
+        self.logger.debug(f"Thresholds完成: {filtered_kg.total_nodes} 节点, {filtered_kg.total_edges} 边")
+        return filtered_kg
+    
+    def _failed_output(self, error: Exception) -> KGPipelineOutput:
+        """构造处理失败时的空结果"""
+        return KGPipelineOutput(
+            section_id="",
+            content_hash="",
+            kg_part={"nodes": [], "edges": [], "hierarchy": "", "total_nodes": 0, "total_edges": 0, "chapters_covered": []},
+            insights={},
+            store_stats={"success": False, "error": str(error)},
+        )
+    
+    def merge_book_kg(self, section_results: Iterable[Tuple[str, KGDict]], book_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         整书级KG合并
         
         Args:
-            section_results: [(section_id, KGDict), ...] 小节结果列表
+            section_results: 可迭代的 (section_id, KGDict) 小节结果；可传生成器流式合并
             book_context: 整书上下文
             
         Returns:
             Dict: 合并结果统计
         """
         try:
-            self.logger.info(f"开始整书KG合并: {len(section_results)} 个小节")
+            self.logger.info("开始整书KG合并")
             
-            # 使用Merger进行合并
+            # 使用Merger进行合并（逐个小节并入，不要求预先物化全部小节）
             merged_kg = self.merger.merge_book_kg(section_results, book_context)
             
             # 存储整书KG
             store_stats = self.store.store_kg(merged_kg, book_context)
             
-            # 计算合并统计
-            merge_stats = self.merger.calculate_merge_stats(section_results, merged_kg)
+            # 计算合并统计：使用合并过程中累计的小节规模，无需再次遍历小节结果
+            merge_stats = self.merger.merge_stats(merged_kg)
             
             return {
                 "book_id": book_context.get("book_id"),
@@ -160,21 +361,18 @@ class KGPipeline:
     def _apply_thresholds_new(self, kg_data: KGDict) -> KGDict:
         """应用阈值过滤（新版本）"""
         try:
-            # 转换为旧格式以使用现有的阈值逻辑
-            legacy_format = self._kg_dict_to_legacy_format(kg_data)
-            filtered_legacy = self.thresholds.apply_thresholds(legacy_format)
-            
-            # 转换回新格式
-            return self._legacy_format_to_kg_dict(filtered_legacy)
+            return self.thresholds.filter_kg_dict(kg_data)
         except Exception as e:
             self.logger.error(f"应用阈值失败: {e}")
             return kg_data
     
-    def _evaluate_kg_new(self, kg_data: KGDict, input_data: KGPipelineInput) -> Dict[str, Any]:
-        """KG质量评估（新版本）"""
+    def _evaluate_kg_new(self, kg_data: KGDict, input_data: KGPipelineInput,
+                         legacy_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """KG质量评估（新版本）；legacy_format 为调用方已构建的旧格式视图，可避免重复转换"""
         try:
             # 转换为旧格式以使用现有的评估逻辑
-            legacy_format = self._kg_dict_to_legacy_format(kg_data)
+            if legacy_format is None:
+                legacy_format = self._kg_dict_to_legacy_format(kg_data)
             
             # 转换KGPipelineInput为字典格式
             input_dict = {
@@ -220,49 +418,6 @@ class KGPipeline:
             "chapters_covered": kg_data.chapters_covered
         }
     
-    def _legacy_format_to_kg_dict(self, legacy_data: Dict[str, Any]) -> KGDict:
-        """将旧格式转换为KGDict"""
-        from .schemas import KGNode, KGEdge
-        
-        nodes = []
-        for node_data in legacy_data.get("nodes", []):
-            node = KGNode(
-                id=node_data.get("id", ""),
-                name=node_data.get("name", ""),
-                type=node_data.get("type", "Concept"),
-                desc=node_data.get("desc", ""),
-                aliases=node_data.get("aliases", []),
-                scope=node_data.get("scope", ""),
-                created_at=None,
-                updated_at=None
-            )
-            nodes.append(node)
-        
-        edges = []
-        for edge_data in legacy_data.get("edges", []):
-            edge = KGEdge(
-                rid=edge_data.get("rid", ""),
-                type=edge_data.get("type", "RELATED_TO"),
-                source=edge_data.get("source", ""),
-                target=edge_data.get("target", ""),
-                desc=edge_data.get("desc", ""),
-                confidence=edge_data.get("confidence", 0.8),
-                weight=edge_data.get("weight", 1.0),
-                scope=edge_data.get("scope", ""),
-                src_section="",
-                created_at=None
-            )
-            edges.append(edge)
-        
-        return KGDict(
-            nodes=nodes,
-            edges=edges,
-            hierarchy=legacy_data.get("hierarchy", ""),
-            total_nodes=len(nodes),
-            total_edges=len(edges),
-            chapters_covered=legacy_data.get("chapters_covered", [])
-        )
-
     def run_one_subchapter(self, input_data: KGPipelineInput) -> KGPipelineOutput:
         try:
             section_id = generate_section_id(input_data.topic, input_data.chapter_title, input_data.subchapter_title)
@@ -322,9 +477,9 @@ class KGPipeline:
             logger.error(f"RAW KG 构建失败: {e}")
             return {"nodes": [], "edges": [], "hierarchy": ""}
 
-    def _apply_thresholds(self, kg: KGDict) -> KGDict:
+    def _apply_thresholds(self, kg: LegacyKGDict) -> LegacyKGDict:
         try:
-            # KGDict是TypedDict，应该像字典一样访问
+            # 旧流水线的KG是字典（LegacyKGDict），按键访问
             edges = kg["edges"] if kg else []
             nodes = kg["nodes"] if kg else []
             
@@ -344,7 +499,7 @@ class KGPipeline:
             logger.error(f"阈值过滤失败: {e}")
             return kg
 
-    def _store_kg(self, kg: KGDict, section_id: str) -> Dict[str, Any]:
+    def _store_kg(self, kg: LegacyKGDict, section_id: str) -> Dict[str, Any]:
         stats = {"attempted": False, "success": False, "nodes_written": 0, "edges_written": 0, "edges_deleted": 0, "error": None}
         if not self.store:
             stats["error"] = "存储后端未初始化"
@@ -356,39 +511,32 @@ class KGPipeline:
             scope = f"section:{section_id}"
             
             # 优先使用scope删除，如果不支持则回退到src删除
-            try:
+            if self._store_supports_scope_delete:
                 edges_deleted = self.store.delete_edges_by_scope(scope)
-            except (AttributeError, NotImplementedError):
+            else:
                 edges_deleted = self.store.delete_edges_by_src(section_id)
             
             stats["edges_deleted"] = edges_deleted
             
-            # 写入节点
-            nodes_written = 0
-            for node in kg.get("nodes", []):
-                if self.store.merge_node(node):
-                    nodes_written += 1
-            stats["nodes_written"] = nodes_written
+            nodes = kg.get("nodes", [])
             
-            # 写入边，添加scope和rid信息
-            edges_written = 0
-            from .ids import generate_relation_rid
+            # 小节视图关系的scope、rid和src信息：rid一次性批量生成，scope/src为共享属性，
+            # 均随写入参数传递，不再逐条复制边字典
+            edges = kg.get("edges", [])
+            rids = generate_relation_rids_bulk(edges, scope)
+            extra_properties = {"scope": scope, "src": section_id}  # src 兼容保留
             
-            for edge in kg.get("edges", []):
-                # 为小节视图关系添加scope、rid和src信息
-                edge_copy = edge.copy()
-                edge_copy["scope"] = scope
-                edge_copy["src"] = section_id  # 兼容保留
-                
-                # 生成rid
-                edge_type = edge_copy.get("type", "")
-                source_id = edge_copy.get("source_id", "")
-                target_id = edge_copy.get("target_id", "")
-                edge_copy["rid"] = generate_relation_rid(edge_type, source_id, target_id, scope)
-                
-                if self.store.merge_edge(edge_copy):
-                    edges_written += 1
-                    
+            # 优先批量写入（UNWIND），存储不支持时回退为逐条写入
+            if self._store_supports_bulk:
+                nodes_written = self.store.merge_nodes_bulk(nodes)
+                edges_written = self.store.merge_edges_bulk(edges, rids, extra_properties)
+            else:
+                nodes_written = sum(1 for node in nodes if self.store.merge_node(node))
+                edges_written = sum(
+                    1 for edge in with_edge_overrides(edges, rids, extra_properties) if self.store.merge_edge(edge)
+                )
+            
+            stats["nodes_written"] = nodes_written
             stats["edges_written"] = edges_written
             stats["success"] = True
             logger.info(f"KG 存储完成: {nodes_written} 节点, {edges_written} 边, 删除 {edges_deleted} 旧边")
@@ -397,7 +545,7 @@ class KGPipeline:
             logger.error(f"KG 存储失败: {e}")
         return stats
 
-    def _evaluate_kg(self, kg: KGDict, input_data: KGPipelineInput) -> Dict[str, Any]:
+    def _evaluate_kg(self, kg: LegacyKGDict, input_data: KGPipelineInput) -> Dict[str, Any]:
         try:
             structure = self.evaluator.analyze_graph_structure(kg)
             relationships = self.evaluator.extract_node_relationships(kg)
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from dataclasses import dataclass
-from typing import Dict, Any, List, Optional
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Any, FrozenSet, List, Optional, Sequence
 from typing_extensions import TypedDict
 from datetime import datetime
 
+# 短于该长度的节点名称才驻留，避免长名称无限扩大驻留池
+_INTERN_NAME_MAX_LEN = 64
+
 
 class NodeDict(TypedDict):
     id: str
@@ -37,7 +41,8 @@ class EdgeDict(TypedDict):
     updated_at: Optional[str]
 
 
-class KGDict(TypedDict):
+class LegacyKGDict(TypedDict):
+    """旧流水线（run_one_subchapter）使用的字典格式KG；新流水线使用下方的 KGDict 数据类"""
     nodes: List[NodeDict]
     edges: List[EdgeDict]
     hierarchy: Optional[str]
@@ -60,7 +65,7 @@ class KGPipelineInput:
 class KGPipelineOutput:
     section_id: str
     content_hash: str
-    kg_part: KGDict
+    kg_part: LegacyKGDict
     insights: Dict[str, Any]
     store_stats: Dict[str, Any]
 
@@ -73,7 +78,7 @@ class KGInsights(TypedDict):
 
 
 # 新的工程化KG数据结构
-@dataclass
+@dataclass(slots=True)
 class KGNode:
     """知识图谱节点"""
     id: str
@@ -88,9 +93,30 @@ class KGNode:
     def __post_init__(self):
         if self.aliases is None:
             self.aliases = []
-
-
-@dataclass
+        # 类型/范围取自很小的词表，驻留后相同取值共享同一对象，字典键比较走指针快速路径
+        intern = sys.intern
+        if type(self.type) is str:
+            self.type = intern(self.type)
+        if type(self.scope) is str:
+            self.scope = intern(self.scope)
+        if type(self.name) is str and len(self.name) < _INTERN_NAME_MAX_LEN:
+            self.name = intern(self.name)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """浅层字典视图（与 dataclasses.asdict 不同，不递归复制列表/时间对象）"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "desc": self.desc,
+            "aliases": self.aliases,
+            "scope": self.scope,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+@dataclass(slots=True)
 class KGEdge:
     """知识图谱边"""
     rid: str
@@ -103,9 +129,30 @@ class KGEdge:
     scope: str = ""
     src_section: str = ""
     created_at: Optional[datetime] = None
-
-
-@dataclass
+    
+    def __post_init__(self):
+        if type(self.type) is str:
+            self.type = sys.intern(self.type)
+        if type(self.scope) is str:
+            self.scope = sys.intern(self.scope)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """浅层字典视图（与 dataclasses.asdict 不同，不递归复制列表/时间对象）"""
+        return {
+            "rid": self.rid,
+            "type": self.type,
+            "source": self.source,
+            "target": self.target,
+            "desc": self.desc,
+            "confidence": self.confidence,
+            "weight": self.weight,
+            "scope": self.scope,
+            "src_section": self.src_section,
+            "created_at": self.created_at
+        }
+
+
+@dataclass(slots=True)
 class KGDict:
     """知识图谱数据容器"""
     nodes: List[KGNode]
@@ -114,6 +161,8 @@ class KGDict:
     total_nodes: int = 0
     total_edges: int = 0
     chapters_covered: List[str] = None
+    # chapters_covered 的可哈希形式，可直接作为缓存/去重键；未提供时为 None
+    chapters_frozen: Optional[FrozenSet[str]] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if self.chapters_covered is None:
@@ -122,4 +171,29 @@ class KGDict:
             self.total_nodes = len(self.nodes)
         if self.total_edges == 0:
             self.total_edges = len(self.edges)
-
+    
+    def transform(self, node_fns: Sequence[Callable[[KGNode], Optional[KGNode]]],
+                  edge_fns: Sequence[Callable[[KGEdge], Optional[KGEdge]]]) -> "KGDict":
+        """
+        单次遍历依次对每个节点/边应用多个处理阶段，返回新的 KGDict
+        
+        阶段函数返回 None 表示丢弃该项，其后的阶段不再执行。节点全部处理完后
+        才处理边，边阶段可以依赖节点阶段建立的状态（如旧ID到幂等ID的映射）。
+        """
+        nodes: List[KGNode] = []
+        for node in self.nodes:
+            for fn in node_fns:
+                node = fn(node)
+                if node is None:
+                    break
+            else:
+                nodes.append(node)
+        edges: List[KGEdge] = []
+        for edge in self.edges:
+            for fn in edge_fns:
+                edge = fn(edge)
+                if edge is None:
+                    break
+            else:
+                edges.append(edge)
+        return replace(self, nodes=nodes, edges=edges, total_nodes=len(nodes), total_edges=len(edges))
@@ -5,15 +5,142 @@ KG Service - 查询API服务层
 工程化分层设计中的第六层：提供统一的KG查询接口，供前端和其他服务调用
 """
 
+import asyncio
+import copy
+import contextvars
+import functools
+import inspect
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterator, List, Optional, Set, Tuple
 from abc import ABC, abstractmethod
 
+from .cache import register_caching_service, request_cache
+from .cypher import APOC_PROBE_QUERIES
 from .schemas import KGNode, KGEdge, KGDict
 
 
 logger = logging.getLogger(__name__)
 
+# 读接口结果缓存的默认过期时间（秒）；进程级缓存默认关闭（容量为0），由配置 neo4j.read_cache_size 开启
+_READ_CACHE_TTL = 300.0
+# search_nodes 的 limit 向上取整到的档位，不同 limit 的相同查询可共用一条缓存
+_SEARCH_LIMIT_TIERS = (20, 50, 100)
+
+_MISSING = object()
+
+
+class _TTLCache:
+    """线程安全的 LRU + TTL 缓存"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Tuple[Any, ...]) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: Tuple[Any, ...], value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def _configured_read_cache() -> Tuple[int, float]:
+    """配置中的进程级读缓存 (容量, 过期秒数)；未配置或读取失败时为 (0, 默认TTL)，即不缓存"""
+    try:
+        from ...core.settings import get_settings
+        neo4j_settings = get_settings().neo4j
+        return int(neo4j_settings.read_cache_size or 0), float(neo4j_settings.read_cache_ttl or _READ_CACHE_TTL)
+    except Exception as e:
+        logger.debug(f"读取读缓存配置失败，不启用进程级缓存: {e}")
+        return 0, _READ_CACHE_TTL
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _cached_read(func: Optional[Callable] = None, *, ttl: Optional[float] = None) -> Callable:
+    """
+    为读查询加结果缓存：键为 (方法名, 规范化后的全部参数)，同步与 async 方法均可使用
+    
+    被装饰的方法出错时应直接抛出异常，由公开接口捕获并返回空结果，因此失败不会进入缓存；
+    缓存中保存的是结果的副本，命中时再返回一份副本，调用方修改结果不会影响缓存。可用 @_cached_read(ttl=...) 为该方法设置更短的过期时间。
+    """
+    if func is None:
+        return functools.partial(_cached_read, ttl=ttl)
+    signature = inspect.signature(func)
+    
+    def make_key(self, args, kwargs) -> Optional[Tuple[Any, ...]]:
+        if self._read_cache is None and request_cache.get() is None:
+            return None
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + tuple(_freeze(v) for v in list(bound.arguments.values())[1:])
+        try:
+            hash(key)
+        except TypeError:
+            # 参数不可哈希时直接查询
+            return None
+        return key
+    
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            key = make_key(self, args, kwargs)
+            if key is None:
+                return await func(self, *args, **kwargs)
+            result = self._cache_get(key)
+            if result is _MISSING:
+                result = await func(self, *args, **kwargs)
+                self._cache_put(key, result, ttl)
+            return result
+        
+        return async_wrapper
+    
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        key = make_key(self, args, kwargs)
+        if key is None:
+            return func(self, *args, **kwargs)
+        result = self._cache_get(key)
+        if result is _MISSING:
+            result = func(self, *args, **kwargs)
+            self._cache_put(key, result, ttl)
+        return result
+    
+    return wrapper
+
 
 class BaseKGService(ABC):
     """KG服务基类"""
@@ -37,35 +164,596 @@ class BaseKGService(ABC):
     def search_nodes(self, query: str, scope: str = None, node_types: List[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
         """搜索节点"""
         pass
+    
+    def get_nodes_detail(self, node_ids: List[str], scope: str = None) -> Dict[str, Dict[str, Any]]:
+        """批量获取节点详情（ID -> 详情）；默认逐个调用 get_node_detail"""
+        details = {}
+        for node_id in dict.fromkeys(node_ids):
+            detail = self.get_node_detail(node_id, scope)
+            if detail:
+                details[node_id] = detail
+        return details
+    
+    def get_edges_detail(self, edge_rids: List[str], scope: str = None) -> Dict[str, Dict[str, Any]]:
+        """批量获取关系详情（rid -> 详情）；默认逐个调用 get_edge_detail"""
+        details = {}
+        for edge_rid in dict.fromkeys(edge_rids):
+            detail = self.get_edge_detail(edge_rid, scope)
+            if detail:
+                details[edge_rid] = detail
+        return details
+    
+    def get_book_stats(self, book_id: str) -> Dict[str, Any]:
+        """获取整书统计信息；默认不提供"""
+        return {}
+    
+    def get_page_data(self, node_id: str, scope: str = None, max_depth: int = 2, limit: int = 50) -> Dict[str, Any]:
+        """
+        一次取齐实体页面所需数据：节点详情、子图与整书统计（scope 即书的范围标识）
+        
+        默认依次查询；Neo4j 实现会并发执行三个互不依赖的查询。
+        """
+        return {
+            "node": self.get_node_detail(node_id, scope),
+            "subgraph": self.get_subgraph(node_id, scope, max_depth, limit),
+            "book_stats": self.get_book_stats(scope),
+        }
+
+
+_NODES_DETAIL_QUERY = """
+UNWIND $node_ids AS nid
+MATCH (n)
+WHERE n.id = nid AND ($scope IS NULL OR n.scope = $scope)
+OPTIONAL MATCH (c:Chunk)-[:MENTIONS]->(n)
+WITH nid, n, collect(DISTINCT c.id)[..10] AS chunk_ids, count(DISTINCT c) AS evidence_count
+RETURN nid, n.id AS id, n.name AS name, labels(n)[0] AS type, coalesce(n.desc, '') AS description,
+       coalesce(n.aliases, []) AS aliases, n.scope AS scope, n.created_at AS created_at,
+       n.updated_at AS updated_at, chunk_ids, evidence_count
+"""
+
+_EDGES_DETAIL_QUERY = """
+UNWIND $edge_rids AS rid
+MATCH (source)-[r]->(target)
+WHERE r.rid = rid AND ($scope IS NULL OR r.scope = $scope)
+RETURN rid, r.rid AS erid, type(r) AS rel_type, coalesce(r.desc, '') AS description,
+       coalesce(r.confidence, 0.0) AS confidence, coalesce(r.weight, 1.0) AS weight,
+       r.scope AS scope, r.src_section AS src_section, r.created_at AS created_at,
+       source.id AS sid, source.name AS sname, labels(source)[0] AS stype,
+       target.id AS tid, target.name AS tname, labels(target)[0] AS ttype
+"""
+
+# 节点与关系分别在独立子查询中聚合，避免两路匹配先做笛卡尔积再 DISTINCT（O(|V|·|E|)）
+_BOOK_STATS_QUERY = """
+CALL {
+    MATCH (n) WHERE n.scope = $book_id
+    RETURN count(n) as total_nodes, collect(DISTINCT labels(n)) as node_types
+}
+CALL {
+    MATCH ()-[r]->() WHERE r.scope = $book_id
+    RETURN count(r) as total_edges, collect(DISTINCT type(r)) as edge_types
+}
+RETURN total_nodes, total_edges, node_types, edge_types
+"""
+# 整书统计变化缓慢但聚合代价高，缓存时长单独设置（不超过实例的 cache_ttl）
+_BOOK_STATS_CACHE_TTL = 60.0
 
 
-class Neo4jKGService(BaseKGService):
+# 子图结果的列式（SoA）投影：邻居/关系在服务端去重并展开为基本类型数组，
+# 驱动无需逐个反序列化 Node/Relationship 结构；ns 为去除中心后的邻居，rs 为去重后的关系。
+# 每个邻居附带至多5个证据 Chunk ID，客户端无需再逐个查询节点详情
+_SUBGRAPH_RETURN = """
+RETURN center.id as cid,
+       center.name as cname,
+       labels(center)[0] as ctype,
+       center.desc as cdesc,
+       center_chunk_ids,
+       [n IN ns | n.id] as nids,
+       [n IN ns | n.name] as nnames,
+       [n IN ns | labels(n)[0]] as ntypes,
+       [n IN ns | coalesce(n.desc, '')] as ndescs,
+       [n IN ns | [(c:Chunk)-[:MENTIONS]->(n) | c.id][..5]] as nchunks,
+       [x IN rs | x.rid] as erids,
+       [x IN rs | type(x)] as etypes,
+       [x IN rs | startNode(x).id] as esources,
+       [x IN rs | endNode(x).id] as etargets,
+       [x IN rs | coalesce(x.desc, '')] as edescs,
+       [x IN rs | coalesce(x.confidence, 0.0)] as econfs,
+       [x IN rs | coalesce(x.weight, 1.0)] as eweights
+"""
+
+# APOC 子图展开：由 apoc.path.subgraphAll 按层 BFS 并返回去重后的节点/关系，
+# 避免变长路径模式在深度>=2时按路径组合爆炸
+_APOC_SUBGRAPH_QUERY = """
+MATCH (center)
+WHERE center.id = $center_node AND ($scope IS NULL OR center.scope = $scope)
+OPTIONAL MATCH (c:Chunk)-[:MENTIONS]->(center)
+WITH center, collect(DISTINCT c.id)[..10] AS center_chunk_ids
+CALL apoc.path.subgraphAll(center, {maxLevel: $max_depth, limit: $limit})
+YIELD nodes, relationships
+WITH center, center_chunk_ids,
+     [n IN nodes WHERE n.id <> center.id] AS ns,
+     [rel IN relationships WHERE $scope IS NULL OR rel.scope = $scope] AS rs
+""" + _SUBGRAPH_RETURN
+
+# 变长路径的深度无法参数化，按深度生成一次后复用（文本固定，服务端查询计划缓存可命中）；
+# 路径展开为逐条关系后直接 collect(DISTINCT)，共享前缀的路径不再重复传回各自的关系列表
+_VARLEN_SUBGRAPH_TEMPLATE = """
+MATCH (center)
+WHERE center.id = $center_node AND ($scope IS NULL OR center.scope = $scope)
+OPTIONAL MATCH (c:Chunk)-[:MENTIONS]->(center)
+WITH center, collect(DISTINCT c.id)[..10] AS center_chunk_ids
+MATCH path = (center)-[r*1..{max_depth}]-(neighbor)
+WHERE ALL(rel in relationships(path) WHERE $scope IS NULL OR rel.scope = $scope)
+WITH center, center_chunk_ids, path, neighbor
+LIMIT $limit
+UNWIND relationships(path) AS rel
+WITH center, center_chunk_ids, collect(DISTINCT neighbor) as neighbors, collect(DISTINCT rel) as rs
+WITH center, center_chunk_ids, [n IN neighbors WHERE n.id <> center.id] AS ns, rs
+""" + _SUBGRAPH_RETURN
+
+
+@functools.lru_cache(maxsize=16)
+def _varlen_subgraph_query(max_depth: int, has_scope: bool = True) -> str:
+    return _specialize_query(_VARLEN_SUBGRAPH_TEMPLATE.format(max_depth=int(max_depth)), has_scope, False)
+
+
+# 搜索结果只返回所需属性与首个标签，不传回完整 Node 结构
+_SEARCH_NODE_COLUMNS = "n.id AS id, n.name AS name, labels(n)[0] AS type, coalesce(n.desc, '') AS description, coalesce(n.aliases, []) AS aliases, n.scope AS scope"
+
+# 名称子串匹配（全文索引不存在时的回退查询）；name_lc/aliases_lc 为写入时维护的小写镜像
+_CONTAINS_SEARCH_QUERY = """
+MATCH (n)
+WHERE (n.name_lc CONTAINS $query OR ANY(alias in n.aliases_lc WHERE alias CONTAINS $query))
+  AND ($scope IS NULL OR n.scope = $scope)
+  AND ($types IS NULL OR ANY(l IN labels(n) WHERE l IN $types))
+RETURN """ + _SEARCH_NODE_COLUMNS + """
+ORDER BY 
+    CASE WHEN n.name_lc = $query THEN 1 ELSE 2 END,
+    CASE WHEN n.name_lc STARTS WITH $query THEN 1 ELSE 2 END,
+    n.name
+LIMIT $limit
+"""
+
+# Chunk 反查实体及其两跳内的关系路径（带证据）
+_CHUNK_ENTITIES_QUERY = """
+MATCH (c:Chunk)-[:MENTIONS]->(e)
+WHERE c.id = $chunk_id AND ($scope IS NULL OR e.scope = $scope)
+OPTIONAL MATCH path = (e)-[r*1..2]-(related)
+WHERE ALL(rel in relationships(path) WHERE $scope IS NULL OR rel.scope = $scope)
+RETURN e.id AS id,
+       e.name AS name,
+       labels(e)[0] AS type,
+       coalesce(e.desc, '') AS description,
+       collect(DISTINCT path) as paths
+LIMIT $limit
+"""
+
+# 名称全文索引检索：索引在写入时完成分词与小写化，按相关度取候选后仍优先完全匹配、前缀匹配
+_FULLTEXT_SEARCH_QUERY = """
+CALL db.index.fulltext.queryNodes('node_name_fts', $q) YIELD node AS n, score
+WHERE ($scope IS NULL OR n.scope = $scope)
+  AND ($types IS NULL OR ANY(l IN labels(n) WHERE l IN $types))
+RETURN """ + _SEARCH_NODE_COLUMNS + """
+ORDER BY 
+    CASE WHEN n.name_lc = $query THEN 1 ELSE 2 END,
+    CASE WHEN n.name_lc STARTS WITH $query THEN 1 ELSE 2 END,
+    score DESC,
+    n.name
+LIMIT $limit
+"""
+
+# 全文索引（或全文检索过程）不存在时的错误特征：此时才改用 CONTAINS 查询，并在一段时间后重试
+_FULLTEXT_MISSING_MARKERS = ("no such fulltext schema index", "no such index", "procedurenotfound")
+_FULLTEXT_RETRY_INTERVAL = 300.0
+
+_LUCENE_SPECIAL_CHARS = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|])')
+
+
+def _lucene_query(text: str) -> str:
+    """
+    将用户输入转换为 Lucene 查询：每个词匹配完整词（短语，兼容被逐字切分的中文）或其前缀，词与词之间为 AND
+    
+    特殊字符全部转义；输入不含任何词时返回空串。
+    """
+    terms = []
+    for term in text.split():
+        escaped = _LUCENE_SPECIAL_CHARS.sub(r"\\\1", term)
+        terms.append(f'("{escaped}" OR {escaped}*)')
+    return " AND ".join(terms)
+
+
+# 可选过滤条件的通用写法：$scope/$types 为 null 时整个分支恒真
+_SCOPE_BRANCH = re.compile(r"\$scope IS NULL OR ([\w.]+ = \$scope)")
+_TYPES_BRANCH = re.compile(r"\$types IS NULL OR (ANY\(l IN labels\(n\) WHERE l IN \$types\))")
+
+
+def _specialize_query(query: str, has_scope: bool, has_types: bool) -> str:
+    """
+    按过滤条件是否给定对查询做部分求值：去掉 `$x IS NULL OR ...` 分支
+    
+    给定时只保留过滤谓词（仍通过参数传值），未给定时替换为 true。
+    不同组合的查询文本不同，服务端分别缓存各自更紧凑的执行计划。
+    """
+    query = _SCOPE_BRANCH.sub(r"\1" if has_scope else "true", query)
+    return _TYPES_BRANCH.sub(r"\1" if has_types else "true", query)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_queries(has_scope: bool, has_types: bool) -> Dict[str, str]:
+    """返回按 scope/类型过滤组合特化后的查询文本（方法名 -> Cypher），每种组合只生成一次"""
+    return {
+        name: _specialize_query(query, has_scope, has_types)
+        for name, query in (
+            ("nodes_detail", _NODES_DETAIL_QUERY),
+            ("edges_detail", _EDGES_DETAIL_QUERY),
+            ("apoc_subgraph", _APOC_SUBGRAPH_QUERY),
+            ("contains_search", _CONTAINS_SEARCH_QUERY),
+            ("fulltext_search", _FULLTEXT_SEARCH_QUERY),
+            ("chunk_entities", _CHUNK_ENTITIES_QUERY),
+        )
+    }
+
+
+# Chunk 反查结果中返回的最大路径数
+_CHUNK_PATHS_LIMIT = 20
+
+_APOC_SUBGRAPH_PROCEDURE = "apoc.path.subgraphAll"
+
+
+class _Neo4jKGServiceBase(BaseKGService):
+    """
+    Neo4j KG服务的公共部分：Cypher构建、结果解析与读缓存
+    
+    同步/异步实现只负责执行查询（_run），查询与解析逻辑两者共用。
+    """
+    
+    # APOC 是否可用；None 表示尚未探测，首次获取子图时探测一次
+    _apoc_available: Optional[bool] = None
+    # 名称全文索引不存在时改用 CONTAINS 扫描，到该时刻（monotonic）后再尝试全文索引
+    _fulltext_retry_at: float = 0.0
+    
+    def _init_read_cache(self, cache_size: Optional[int], cache_ttl: Optional[float]) -> None:
+        if cache_size is None or cache_ttl is None:
+            configured_size, configured_ttl = _configured_read_cache()
+            cache_size = configured_size if cache_size is None else cache_size
+            cache_ttl = configured_ttl if cache_ttl is None else cache_ttl
+        self._read_cache: Optional[_TTLCache] = None
+        if cache_size > 0 and cache_ttl > 0:
+            self._read_cache = _TTLCache(cache_size, cache_ttl)
+            register_caching_service(self)
+    
+    def _cache_get(self, key: Tuple[Any, ...]) -> Any:
+        """先查请求级缓存，再查进程级缓存；进程级命中时同时记入请求级缓存"""
+        local = request_cache.get()
+        local_key = (id(self),) + key
+        if local is not None:
+            result = local.get(local_key, _MISSING)
+            if result is not _MISSING:
+                return copy.deepcopy(result)
+        result = self._read_cache.get(key) if self._read_cache is not None else _MISSING
+        if result is _MISSING:
+            return result
+        if local is not None:
+            local[local_key] = result
+        return copy.deepcopy(result)
+    
+    def _cache_put(self, key: Tuple[Any, ...], value: Any, ttl: Optional[float] = None) -> None:
+        # 缓存保存独立副本：调用方随后修改返回值不会污染缓存
+        value = copy.deepcopy(value)
+        local = request_cache.get()
+        if local is not None:
+            local[(id(self),) + key] = value
+        if self._read_cache is not None:
+            self._read_cache.put(key, value, ttl)
+    
+    def clear_cache(self) -> None:
+        """清空本实例的读缓存"""
+        if self._read_cache is not None:
+            self._read_cache.clear()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """读缓存统计（条目数、命中/未命中次数）；未启用缓存时为空"""
+        return self._read_cache.stats() if self._read_cache is not None else {}
+    
+    def _lookup_cached(self, kind: str, ids: List[str], scope: Optional[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """从读缓存取出已缓存的详情，返回 (命中的详情, 去重后仍需查询的ID)"""
+        details: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for item_id in dict.fromkeys(ids):
+            if not item_id:
+                continue
+            cached = self._cache_get((kind, item_id, scope))
+            if cached is _MISSING:
+                missing.append(item_id)
+            else:
+                details[item_id] = cached
+        return details, missing
+    
+    def _store_cached(self, kind: str, details: Dict[str, Dict[str, Any]], scope: Optional[str]) -> None:
+        for item_id, detail in details.items():
+            self._cache_put((kind, item_id, scope), detail)
+    
+    @staticmethod
+    def _first_by(records, key: str, parse: Callable[[Any], Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """按 key 列归并记录；同一ID匹配到多条时与单个查询一致，只取第一条"""
+        found: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            if record[key] not in found:
+                found[record[key]] = parse(record)
+        return found
+    
+    @staticmethod
+    def _node_detail_from_record(record) -> Dict[str, Any]:
+        return {
+            "id": record["id"],
+            "name": record["name"],
+            "type": record["type"] or "Unknown",
+            "desc": record["description"],
+            "aliases": record["aliases"],
+            "scope": record["scope"],
+            "created_at": record["created_at"],
+            "updated_at": record["updated_at"],
+            "chunk_ids": record["chunk_ids"],
+            "evidence_count": record["evidence_count"]
+        }
+    
+    @staticmethod
+    def _edge_detail_from_record(record) -> Dict[str, Any]:
+        return {
+            "rid": record["erid"],
+            "type": record["rel_type"],
+            "desc": record["description"],
+            "confidence": record["confidence"],
+            "weight": record["weight"],
+            "scope": record["scope"],
+            "src_section": record["src_section"],
+            "created_at": record["created_at"],
+            "source": {
+                "id": record["sid"],
+                "name": record["sname"],
+                "type": record["stype"] or "Unknown"
+            },
+            "target": {
+                "id": record["tid"],
+                "name": record["tname"],
+                "type": record["ttype"] or "Unknown"
+            }
+        }
+    
+    @staticmethod
+    def _subgraph_query(center_node: str, scope: Optional[str], max_depth: int, limit: int,
+                        use_apoc: bool = False) -> Tuple[str, Dict[str, Any]]:
+        # 所有参数总是传入（scope 未指定时为 null），查询文本只随是否给定 scope 变化
+        params = {"center_node": center_node, "max_depth": max_depth, "limit": limit, "scope": scope or None}
+        if use_apoc:
+            return _compile_queries(bool(scope), False)["apoc_subgraph"], params
+        return _varlen_subgraph_query(max_depth, bool(scope)), params
+    
+    @staticmethod
+    def _subgraph_from_records(records, center_node: str) -> Dict[str, Any]:
+        record = next(iter(records), None)
+        if record is None:
+            return {"nodes": [], "edges": []}
+        
+        # 处理节点：各列逐项对齐，直接 zip 组装
+        nodes = [{
+            "id": record["cid"],
+            "name": record["cname"],
+            "type": record["ctype"] or "Unknown",
+            "desc": record["cdesc"] if record["cdesc"] is not None else "",
+            "chunk_ids": record["center_chunk_ids"],
+            "is_center": True
+        }]
+        nodes.extend(
+            {"id": nid, "name": name, "type": ntype or "Unknown", "desc": desc, "chunk_ids": chunk_ids, "is_center": False}
+            for nid, name, ntype, desc, chunk_ids in zip(
+                record["nids"], record["nnames"], record["ntypes"], record["ndescs"], record["nchunks"]
+            )
+        )
+        
+        # 处理关系
+        edges = [
+            {"rid": rid, "type": etype, "source": source, "target": target,
+             "desc": desc, "confidence": confidence, "weight": weight}
+            for rid, etype, source, target, desc, confidence, weight in zip(
+                record["erids"], record["etypes"], record["esources"], record["etargets"],
+                record["edescs"], record["econfs"], record["eweights"]
+            )
+        ]
+        
+        return {
+            "center_node": center_node,
+            "nodes": nodes,
+            "edges": edges,
+            "total_nodes": len(nodes),
+            "total_edges": len(edges)
+        }
+    
+    @staticmethod
+    def _search_limit_tier(limit: int) -> int:
+        # limit 取整到档位后截断，不同 limit 的相同查询共用缓存
+        return next((t for t in _SEARCH_LIMIT_TIERS if t >= limit), limit)
+    
+    @staticmethod
+    def _fulltext_search_query(query: str, scope: Optional[str], node_types: Optional[List[str]], limit: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """全文索引版本的搜索查询；查询不含可检索的词时返回 None"""
+        lucene = _lucene_query(query)
+        if not lucene:
+            return None
+        params = {
+            "q": lucene,
+            "query": query,
+            "scope": scope or None,
+            "types": list(node_types) if node_types else None,
+            "limit": limit,
+        }
+        return _compile_queries(bool(scope), bool(node_types))["fulltext_search"], params
+    
+    def _search_plan(self, query: str, scope: Optional[str], node_types: Optional[List[str]], limit: int
+                     ) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], Tuple[str, Dict[str, Any]]]:
+        """
+        搜索的 (全文索引查询, CONTAINS 查询)；同步/异步实现共用
+        
+        先执行全文索引查询；仅当其因索引缺失失败（_fulltext_failed 返回）时才执行 CONTAINS 查询。
+        全文索引暂不可用或查询不含可检索的词时，第一项为 None，直接执行 CONTAINS 查询。
+        """
+        fulltext = None
+        if time.monotonic() >= self._fulltext_retry_at:
+            fulltext = self._fulltext_search_query(query, scope, node_types, limit)
+        return fulltext, self._search_query(query, scope, node_types, limit)
+    
+    def _fulltext_failed(self, error: Exception) -> None:
+        """
+        全文索引查询失败：索引（或全文检索过程）不存在时暂停使用并返回，由调用方改用 CONTAINS 查询；
+        其他错误（连接中断等瞬时错误）原样抛出，不影响之后的全文检索
+        """
+        text = f"{getattr(error, 'code', '') or ''} {error}".lower()
+        if not any(marker in text for marker in _FULLTEXT_MISSING_MARKERS):
+            raise error
+        self.logger.warning(f"名称全文索引不可用，{_FULLTEXT_RETRY_INTERVAL:.0f}秒内改用 CONTAINS 查询: {error}")
+        self._fulltext_retry_at = time.monotonic() + _FULLTEXT_RETRY_INTERVAL
+    
+    @staticmethod
+    def _search_query(query: str, scope: Optional[str], node_types: Optional[List[str]], limit: int) -> Tuple[str, Dict[str, Any]]:
+        params = {
+            "query": query,
+            "scope": scope or None,
+            "types": list(node_types) if node_types else None,
+            "limit": limit,
+        }
+        return _compile_queries(bool(scope), bool(node_types))["contains_search"], params
+    
+    @staticmethod
+    def _search_from_records(records) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": record["id"],
+                "name": record["name"],
+                "type": record["type"] or "Unknown",
+                "desc": record["description"],
+                "aliases": record["aliases"],
+                "scope": record["scope"]
+            }
+            for record in records
+        ]
+    
+    @staticmethod
+    def _chunk_entities_query(chunk_id: str, scope: Optional[str], limit: int) -> Tuple[str, Dict[str, Any]]:
+        return _compile_queries(bool(scope), False)["chunk_entities"], {"chunk_id": chunk_id, "scope": scope or None, "limit": limit}
+    
+    @staticmethod
+    def _chunk_entities_from_records(records, chunk_id: str) -> Dict[str, Any]:
+        """逐条消费记录（可为流式迭代器）：路径按经过的节点与关系类型去重，凑满上限后不再解析"""
+        entities = []
+        all_paths = []
+        seen_paths = set()
+        
+        for record in records:
+            entities.append({
+                "id": record["id"],
+                "name": record["name"],
+                "type": record["type"] or "Unknown",
+                "desc": record["description"]
+            })
+            
+            # 处理路径
+            if len(all_paths) >= _CHUNK_PATHS_LIMIT:
+                continue
+            for path in record["paths"]:
+                if not path:  # 确保路径不为空
+                    continue
+                path_nodes = [{"id": n.get("id"), "name": n.get("name")} for n in path.nodes]
+                key = (tuple(n["id"] for n in path_nodes), tuple(r.type for r in path.relationships))
+                if key in seen_paths:
+                    continue
+                seen_paths.add(key)
+                all_paths.append({
+                    "length": len(path.relationships),
+                    "nodes": path_nodes,
+                    "relationships": [{"type": r.type, "desc": r.get("desc", "")} for r in path.relationships]
+                })
+                if len(all_paths) >= _CHUNK_PATHS_LIMIT:
+                    break
+        
+        return {
+            "chunk_id": chunk_id,
+            "entities": entities,
+            "paths": all_paths,
+            "total_entities": len(entities)
+        }
+    
+    @staticmethod
+    def _book_stats_from_records(records, book_id: str) -> Dict[str, Any]:
+        record = next(iter(records), None)
+        if record is None:
+            return {}
+        return {
+            "book_id": book_id,
+            "total_nodes": record["total_nodes"],
+            "total_edges": record["total_edges"],
+            "node_types": [t for types in record["node_types"] for t in types if types],
+            "edge_types": [t for t in record["edge_types"] if t]
+        }
+
+
+class Neo4jKGService(_Neo4jKGServiceBase):
     """基于Neo4j的KG服务实现"""
     
-    def __init__(self, neo4j_client=None):
+    def __init__(self, neo4j_client=None, cache_size: Optional[int] = None, cache_ttl: Optional[float] = None):
+        """
+        Args:
+            neo4j_client: Neo4j客户端，未提供时按配置创建
+            cache_size: 读接口结果缓存的最大条目数；未提供时取配置 neo4j.read_cache_size（默认0）
+            cache_ttl: 缓存过期时间（秒），未提供时取配置 neo4j.read_cache_ttl；cache_size 或 cache_ttl 不大于0时不缓存
+        """
         self.neo4j_client = neo4j_client
         self.logger = logging.getLogger(__name__)
+        self._init_read_cache(cache_size, cache_ttl)
         
         if not self.neo4j_client:
             self._initialize_client()
+        # 每次查询显式指定数据库，省去会话打开时的路由查询
+        self.database = getattr(self.neo4j_client, "database", None)
     
     def _initialize_client(self):
         """初始化Neo4j客户端"""
         try:
-            from ...infrastructure.graph_store.neo4j_client import Neo4jClient
+            from ...infrastructure.graph_store.neo4j_client import driver_options_from_settings, get_shared_client
             from ...core.settings import get_settings
             
             settings = get_settings()
-            self.neo4j_client = Neo4jClient(
+            self.neo4j_client = get_shared_client(
                 uri=settings.neo4j.uri,
                 user=settings.neo4j.user,
                 password=settings.neo4j.password,
-                database=settings.neo4j.database
+                database=settings.neo4j.database,
+                **driver_options_from_settings(settings.neo4j),
             )
+            if self.neo4j_client is None:
+                self.logger.error("Failed to initialize Neo4j client: connection failed")
+                return
             self.logger.info("Neo4j KG Service initialized")
         except Exception as e:
             self.logger.error(f"Failed to initialize Neo4j client: {e}")
             self.neo4j_client = None
+            return
+        
+        self._ensure_indexes()
+    
+    def _ensure_indexes(self):
+        """确保查询依赖的约束和索引存在，id/rid/scope/name 过滤走索引查找而非全标签扫描"""
+        try:
+            from .store import Neo4jKGStore
+            Neo4jKGStore(self.neo4j_client).ensure_indexes()
+        except Exception as e:
+            self.logger.warning(f"确保Neo4j索引失败: {e}")
+    
+    def _run(self, query: str, params: Dict[str, Any]) -> list:
+        return self.neo4j_client.execute_query(query, params, database=self.database).records
+    
+    def _stream(self, query: str, params: Dict[str, Any]) -> Iterator[Any]:
+        """逐条产出记录，解析函数边读边处理，不物化完整结果列表"""
+        return self.neo4j_client.execute_query_stream(query, params, database=self.database)
     
     def get_node_detail(self, node_id: str, scope: str = None) -> Optional[Dict[str, Any]]:
         """
@@ -78,53 +766,36 @@ class Neo4jKGService(BaseKGService):
         Returns:
             Dict: 节点详情，包含基本信息 + 来源Section + 证据Chunk IDs
         """
-        if not self.neo4j_client or not node_id:
+        if not node_id:
             return None
+        return self.get_nodes_detail([node_id], scope).get(node_id)
+    
+    def get_nodes_detail(self, node_ids: List[str], scope: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取节点详情，所有未缓存的ID在一次 UNWIND 查询中解析
         
-        try:
-            # 构建查询
-            where_clause = "n.id = $node_id"
-            params = {"node_id": node_id}
-            
-            if scope:
-                where_clause += " AND n.scope = $scope"
-                params["scope"] = scope
-            
-            query = f"""
-            MATCH (n)
-            WHERE {where_clause}
-            OPTIONAL MATCH (c:Chunk)-[:MENTIONS]->(n)
-            RETURN n,
-                   labels(n) as node_labels,
-                   collect(DISTINCT c.id)[..10] as chunk_ids,
-                   count(DISTINCT c) as evidence_count
-            LIMIT 1
-            """
-            
-            result = self.neo4j_client.execute_query(query, params)
-            
-            if not result.records:
-                return None
-            
-            record = result.records[0]
-            node = record["n"]
-            
-            return {
-                "id": node.get("id"),
-                "name": node.get("name"),
-                "type": record["node_labels"][0] if record["node_labels"] else "Unknown",
-                "desc": node.get("desc", ""),
-                "aliases": node.get("aliases", []),
-                "scope": node.get("scope"),
-                "created_at": node.get("created_at"),
-                "updated_at": node.get("updated_at"),
-                "chunk_ids": record["chunk_ids"],
-                "evidence_count": record["evidence_count"]
-            }
+        Args:
+            node_ids: 节点ID列表
+            scope: 范围限制（Book Scope）
             
+        Returns:
+            Dict: 节点ID -> 节点详情；不存在的ID不出现在结果中
+        """
+        if not self.neo4j_client or not node_ids:
+            return {}
+        
+        details, missing = self._lookup_cached("node_detail", node_ids, scope)
+        if not missing:
+            return details
+        
+        try:
+            records = self._stream(_compile_queries(bool(scope), False)["nodes_detail"], {"node_ids": missing, "scope": scope or None})
+            found = self._first_by(records, "nid", self._node_detail_from_record)
+            self._store_cached("node_detail", found, scope)
+            details.update(found)
         except Exception as e:
             self.logger.error(f"获取节点详情失败: {e}")
-            return None
+        return details
     
     def get_edge_detail(self, edge_rid: str, scope: str = None) -> Optional[Dict[str, Any]]:
         """
@@ -137,58 +808,36 @@ class Neo4jKGService(BaseKGService):
         Returns:
             Dict: 关系详情，包含confidence、weight、解释路径
         """
-        if not self.neo4j_client or not edge_rid:
+        if not edge_rid:
             return None
+        return self.get_edges_detail([edge_rid], scope).get(edge_rid)
+    
+    def get_edges_detail(self, edge_rids: List[str], scope: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取关系详情，所有未缓存的rid在一次 UNWIND 查询中解析
         
-        try:
-            where_clause = "r.rid = $edge_rid"
-            params = {"edge_rid": edge_rid}
-            
-            if scope:
-                where_clause += " AND r.scope = $scope"
-                params["scope"] = scope
-            
-            query = f"""
-            MATCH (source)-[r]->(target)
-            WHERE {where_clause}
-            RETURN r, source, target, type(r) as rel_type
-            LIMIT 1
-            """
-            
-            result = self.neo4j_client.execute_query(query, params)
-            
-            if not result.records:
-                return None
-            
-            record = result.records[0]
-            rel = record["r"]
-            source = record["source"]
-            target = record["target"]
-            
-            return {
-                "rid": rel.get("rid"),
-                "type": record["rel_type"],
-                "desc": rel.get("desc", ""),
-                "confidence": rel.get("confidence", 0.0),
-                "weight": rel.get("weight", 1.0),
-                "scope": rel.get("scope"),
-                "src_section": rel.get("src_section"),
-                "created_at": rel.get("created_at"),
-                "source": {
-                    "id": source.get("id"),
-                    "name": source.get("name"),
-                    "type": list(source.labels)[0] if source.labels else "Unknown"
-                },
-                "target": {
-                    "id": target.get("id"),
-                    "name": target.get("name"),
-                    "type": list(target.labels)[0] if target.labels else "Unknown"
-                }
-            }
+        Args:
+            edge_rids: 关系ID列表
+            scope: 范围限制
             
+        Returns:
+            Dict: rid -> 关系详情；不存在的rid不出现在结果中
+        """
+        if not self.neo4j_client or not edge_rids:
+            return {}
+        
+        details, missing = self._lookup_cached("edge_detail", edge_rids, scope)
+        if not missing:
+            return details
+        
+        try:
+            records = self._stream(_compile_queries(bool(scope), False)["edges_detail"], {"edge_rids": missing, "scope": scope or None})
+            found = self._first_by(records, "rid", self._edge_detail_from_record)
+            self._store_cached("edge_detail", found, scope)
+            details.update(found)
         except Exception as e:
             self.logger.error(f"获取关系详情失败: {e}")
-            return None
+        return details
     
     def get_subgraph(self, center_node: str, scope: str = None, max_depth: int = 2, limit: int = 50) -> Dict[str, Any]:
         """
@@ -207,87 +856,33 @@ class Neo4jKGService(BaseKGService):
             return {"nodes": [], "edges": []}
         
         try:
-            where_clause = "center.id = $center_node"
-            params = {"center_node": center_node, "max_depth": max_depth, "limit": limit}
-            
-            if scope:
-                where_clause += " AND center.scope = $scope"
-                params["scope"] = scope
-            
-            # 实体邻接子图查询（带证据）
-            query = f"""
-            MATCH (center)
-            WHERE {where_clause}
-            OPTIONAL MATCH (c:Chunk)-[:MENTIONS]->(center)
-            WITH center, collect(DISTINCT c.id)[..10] AS center_chunk_ids
-            MATCH path = (center)-[r*1..{max_depth}]-(neighbor)
-            WHERE ALL(rel in relationships(path) WHERE 
-                      (NOT $scope IS NULL) = (rel.scope = $scope OR $scope IS NULL))
-            WITH center, center_chunk_ids, path, neighbor, relationships(path) as rels
-            LIMIT $limit
-            RETURN center,
-                   center_chunk_ids,
-                   collect(DISTINCT neighbor) as neighbors,
-                   collect(DISTINCT path) as paths,
-                   collect(DISTINCT rels) as all_rels
-            """
-            
-            result = self.neo4j_client.execute_query(query, params)
-            
-            if not result.records:
-                return {"nodes": [], "edges": []}
-            
-            record = result.records[0]
-            
-            # 处理节点
-            nodes = []
-            center = record["center"]
-            nodes.append({
-                "id": center.get("id"),
-                "name": center.get("name"),
-                "type": list(center.labels)[0] if center.labels else "Unknown",
-                "desc": center.get("desc", ""),
-                "chunk_ids": record["center_chunk_ids"],
-                "is_center": True
-            })
-            
-            # 添加邻居节点
-            for neighbor in record["neighbors"]:
-                if neighbor.get("id") != center.get("id"):
-                    nodes.append({
-                        "id": neighbor.get("id"),
-                        "name": neighbor.get("name"),
-                        "type": list(neighbor.labels)[0] if neighbor.labels else "Unknown",
-                        "desc": neighbor.get("desc", ""),
-                        "is_center": False
-                    })
-            
-            # 处理关系
-            edges = []
-            for rel_group in record["all_rels"]:
-                for rel in rel_group:
-                    edges.append({
-                        "rid": rel.get("rid"),
-                        "type": rel.type,
-                        "source": rel.start_node.get("id"),
-                        "target": rel.end_node.get("id"),
-                        "desc": rel.get("desc", ""),
-                        "confidence": rel.get("confidence", 0.0),
-                        "weight": rel.get("weight", 1.0)
-                    })
-            
-            return {
-                "center_node": center_node,
-                "nodes": nodes,
-                "edges": edges,
-                "total_nodes": len(nodes),
-                "total_edges": len(edges)
-            }
-            
+            return self._fetch_subgraph(center_node, scope, max_depth, limit)
         except Exception as e:
             self.logger.error(f"获取子图失败: {e}")
             return {"nodes": [], "edges": []}
     
+    @_cached_read
+    def _fetch_subgraph(self, center_node: str, scope: Optional[str], max_depth: int, limit: int) -> Dict[str, Any]:
+        if self._apoc_available is None:
+            self._apoc_available = self._detect_apoc()
+        if self._apoc_available:
+            query, params = self._subgraph_query(center_node, scope, max_depth, limit, use_apoc=True)
+            try:
+                return self._subgraph_from_records(self._stream(query, params), center_node)
+            except Exception as e:
+                self.logger.warning(f"APOC子图查询失败，回退到变长路径查询: {e}")
+                self._apoc_available = False
+        query, params = self._subgraph_query(center_node, scope, max_depth, limit)
+        return self._subgraph_from_records(self._stream(query, params), center_node)
+    
+    def _detect_apoc(self) -> bool:
+        for probe in APOC_PROBE_QUERIES:
+            try:
+                return bool(self._run(probe, {"name": _APOC_SUBGRAPH_PROCEDURE}))
+            except Exception:
+                continue
+        return False
+    
     def search_nodes(self, query: str, scope: str = None, node_types: List[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
         """
         搜索节点
@@ -305,55 +900,22 @@ class Neo4jKGService(BaseKGService):
             return []
         
         try:
-            # 构建WHERE子句
-            where_conditions = []
-            params = {"query": query.lower(), "limit": limit}
-            
-            # 名称匹配条件
-            where_conditions.append("(toLower(n.name) CONTAINS $query OR ANY(alias in n.aliases WHERE toLower(alias) CONTAINS $query))")
-            
-            if scope:
-                where_conditions.append("n.scope = $scope")
-                params["scope"] = scope
-            
-            if node_types:
-                # 构建标签条件
-                label_conditions = " OR ".join([f"n:{node_type}" for node_type in node_types])
-                where_conditions.append(f"({label_conditions})")
-            
-            where_clause = " AND ".join(where_conditions)
-            
-            query_cypher = f"""
-            MATCH (n)
-            WHERE {where_clause}
-            RETURN n, labels(n) as node_labels
-            ORDER BY 
-                CASE WHEN toLower(n.name) = $query THEN 1 ELSE 2 END,
-                CASE WHEN toLower(n.name) STARTS WITH $query THEN 1 ELSE 2 END,
-                n.name
-            LIMIT $limit
-            """
-            
-            result = self.neo4j_client.execute_query(query_cypher, params)
-            
-            nodes = []
-            for record in result.records:
-                node = record["n"]
-                nodes.append({
-                    "id": node.get("id"),
-                    "name": node.get("name"),
-                    "type": record["node_labels"][0] if record["node_labels"] else "Unknown",
-                    "desc": node.get("desc", ""),
-                    "aliases": node.get("aliases", []),
-                    "scope": node.get("scope")
-                })
-            
-            return nodes
-            
+            # 查询本身按小写匹配，键统一小写提高缓存命中率
+            return self._fetch_search(query.lower(), scope, node_types, self._search_limit_tier(limit))[:limit]
         except Exception as e:
             self.logger.error(f"搜索节点失败: {e}")
             return []
     
+    @_cached_read
+    def _fetch_search(self, query: str, scope: Optional[str], node_types: Optional[List[str]], limit: int) -> List[Dict[str, Any]]:
+        fulltext, contains = self._search_plan(query, scope, node_types, limit)
+        if fulltext:
+            try:
+                return self._search_from_records(self._stream(*fulltext))
+            except Exception as e:
+                self._fulltext_failed(e)
+        return self._search_from_records(self._stream(*contains))
+    
     def get_chunk_related_entities(self, chunk_id: str, scope: str = None, limit: int = 30) -> Dict[str, Any]:
         """
         由Chunk反查相关实体（KG×RAG联动查询）
@@ -370,94 +932,333 @@ class Neo4jKGService(BaseKGService):
             return {"entities": [], "paths": []}
         
         try:
-            where_clause = "c.id = $chunk_id"
-            params = {"chunk_id": chunk_id, "limit": limit}
-            
-            if scope:
-                where_clause += " AND e.scope = $scope"
-                params["scope"] = scope
-            
-            query = f"""
-            MATCH (c:Chunk)-[:MENTIONS]->(e)
-            WHERE {where_clause}
-            OPTIONAL MATCH path = (e)-[r*1..2]-(related)
-            WHERE ALL(rel in relationships(path) WHERE 
-                      (NOT $scope IS NULL) = (rel.scope = $scope OR $scope IS NULL))
-            RETURN e, 
-                   labels(e) as entity_labels,
-                   collect(DISTINCT path) as paths,
-                   collect(DISTINCT related) as related_entities
-            LIMIT $limit
-            """
-            
-            result = self.neo4j_client.execute_query(query, params)
-            
-            entities = []
-            all_paths = []
-            
-            for record in result.records:
-                entity = record["e"]
-                entities.append({
-                    "id": entity.get("id"),
-                    "name": entity.get("name"),
-                    "type": record["entity_labels"][0] if record["entity_labels"] else "Unknown",
-                    "desc": entity.get("desc", "")
-                })
-                
-                # 处理路径
-                for path in record["paths"]:
-                    if path:  # 确保路径不为空
-                        path_info = {
-                            "length": len(path.relationships),
-                            "nodes": [{"id": n.get("id"), "name": n.get("name")} for n in path.nodes],
-                            "relationships": [{"type": r.type, "desc": r.get("desc", "")} for r in path.relationships]
-                        }
-                        all_paths.append(path_info)
-            
-            return {
-                "chunk_id": chunk_id,
-                "entities": entities,
-                "paths": all_paths[:20],  # 限制路径数量
-                "total_entities": len(entities)
-            }
-            
+            return self._fetch_chunk_entities(chunk_id, scope, limit)
         except Exception as e:
             self.logger.error(f"Chunk反查实体失败: {e}")
             return {"entities": [], "paths": []}
     
+    @_cached_read
+    def _fetch_chunk_entities(self, chunk_id: str, scope: Optional[str], limit: int) -> Dict[str, Any]:
+        query, params = self._chunk_entities_query(chunk_id, scope, limit)
+        return self._chunk_entities_from_records(self._stream(query, params), chunk_id)
+    
     def get_book_stats(self, book_id: str) -> Dict[str, Any]:
         """获取整书统计信息"""
         if not self.neo4j_client or not book_id:
             return {}
         
         try:
-            query = """
-            MATCH (n) WHERE n.scope = $book_id
-            OPTIONAL MATCH ()-[r]->() WHERE r.scope = $book_id
-            RETURN 
-                count(DISTINCT n) as total_nodes,
-                count(DISTINCT r) as total_edges,
-                collect(DISTINCT labels(n)) as node_types,
-                collect(DISTINCT type(r)) as edge_types
-            """
-            
-            result = self.neo4j_client.execute_query(query, {"book_id": book_id})
+            return self._fetch_book_stats(book_id)
+        except Exception as e:
+            self.logger.error(f"获取整书统计失败: {e}")
+            return {}
+    
+    @_cached_read(ttl=_BOOK_STATS_CACHE_TTL)
+    def _fetch_book_stats(self, book_id: str) -> Dict[str, Any]:
+        return self._book_stats_from_records(self._stream(_BOOK_STATS_QUERY, {"book_id": book_id}), book_id)
+    
+    def get_page_data(self, node_id: str, scope: str = None, max_depth: int = 2, limit: int = 50) -> Dict[str, Any]:
+        """
+        并发获取节点详情、子图与整书统计；驱动线程安全，三个查询各占一个连接，总耗时取决于最慢的一个
+        
+        节点详情与整书统计交给本次调用的临时线程池，子图在当前线程查询；线程池随调用结束关闭，不跨实例遗留线程。
+        """
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="kg-page") as executor:
+            def submit(fn, *args):
+                # 各任务在当前上下文的副本中执行，请求级缓存对工作线程同样可见
+                return executor.submit(contextvars.copy_context().run, fn, *args)
             
-            if result.records:
-                record = result.records[0]
-                return {
-                    "book_id": book_id,
-                    "total_nodes": record["total_nodes"],
-                    "total_edges": record["total_edges"],
-                    "node_types": [t for types in record["node_types"] for t in types if types],
-                    "edge_types": [t for t in record["edge_types"] if t]
-                }
+            node = submit(self.get_node_detail, node_id, scope)
+            book_stats = submit(self.get_book_stats, scope)
+            subgraph = self.get_subgraph(node_id, scope, max_depth, limit)
+            return {"node": node.result(), "subgraph": subgraph, "book_stats": book_stats.result()}
+
+
+class _AsyncDriverBridge:
+    """
+    以同步客户端接口（execute_cypher / execute_cypher_many）包装异步服务，供工作线程中的同步流程使用
+    
+    每条语句提交到服务所在的事件循环执行并等待结果；与 Neo4jClient 一致，单条语句失败时记录日志并返回空列表。
+    不得在事件循环线程中调用。
+    """
+    
+    def __init__(self, service: "AsyncNeo4jKGService", loop: asyncio.AbstractEventLoop):
+        self._service = service
+        self._loop = loop
+        self.driver = service.driver
+        self.database = service.database
+        # 注入的驱动没有可用的 URI，按驱动对象区分
+        self.uri = service.uri or f"async-driver:{id(service.driver)}"
+    
+    def execute_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> list:
+        try:
+            return asyncio.run_coroutine_threadsafe(self._service._run(query, params or {}), self._loop).result()
+        except Exception as e:
+            logger.error(f"执行 Cypher 失败: {e}")
+            return []
+    
+    def execute_cypher_many(self, statements: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[list]:
+        return [self.execute_cypher(query, params) for query, params in statements]
+
+
+class AsyncNeo4jKGService(_Neo4jKGServiceBase):
+    """
+    基于 neo4j 异步驱动的KG服务实现，供 FastAPI 等事件循环内直接 await
+    
+    查询与结果格式与 Neo4jKGService 完全一致，等待 Bolt 往返时不阻塞事件循环。
+    """
+    
+    def __init__(self, driver=None, database: Optional[str] = None,
+                 cache_size: Optional[int] = None, cache_ttl: Optional[float] = None):
+        """
+        Args:
+            driver: neo4j AsyncDriver，未提供时按配置创建
+            database: 数据库名，未提供时使用配置值
+            cache_size: 读接口结果缓存的最大条目数；未提供时取配置 neo4j.read_cache_size（默认0）
+            cache_ttl: 缓存过期时间（秒），未提供时取配置 neo4j.read_cache_ttl；cache_size 或 cache_ttl 不大于0时不缓存
+        """
+        self.driver = driver
+        self.database = database
+        # 驱动由配置创建时记录其 URI，与同步存储共用"该数据库 schema 已就绪"的登记
+        self.uri: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+        self._init_read_cache(cache_size, cache_ttl)
+        
+        if not self.driver:
+            self._initialize_driver()
+    
+    def _initialize_driver(self):
+        """初始化Neo4j异步驱动"""
+        try:
+            from neo4j import AsyncGraphDatabase
+            from ...infrastructure.graph_store.neo4j_client import driver_options_from_settings
+            from ...core.settings import get_settings
             
+            settings = get_settings()
+            self.driver = AsyncGraphDatabase.driver(
+                settings.neo4j.uri,
+                auth=(settings.neo4j.user, settings.neo4j.password),
+                user_agent="sopilot-kg/1.0",
+                notifications_min_severity="WARNING",
+                **driver_options_from_settings(settings.neo4j),
+            )
+            if self.database is None:
+                self.database = settings.neo4j.database
+            self.uri = settings.neo4j.uri
+            self.logger.info("Async Neo4j KG Service initialized")
+        except Exception as e:
+            self.logger.error(f"Failed to initialize async Neo4j driver: {e}")
+            self.driver = None
+    
+    async def get_page_data(self, node_id: str, scope: str = None, max_depth: int = 2, limit: int = 50) -> Dict[str, Any]:
+        """并发获取节点详情、子图与整书统计，总耗时取决于最慢的一个查询"""
+        node, subgraph, book_stats = await asyncio.gather(
+            self.get_node_detail(node_id, scope),
+            self.get_subgraph(node_id, scope, max_depth, limit),
+            self.get_book_stats(scope),
+        )
+        return {"node": node, "subgraph": subgraph, "book_stats": book_stats}
+    
+    async def ensure_indexes(self) -> None:
+        """
+        确保查询依赖的约束和索引存在；需在事件循环中调用，建议应用启动时 await 一次
+        
+        与同步服务/存储共用 Neo4jKGStore.ensure_indexes（按名称比对、等待上线、校验后登记、同库只执行一次），
+        该流程在工作线程中运行，语句经 _AsyncDriverBridge 回到本事件循环上以异步驱动执行。
+        """
+        if not self.driver:
+            return
+        try:
+            from .store import Neo4jKGStore
+            bridge = _AsyncDriverBridge(self, asyncio.get_running_loop())
+            await asyncio.to_thread(Neo4jKGStore(bridge).ensure_indexes)
+        except Exception as e:
+            self.logger.warning(f"确保Neo4j索引失败: {e}")
+    
+    async def close(self) -> None:
+        if self.driver:
+            await self.driver.close()
+    
+    async def _run(self, query: str, params: Dict[str, Any]) -> list:
+        async with self.driver.session(database=self.database) as session:
+            result = await session.run(query, params)
+            return [record async for record in result]
+    
+    async def get_node_detail(self, node_id: str, scope: str = None) -> Optional[Dict[str, Any]]:
+        """获取节点详情"""
+        if not node_id:
+            return None
+        return (await self.get_nodes_detail([node_id], scope)).get(node_id)
+    
+    async def get_nodes_detail(self, node_ids: List[str], scope: str = None) -> Dict[str, Dict[str, Any]]:
+        """批量获取节点详情（ID -> 详情），未缓存的ID在一次 UNWIND 查询中解析"""
+        if not self.driver or not node_ids:
             return {}
-            
+        
+        details, missing = self._lookup_cached("node_detail", node_ids, scope)
+        if not missing:
+            return details
+        
+        try:
+            records = await self._run(_compile_queries(bool(scope), False)["nodes_detail"], {"node_ids": missing, "scope": scope or None})
+            found = self._first_by(records, "nid", self._node_detail_from_record)
+            self._store_cached("node_detail", found, scope)
+            details.update(found)
+        except Exception as e:
+            self.logger.error(f"获取节点详情失败: {e}")
+        return details
+    
+    async def get_edge_detail(self, edge_rid: str, scope: str = None) -> Optional[Dict[str, Any]]:
+        """获取关系详情"""
+        if not edge_rid:
+            return None
+        return (await self.get_edges_detail([edge_rid], scope)).get(edge_rid)
+    
+    async def get_edges_detail(self, edge_rids: List[str], scope: str = None) -> Dict[str, Dict[str, Any]]:
+        """批量获取关系详情（rid -> 详情），未缓存的rid在一次 UNWIND 查询中解析"""
+        if not self.driver or not edge_rids:
+            return {}
+        
+        details, missing = self._lookup_cached("edge_detail", edge_rids, scope)
+        if not missing:
+            return details
+        
+        try:
+            records = await self._run(_compile_queries(bool(scope), False)["edges_detail"], {"edge_rids": missing, "scope": scope or None})
+            found = self._first_by(records, "rid", self._edge_detail_from_record)
+            self._store_cached("edge_detail", found, scope)
+            details.update(found)
+        except Exception as e:
+            self.logger.error(f"获取关系详情失败: {e}")
+        return details
+    
+    async def get_subgraph(self, center_node: str, scope: str = None, max_depth: int = 2, limit: int = 50) -> Dict[str, Any]:
+        """获取子图（邻居展开/解释路径/证据回链）"""
+        if not self.driver or not center_node:
+            return {"nodes": [], "edges": []}
+        
+        try:
+            return await self._fetch_subgraph(center_node, scope, max_depth, limit)
+        except Exception as e:
+            self.logger.error(f"获取子图失败: {e}")
+            return {"nodes": [], "edges": []}
+    
+    @_cached_read
+    async def _fetch_subgraph(self, center_node: str, scope: Optional[str], max_depth: int, limit: int) -> Dict[str, Any]:
+        if self._apoc_available is None:
+            self._apoc_available = await self._detect_apoc()
+        if self._apoc_available:
+            query, params = self._subgraph_query(center_node, scope, max_depth, limit, use_apoc=True)
+            try:
+                return self._subgraph_from_records(await self._run(query, params), center_node)
+            except Exception as e:
+                self.logger.warning(f"APOC子图查询失败，回退到变长路径查询: {e}")
+                self._apoc_available = False
+        query, params = self._subgraph_query(center_node, scope, max_depth, limit)
+        return self._subgraph_from_records(await self._run(query, params), center_node)
+    
+    async def _detect_apoc(self) -> bool:
+        for probe in APOC_PROBE_QUERIES:
+            try:
+                return bool(await self._run(probe, {"name": _APOC_SUBGRAPH_PROCEDURE}))
+            except Exception:
+                continue
+        return False
+    
+    async def search_nodes(self, query: str, scope: str = None, node_types: List[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """搜索节点"""
+        if not self.driver or not query:
+            return []
+        
+        try:
+            return (await self._fetch_search(query.lower(), scope, node_types, self._search_limit_tier(limit)))[:limit]
+        except Exception as e:
+            self.logger.error(f"搜索节点失败: {e}")
+            return []
+    
+    @_cached_read
+    async def _fetch_search(self, query: str, scope: Optional[str], node_types: Optional[List[str]], limit: int) -> List[Dict[str, Any]]:
+        fulltext, contains = self._search_plan(query, scope, node_types, limit)
+        if fulltext:
+            try:
+                return self._search_from_records(await self._run(*fulltext))
+            except Exception as e:
+                self._fulltext_failed(e)
+        return self._search_from_records(await self._run(*contains))
+    
+    async def get_chunk_related_entities(self, chunk_id: str, scope: str = None, limit: int = 30) -> Dict[str, Any]:
+        """由Chunk反查相关实体（KG×RAG联动查询）"""
+        if not self.driver or not chunk_id:
+            return {"entities": [], "paths": []}
+        
+        try:
+            return await self._fetch_chunk_entities(chunk_id, scope, limit)
+        except Exception as e:
+            self.logger.error(f"Chunk反查实体失败: {e}")
+            return {"entities": [], "paths": []}
+    
+    @_cached_read
+    async def _fetch_chunk_entities(self, chunk_id: str, scope: Optional[str], limit: int) -> Dict[str, Any]:
+        query, params = self._chunk_entities_query(chunk_id, scope, limit)
+        return self._chunk_entities_from_records(await self._run(query, params), chunk_id)
+    
+    async def get_book_stats(self, book_id: str) -> Dict[str, Any]:
+        """获取整书统计信息"""
+        if not self.driver or not book_id:
+            return {}
+        
+        try:
+            return await self._fetch_book_stats(book_id)
         except Exception as e:
             self.logger.error(f"获取整书统计失败: {e}")
             return {}
+    
+    @_cached_read(ttl=_BOOK_STATS_CACHE_TTL)
+    async def _fetch_book_stats(self, book_id: str) -> Dict[str, Any]:
+        return self._book_stats_from_records(await self._run(_BOOK_STATS_QUERY, {"book_id": book_id}), book_id)
+
+
+def _name_grams(text: str) -> Set[str]:
+    """名称的单字与相邻双字片段；任一子串查询的片段都必然出现在匹配名称的片段集合中"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class _NameSearchIndex:
+    """
+    节点名称的 n-gram 倒排索引：片段 -> 按存储顺序排列的节点序号
+    
+    另按 scope/type 建立序号集合（列式视图），范围与类型过滤以集合运算完成，不再逐节点读取字典；
+    候选最后用子串判断确认，结果与顺序扫描一致。
+    """
+    
+    def __init__(self, nodes: Dict[str, KGNode]):
+        self.nodes: List[KGNode] = list(nodes.values())
+        self.names: List[str] = [(node.name or "").lower() for node in self.nodes]
+        self.postings: Dict[str, List[int]] = {}
+        self.by_scope: Dict[Any, Set[int]] = {}
+        self.by_type: Dict[Any, Set[int]] = {}
+        for rank, (node, name) in enumerate(zip(self.nodes, self.names)):
+            for gram in _name_grams(name):
+                self.postings.setdefault(gram, []).append(rank)
+            self.by_scope.setdefault(node.scope, set()).add(rank)
+            self.by_type.setdefault(node.type, set()).add(rank)
+    
+    def candidates(self, query_lower: str, scope: Optional[str] = None,
+                   node_types: Optional[List[str]] = None) -> List[int]:
+        grams = {query_lower} if len(query_lower) == 1 else {query_lower[i:i + 2] for i in range(len(query_lower) - 1)}
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not lists or not lists[0]:
+            return []
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result.intersection_update(posting)
+            if not result:
+                return []
+        if scope:
+            result.intersection_update(self.by_scope.get(scope, ()))
+        if node_types and result:
+            result.intersection_update(set().union(*(self.by_type.get(t, ()) for t in set(node_types))))
+        return sorted(result)
 
 
 class MemoryKGService(BaseKGService):
@@ -466,6 +1267,20 @@ class MemoryKGService(BaseKGService):
     def __init__(self, memory_store=None):
         self.memory_store = memory_store
         self.logger = logging.getLogger(__name__)
+        # 名称倒排索引及其对应的存储版本，存储变化后在下次搜索时重建
+        self._name_index: Optional[_NameSearchIndex] = None
+        self._name_index_key: Optional[Tuple[int, int]] = None
+    
+    def _search_index(self) -> Optional[_NameSearchIndex]:
+        """按存储的 version 计数惰性重建索引；存储不提供 version 时返回 None（退回顺序扫描）"""
+        version = getattr(self.memory_store, "version", None)
+        if version is None:
+            return None
+        key = (version, len(self.memory_store.nodes))
+        if key != self._name_index_key:
+            self._name_index = _NameSearchIndex(self.memory_store.nodes)
+            self._name_index_key = key
+        return self._name_index
     
     def get_node_detail(self, node_id: str, scope: str = None) -> Optional[Dict[str, Any]]:
         """获取节点详情（内存版本）"""
@@ -476,10 +1291,10 @@ class MemoryKGService(BaseKGService):
         if not node:
             return None
         
-        if scope and node.get("scope") != scope:
+        if scope and node.scope != scope:
             return None
         
-        return node
+        return node.to_dict()
     
     def get_edge_detail(self, edge_rid: str, scope: str = None) -> Optional[Dict[str, Any]]:
         """获取关系详情（内存版本）"""
@@ -490,10 +1305,10 @@ class MemoryKGService(BaseKGService):
         if not edge:
             return None
         
-        if scope and edge.get("scope") != scope:
+        if scope and edge.scope != scope:
             return None
         
-        return edge
+        return edge.to_dict()
     
     def get_subgraph(self, center_node: str, scope: str = None, max_depth: int = 2, limit: int = 50) -> Dict[str, Any]:
         """获取子图（内存版本）"""
@@ -508,16 +1323,25 @@ class MemoryKGService(BaseKGService):
         results = []
         query_lower = query.lower()
         
+        index = self._search_index()
+        if index is not None:
+            for rank in index.candidates(query_lower, scope, node_types):
+                if query_lower in index.names[rank]:
+                    results.append(index.nodes[rank].to_dict())
+                    if len(results) >= limit:
+                        break
+            return results
+        
         for node in self.memory_store.nodes.values():
-            if scope and node.get("scope") != scope:
+            if scope and node.scope != scope:
                 continue
             
-            if node_types and node.get("type") not in node_types:
+            if node_types and node.type not in node_types:
                 continue
             
-            name = node.get("name", "").lower()
+            name = (node.name or "").lower()
             if query_lower in name:
-                results.append(node)
+                results.append(node.to_dict())
             
             if len(results) >= limit:
                 break
@@ -526,9 +1350,11 @@ class MemoryKGService(BaseKGService):
 
 
 def create_kg_service(service_type: str = "neo4j", **kwargs) -> BaseKGService:
-    """创建KG服务实例"""
+    """创建KG服务实例；neo4j/neo4j_async 服务可通过 cache_size/cache_ttl 配置读缓存"""
     if service_type.lower() == "neo4j":
         return Neo4jKGService(**kwargs)
+    elif service_type.lower() == "neo4j_async":
+        return AsyncNeo4jKGService(**kwargs)
     elif service_type.lower() == "memory":
         return MemoryKGService(**kwargs)
     else:
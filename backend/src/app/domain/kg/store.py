@@ -6,14 +6,251 @@ KG Store - Neo4j写入，保证唯一约束
 """
 
 import logging
-from typing import Protocol, Dict, Any, List, Optional
+import re
+import threading
+from itertools import islice
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol, Dict, Any, Iterator, List, Optional, Set, Tuple
 from abc import ABC, abstractmethod
 
 from .schemas import KGNode, KGEdge, KGDict
+from .cache import clear_kg_read_cache
+from .cypher import APOC_PROBE_QUERIES, KG_SCHEMA_STATEMENTS, NODE_LABELS, SHOW_SCHEMA_QUERIES
 
 
 logger = logging.getLogger(__name__)
 
+# UNWIND 批量写入时每条语句携带的最大行数
+_BULK_BATCH_SIZE = 1000
+
+_INVALID_REL_CHARS = re.compile(r"[^A-Z0-9_]+")
+
+_LABEL_BY_TYPE = {label.lower(): label for label in NODE_LABELS}
+
+# 写入时维护名称/别名的小写镜像属性，搜索直接比较 name_lc/aliases_lc，无需每次查询逐行 toLower
+_SET_LOWERCASE_MIRRORS = "SET n.name_lc = toLower(n.name), n.aliases_lc = [a IN coalesce(n.aliases, []) | toLower(a)]"
+
+# 为写入小写镜像之前已存在的节点补齐镜像属性（幂等，无缺失时不做修改）；
+# 按批提交，单个事务的状态有上限，须以自动提交方式执行
+_BACKFILL_LOWERCASE_MIRRORS_QUERY = f"""
+MATCH (n) WHERE n.name IS NOT NULL AND n.name_lc IS NULL
+CALL {{
+    WITH n
+    {_SET_LOWERCASE_MIRRORS}
+}} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+# 批量写入的Cypher模板：文本固定，服务端查询计划缓存可直接命中
+_MERGE_NODES_BULK_QUERY = f"""
+UNWIND $rows AS row
+MERGE (n {{id: row.id}})
+SET n += row.properties
+{_SET_LOWERCASE_MIRRORS}
+RETURN count(n) as written
+"""
+
+# 已知类型的节点带标签MERGE，可走该标签的 id 唯一约束索引，而非全库扫描
+_MERGE_NODES_BULK_TEMPLATE = """
+UNWIND $rows AS row
+MERGE (n:{label} {{id: row.id}})
+SET n += row.properties
+""" + _SET_LOWERCASE_MIRRORS + """
+RETURN count(n) as written
+"""
+_MERGE_NODES_BULK_QUERIES = {label: _MERGE_NODES_BULK_TEMPLATE.format(label=label) for label in NODE_LABELS}
+
+# 关系类型无法参数化，按类型格式化后缓存
+_MERGE_EDGES_BULK_TEMPLATE = """
+UNWIND $rows AS row
+MATCH (source {{id: row.source_id}})
+MATCH (target {{id: row.target_id}})
+MERGE (source)-[r:{rel_type} {{rid: row.rid}}]->(target)
+SET r += row.properties
+SET r += $extra_properties
+SET r.rid = row.rid
+RETURN count(r) as written
+"""
+
+# 时间戳以 UTC 毫秒整数传入，服务端按 epochMillis 构造，省去逐行解析 ISO 字符串；缺失时保持 null
+def _row_datetime(field: str, escape_braces: bool = True) -> str:
+    expr = f"CASE WHEN row.{field} IS NULL THEN null ELSE datetime({{epochMillis: row.{field}}}) END"
+    return expr.replace("{", "{{").replace("}", "}}") if escape_braces else expr
+
+
+def _epoch_millis(value: Optional[datetime]) -> Optional[int]:
+    """datetime 转 UTC 毫秒；无时区的值按 UTC 解释（与服务端解析无时区 ISO 字符串的默认行为一致）"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+# store_kg 对单行 row 的写入主体
+_STORE_NODE_MERGE = """
+MERGE (n:{label} {{id: row.id}})
+ON CREATE SET n.created_at = """ + _row_datetime("created_at") + """
+SET n.name = row.name,
+    n.desc = row.desc,
+    n.aliases = row.aliases,
+    n.scope = row.scope,
+    n.updated_at = """ + _row_datetime("updated_at") + """
+""" + _SET_LOWERCASE_MIRRORS
+
+_STORE_EDGE_MERGE = """
+MERGE (source)-[r:{rel_type} {{rid: row.rid}}]->(target)
+ON CREATE SET r.created_at = """ + _row_datetime("created_at") + """
+SET r.desc = row.desc,
+    r.confidence = row.confidence,
+    r.weight = row.weight,
+    r.scope = row.scope,
+    r.src_section = row.src_section,
+    r.updated_at = """ + _row_datetime("updated_at") + """
+"""
+
+# 按标签/关系类型的 UNWIND 批量写入：写入前先探测是否已存在，以区分新建与更新计数
+_STORE_NODES_TEMPLATE = """
+UNWIND $rows AS row
+OPTIONAL MATCH (existing:{label} {{id: row.id}})
+WITH row, existing IS NULL AS created
+""" + _STORE_NODE_MERGE + """
+RETURN count(n) as written, sum(CASE WHEN created THEN 1 ELSE 0 END) as created
+"""
+
+# 端点匹配子句由 _endpoint_match 按端点标签生成，标签已知时走该标签的 id 唯一约束索引
+_STORE_EDGES_TEMPLATE = """
+UNWIND $rows AS row
+{source_match}
+{target_match}
+OPTIONAL MATCH (source)-[existing:{rel_type} {{rid: row.rid}}]->(target)
+WITH row, source, target, existing IS NULL AS created
+""" + _STORE_EDGE_MERGE + """
+RETURN count(r) as written, sum(CASE WHEN created THEN 1 ELSE 0 END) as created
+"""
+
+# 标签/关系类型作为参数的写入语句（需 APOC）：无论出现多少种非标准标签和关系类型，
+# 查询文本都不变，服务端计划缓存不会被逐类型生成的语句挤满。
+# _created 仅在创建时写入、随即在同一事务中移除，用于统计新建数
+_APOC_STORE_NODES_QUERY = """
+UNWIND $rows AS row
+CALL apoc.merge.node([row.label], {id: row.id},
+    {name: row.name, desc: row.desc, aliases: row.aliases, scope: row.scope,
+     created_at: """ + _row_datetime("created_at", False) + """,
+     updated_at: """ + _row_datetime("updated_at", False) + """, _created: true},
+    {name: row.name, desc: row.desc, aliases: row.aliases, scope: row.scope,
+     updated_at: """ + _row_datetime("updated_at", False) + """})
+YIELD node AS n
+WITH n, coalesce(n._created, false) AS created
+REMOVE n._created
+""" + _SET_LOWERCASE_MIRRORS + """
+RETURN count(n) as written, sum(CASE WHEN created THEN 1 ELSE 0 END) as created
+"""
+
+_APOC_STORE_EDGES_TEMPLATE = """
+UNWIND $rows AS row
+{source_match}
+{target_match}
+CALL apoc.merge.relationship(source, row.rel_type, {{rid: row.rid}},
+    {{desc: row.desc, confidence: row.confidence, weight: row.weight, scope: row.scope, src_section: row.src_section,
+      created_at: """ + _row_datetime("created_at") + """,
+      updated_at: """ + _row_datetime("updated_at") + """, _created: true}},
+    target,
+    {{desc: row.desc, confidence: row.confidence, weight: row.weight, scope: row.scope, src_section: row.src_section,
+      updated_at: """ + _row_datetime("updated_at") + """}})
+YIELD rel AS r
+WITH r, coalesce(r._created, false) AS created
+REMOVE r._created
+RETURN count(r) as written, sum(CASE WHEN created THEN 1 ELSE 0 END) as created
+"""
+_APOC_MERGE_PROCEDURES = ("apoc.merge.node", "apoc.merge.relationship")
+
+# 大批量写入交给 apoc.periodic.iterate 在服务端分批提交；内层语句逐行处理外层返回的 row
+_PERIODIC_ITERATE_QUERY = """
+CALL apoc.periodic.iterate(
+    'UNWIND $rows AS row RETURN row',
+    $inner,
+    {batchSize: $batch_size, parallel: $parallel, retries: 2, params: {rows: $rows}}
+)
+YIELD committedOperations, failedOperations, failedBatches, errorMessages
+RETURN committedOperations, failedOperations, failedBatches, errorMessages
+"""
+_PERIODIC_ITERATE_PROCEDURE = "apoc.periodic.iterate"
+
+# 节点+边总数超过该值且 APOC 可用时，store_kg 改走 apoc.periodic.iterate
+_PARALLEL_INGEST_THRESHOLD = 20_000
+
+# store_kg 中各分组（节点标签 / 关系类型+端点标签）并发写入的最大线程数
+_MAX_WRITE_WORKERS = 8
+
+# 按 scope 分批删除；关系按有向模式匹配，每条只计一次。节点仅删除已无任何关系的，
+# 不用 DETACH DELETE，避免连带删除其他 scope 指向该节点的关系
+_DELETE_SCOPE_EDGES_QUERY = """
+MATCH ()-[r]->() WHERE r.scope = $scope
+WITH r LIMIT $batch
+DELETE r
+RETURN count(r) as deleted
+"""
+
+_DELETE_SCOPE_NODES_QUERY = """
+MATCH (n) WHERE n.scope = $scope AND NOT (n)--()
+WITH n LIMIT $batch
+DELETE n
+RETURN count(n) as deleted
+"""
+
+_STATS_QUERY = """
+CALL { MATCH (n) RETURN count(n) as total_nodes }
+CALL { MATCH ()-[r]->() RETURN count(r) as total_edges }
+RETURN total_nodes, total_edges
+"""
+
+# 已确认约束/索引就绪的数据库 (uri, database)，同一进程内只执行一次DDL
+_indexed_databases: Set[Tuple[str, str]] = set()
+# 每个数据库一把锁：DDL 执行期间并发的调用方等待其完成，而不是直接跳过
+_indexing_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_indexed_databases_lock = threading.Lock()
+
+
+def _rel_index_statements(rel_type: str) -> List[str]:
+    """关系属性索引同样必须指定关系类型，随新类型首次写入时创建"""
+    prefix = rel_type.lower()
+    return [
+        f"CREATE INDEX rel_{prefix}_rid IF NOT EXISTS FOR ()-[r:{rel_type}]-() ON (r.rid)",
+        f"CREATE INDEX rel_{prefix}_scope IF NOT EXISTS FOR ()-[r:{rel_type}]-() ON (r.scope)",
+    ]
+
+
+def _node_label(raw: str) -> str:
+    """已知类型映射为规范标签（可走其唯一约束索引），其余类型原样加反引号作为标签"""
+    text = str(raw or "")
+    label = _LABEL_BY_TYPE.get(text.lower())
+    if label:
+        return label
+    return "`" + text.replace("`", "``") + "`" if text else "Concept"
+
+
+def _endpoint_match(var: str, label: Optional[str], id_param: str) -> str:
+    """
+    生成边端点的 MATCH 子句
+    
+    带唯一约束的标签显式提示使用其 id 索引；其他标签仅加标签过滤；标签未知（端点不在本批KG中）时按 id 跨标签匹配。
+    """
+    if label is None:
+        return f"MATCH ({var} {{id: {id_param}}})"
+    clause = f"MATCH ({var}:{label} {{id: {id_param}}})"
+    if label in NODE_LABELS:
+        clause += f" USING INDEX {var}:{label}(id)"
+    return clause
+
+
+def _sanitize_rel_type(raw: str) -> str:
+    """将任意关系类型文本转换为合法的 Cypher 关系类型标识"""
+    name = _INVALID_REL_CHARS.sub("_", str(raw or "").upper()).strip("_")
+    if not name:
+        return "RELATED"
+    return name if not name[0].isdigit() else f"REL_{name}"
+
 
 class BaseKGStore(ABC):
     """KG存储基类"""
@@ -32,69 +269,199 @@ class BaseKGStore(ABC):
     def delete_by_scope(self, scope: str) -> int:
         """按scope删除数据"""
         pass
+    
+    def ensure_indexes(self) -> None:
+        """确保存储所需的约束和索引存在；默认无需处理"""
+        return None
+    
+    def merge_nodes_bulk(self, nodes: List[Dict[str, Any]]) -> int:
+        """批量合并节点，返回写入数量；默认逐个调用 merge_node"""
+        return sum(1 for node in nodes if self.merge_node(node))
+    
+    def merge_edges_bulk(self, edges: List[Dict[str, Any]], rids: Optional[List[str]] = None,
+                         extra_properties: Optional[Dict[str, Any]] = None) -> int:
+        """
+        批量合并边，返回写入数量；默认逐个调用 merge_edge
+        
+        Args:
+            edges: 边字典列表（不会被修改）
+            rids: 与 edges 对齐的rid列表，提供时覆盖各边自身的rid
+            extra_properties: 所有边共享的附加属性（如 scope/src）
+        """
+        return sum(1 for edge in with_edge_overrides(edges, rids, extra_properties) if self.merge_edge(edge))
+
+
+def with_edge_overrides(edges: List[Dict[str, Any]], rids: Optional[List[str]] = None,
+                        extra_properties: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """逐条生成带共享属性和rid的边字典，供不支持批量写入的存储逐条写入"""
+    if rids is None and not extra_properties:
+        yield from edges
+        return
+    extra_properties = extra_properties or {}
+    for i, edge in enumerate(edges):
+        merged = {**edge, **extra_properties}
+        if rids is not None:
+            merged["rid"] = rids[i]
+        yield merged
+
+
+class _LazyBatches:
+    """
+    一个分组的 UNWIND 语句序列，每批参数行在迭代到时才构造
+    
+    可重复迭代：托管事务重试时重新生成各批参数。
+    """
+    __slots__ = ("query", "items", "to_row", "size")
+    
+    def __init__(self, query: str, items: List[Any], to_row, size: int):
+        self.query = query
+        self.items = items
+        self.to_row = to_row
+        self.size = size
+    
+    def __len__(self) -> int:
+        return -(-len(self.items) // self.size)
+    
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        items = iter(self.items)
+        while True:
+            rows = [self.to_row(item) for item in islice(items, self.size)]
+            if not rows:
+                return
+            yield self.query, {"rows": rows}
 
 
 class Neo4jKGStore(BaseKGStore):
     """Neo4j KG存储实现"""
     
-    def __init__(self, neo4j_client=None):
+    def __init__(self, neo4j_client=None, batch_size: int = _BULK_BATCH_SIZE,
+                 parallel_threshold: int = _PARALLEL_INGEST_THRESHOLD,
+                 max_write_workers: int = _MAX_WRITE_WORKERS):
         self.neo4j_client = neo4j_client
+        self.batch_size = max(1, int(batch_size))
+        self.parallel_threshold = parallel_threshold
+        self.max_write_workers = max(1, int(max_write_workers))
+        # APOC 过程名 -> 是否可用（按需探测一次）
+        self._apoc_procedures: Dict[str, bool] = {}
         self.logger = logging.getLogger(__name__)
+        # 关系类型 -> 批量合并语句
+        self._edge_bulk_queries: Dict[str, str] = {}
+        # 节点标签 / (关系类型, 起点标签, 终点标签) -> store_kg 批量写入语句
+        self._node_store_queries: Dict[str, str] = {}
+        self._edge_store_queries: Dict[Tuple[Optional[str], Optional[str], Optional[str]], str] = {}
+        # 本实例已补建过 rid/scope 索引的关系类型
+        self._indexed_rel_types: Set[str] = set()
+        # 本实例删除后确认已为空、且此后未再写入的 scope；重复清理时直接跳过，不再扫描全图
+        self._cleared_scopes: Set[str] = set()
         
         if not self.neo4j_client:
             self._initialize_client()
-        
-        # 确保约束和索引存在
-        self._ensure_constraints()
     
     def _initialize_client(self):
         """初始化Neo4j客户端"""
         try:
-            from ...infrastructure.graph_store.neo4j_client import Neo4jClient
+            from ...infrastructure.graph_store.neo4j_client import driver_options_from_settings, get_shared_client
             from ...core.settings import get_settings
             
             settings = get_settings()
-            self.neo4j_client = Neo4jClient(
+            self.neo4j_client = get_shared_client(
                 uri=settings.neo4j.uri,
                 user=settings.neo4j.user,
                 password=settings.neo4j.password,
-                database=settings.neo4j.database
+                database=settings.neo4j.database,
+                **driver_options_from_settings(settings.neo4j),
             )
+            if self.neo4j_client is None:
+                self.logger.error("Failed to initialize Neo4j client: connection failed")
+                return
             self.logger.info("Neo4j KG Store initialized")
         except Exception as e:
             self.logger.error(f"Failed to initialize Neo4j client: {e}")
             self.neo4j_client = None
     
-    def _ensure_constraints(self):
-        """确保Neo4j约束和索引存在"""
-        if not self.neo4j_client:
+    def ensure_indexes(self) -> None:
+        """确保Neo4j约束和索引存在；同一数据库在进程内只执行一次"""
+        # 客户端尚未连接时不记为已完成，留待连接后再次调用
+        if not self.neo4j_client or getattr(self.neo4j_client, "driver", True) is None:
             return
         
-        constraints_and_indexes = [
-            # 节点唯一约束
-            "CREATE CONSTRAINT concept_id IF NOT EXISTS FOR (n:Concept) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (n:Chunk) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT chapter_id IF NOT EXISTS FOR (n:Chapter) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT subchapter_id IF NOT EXISTS FOR (n:Subchapter) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT method_id IF NOT EXISTS FOR (n:Method) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT example_id IF NOT EXISTS FOR (n:Example) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT dataset_id IF NOT EXISTS FOR (n:Dataset) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT equation_id IF NOT EXISTS FOR (n:Equation) REQUIRE n.id IS UNIQUE",
-            "CREATE CONSTRAINT doc_id IF NOT EXISTS FOR (n:Doc) REQUIRE n.id IS UNIQUE",
-            
-            # 索引
-            "CREATE INDEX node_scope IF NOT EXISTS FOR (n) ON (n.scope)",
-            "CREATE INDEX rel_scope IF NOT EXISTS FOR ()-[r]-() ON (r.scope)",
-            "CREATE INDEX rel_rid IF NOT EXISTS FOR ()-[r]-() ON (r.rid)",
-            "CREATE INDEX node_name IF NOT EXISTS FOR (n) ON (n.name)",
-        ]
+        target = (getattr(self.neo4j_client, "uri", ""), getattr(self.neo4j_client, "database", ""))
+        with _indexed_databases_lock:
+            if target in _indexed_databases:
+                return
+            target_lock = _indexing_locks.setdefault(target, threading.Lock())
+        
+        with target_lock:
+            # 等待期间其他调用方可能已完成
+            if target in _indexed_databases:
+                return
+            if not self._create_missing_schema():
+                return
+            with _indexed_databases_lock:
+                _indexed_databases.add(target)
+    
+    def _create_missing_schema(self) -> bool:
+        """
+        执行缺失的约束/索引DDL并等待上线；返回 schema 是否已确认齐全
+        
+        客户端会吞掉单条语句的异常，因此以执行后重新查询的结果为准；未确认时不记为完成，下次调用重试。
+        """
+        # 热启动（schema 已齐全）时只需一次会话内的两条 SHOW 查询，不再逐条提交DDL
+        existing = self._existing_schema_names()
+        missing = [statement for name, statement in KG_SCHEMA_STATEMENTS if name not in existing]
+        if not missing:
+            return True
+        
+        self._run_ddl(missing)
+        # 新建的约束索引在线上线前，带 USING INDEX 提示的写入会失败，这里等待其就绪
+        self._run_ddl(["CALL db.awaitIndexes(300)"])
         
-        for query in constraints_and_indexes:
-            try:
-                self.neo4j_client.execute_cypher(query)
-            except Exception as e:
-                # 约束可能已存在，这是正常的
-                self.logger.debug(f"Constraint/Index query result: {e}")
+        existing = self._existing_schema_names()
+        still_missing = [name for name, _ in KG_SCHEMA_STATEMENTS if name not in existing]
+        if still_missing:
+            self.logger.error(f"创建约束/索引失败，下次调用时重试: {', '.join(still_missing)}")
+            return False
+        
+        # 补齐旧节点的小写镜像需扫描全图，在后台执行，不阻塞流水线构造；期间写入的节点自带镜像
+        threading.Thread(target=self._backfill_lowercase_mirrors, name="kg-backfill", daemon=True).start()
+        return True
+    
+    def _backfill_lowercase_mirrors(self) -> None:
+        try:
+            self.neo4j_client.execute_cypher(_BACKFILL_LOWERCASE_MIRRORS_QUERY)
+        except Exception as e:
+            self.logger.warning(f"补齐小写镜像属性失败: {e}")
+    
+    def _existing_schema_names(self) -> Set[str]:
+        """服务端已有的约束与已上线的索引名；查询失败时返回空集合（随后按 IF NOT EXISTS 全量执行）"""
+        try:
+            results = self._execute_many([(query, None) for query in SHOW_SCHEMA_QUERIES])
+        except Exception as e:
+            self.logger.debug(f"查询已有约束/索引失败: {e}")
+            return set()
+        return {record["name"] for records in results for record in records}
+    
+    def _run_ddl(self, statements: List[str]) -> None:
+        try:
+            self._execute_many([(query, None) for query in statements])
+        except Exception as e:
+            # 约束可能已存在，这是正常的
+            self.logger.debug(f"Constraint/Index query result: {e}")
+    
+    def _single(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """执行单行结果的语句并返回该行；客户端不支持 execute_cypher_single 时取 execute_cypher 的首行"""
+        execute_cypher_single = getattr(self.neo4j_client, "execute_cypher_single", None)
+        if execute_cypher_single is not None:
+            return execute_cypher_single(query, params)
+        result = self.neo4j_client.execute_cypher(query, params)
+        return result[0] if result else None
+    
+    def _execute_many(self, statements: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+        """依次执行多条自动提交语句；客户端支持时共用一个会话（一次连接借出）"""
+        execute_cypher_many = getattr(self.neo4j_client, "execute_cypher_many", None)
+        if execute_cypher_many is not None:
+            return execute_cypher_many(statements)
+        return [self.neo4j_client.execute_cypher(query, params) for query, params in statements]
     
     def store_kg(self, kg_data: KGDict, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -119,21 +486,43 @@ class Neo4jKGStore(BaseKGStore):
                 "success": True
             }
             
-            # 存储节点
-            for node in kg_data.nodes:
-                result = self._store_node(node)
-                if result.get("created"):
-                    stats["nodes_created"] += 1
-                else:
-                    stats["nodes_updated"] += 1
+            # 节点按标签、边按 (关系类型, 端点标签) 分组后以 UNWIND 分批写入；
+            # 节点事务提交后再写边，边的端点可直接按标签索引定位，且不与节点写入争用锁
+            labels_by_id = {node.id: _node_label(node.type) for node in kg_data.nodes}
+            self._forget_cleared_scopes([node.scope for node in kg_data.nodes]
+                                        + [edge.scope for edge in kg_data.edges])
+            
+            if (len(kg_data.nodes) + len(kg_data.edges) > self.parallel_threshold
+                    and self._apoc_supports(_PERIODIC_ITERATE_PROCEDURE)):
+                return self._store_kg_periodic(self._node_store_rows(kg_data.nodes),
+                                               self._edge_store_rows(kg_data.edges, labels_by_id))
+            
+            # APOC 可用时非标准标签与关系类型改为参数传入，语句数量只随端点标签组合变化
+            dynamic = all(self._apoc_supports(name) for name in _APOC_MERGE_PROCEDURES)
+            nodes_by_key = self._group_nodes(kg_data.nodes, dynamic)
+            edges_by_key = self._group_edges(kg_data.edges, labels_by_id, dynamic)
+            # 分组只保存对象引用；参数行在事务内逐批构造，峰值内存只有正在写入的批次
+            node_groups = [
+                _LazyBatches(self._node_store_query(key), items,
+                             self._node_store_row_with_label if key is None else self._node_store_row, self.batch_size)
+                for key, items in nodes_by_key.items()
+            ]
+            edge_groups = [
+                _LazyBatches(self._edge_store_query(key), items, self._edge_store_row, self.batch_size)
+                for key, items in edges_by_key.items()
+            ]
             
-            # 存储边
-            for edge in kg_data.edges:
-                result = self._store_edge(edge)
-                if result.get("created"):
-                    stats["edges_created"] += 1
-                else:
-                    stats["edges_updated"] += 1
+            # 每个分组在独立会话/事务中并发写入；全部节点分组完成后才提交边分组
+            for kind, groups in (("nodes", node_groups), ("edges", edge_groups)):
+                results = self._run_write_groups(groups)
+                if results is None:
+                    return {**stats, "success": False, "error": f"批量写入{kind}失败"}
+                for result in results:
+                    record = result[0] if result else None
+                    if record is None:
+                        continue
+                    stats[f"{kind}_created"] += record["created"]
+                    stats[f"{kind}_updated"] += record["written"] - record["created"]
             
             self.logger.info(f"KG存储完成: {stats}")
             return stats
@@ -142,53 +531,117 @@ class Neo4jKGStore(BaseKGStore):
             self.logger.error(f"KG存储失败: {e}")
             return {"success": False, "error": str(e)}
     
-    def _store_node(self, node: KGNode) -> Dict[str, Any]:
-        """存储单个节点"""
-        query = f"""
-        MERGE (n:{node.type} {{id: $id}})
-        SET n.name = $name,
-            n.desc = $desc,
-            n.aliases = $aliases,
-            n.scope = $scope,
-            n.updated_at = datetime($updated_at)
-        ON CREATE SET n.created_at = datetime($created_at)
-        RETURN n, 
-               CASE WHEN n.created_at = datetime($created_at) THEN true ELSE false END as created
+    def _apoc_supports(self, procedure: str) -> bool:
+        available = self._apoc_procedures.get(procedure)
+        if available is None:
+            available = False
+            for probe in APOC_PROBE_QUERIES:
+                try:
+                    available = bool(self.neo4j_client.execute_cypher(probe, {"name": procedure}))
+                    break
+                except Exception:
+                    continue
+            self._apoc_procedures[procedure] = available
+        return available
+    
+    def _store_kg_periodic(self, node_rows: Dict[str, List[Dict[str, Any]]],
+                           edge_rows: Dict[Tuple[str, Optional[str], Optional[str]], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        大批量写入：每个标签/关系类型分组一次 apoc.periodic.iterate 调用，由服务端分批提交
+        
+        节点 id 互不相同，批次间无锁冲突，可并行提交；关系写入要锁两端节点，
+        共享枢纽节点的批次并行会互相等待甚至死锁，因此边批次串行提交。
+        无法区分新建与更新，统计中报告各分组已提交/失败的操作数与失败批次数。
+        """
+        stats = {
+            "nodes_committed": 0,
+            "nodes_failed": 0,
+            "nodes_failed_batches": 0,
+            "edges_committed": 0,
+            "edges_failed": 0,
+            "edges_failed_batches": 0,
+            "success": True
+        }
+        groups = [
+            ("nodes", _STORE_NODE_MERGE.format(label=label), rows, True)
+            for label, rows in node_rows.items()
+        ]
+        for (rel_type, source_label, target_label), rows in edge_rows.items():
+            self._ensure_rel_indexes(rel_type)
+            inner = "\n".join((
+                _endpoint_match("source", source_label, "row.source_id"),
+                _endpoint_match("target", target_label, "row.target_id"),
+            )) + _STORE_EDGE_MERGE.format(rel_type=rel_type)
+            groups.append(("edges", inner, rows, False))
+        
+        errors = []
+        for kind, inner, rows, parallel in groups:
+            params = {"inner": inner, "rows": rows, "batch_size": self.batch_size, "parallel": parallel}
+            record = self._single(_PERIODIC_ITERATE_QUERY, params)
+            if record is None:
+                stats["success"] = False
+                continue
+            stats[f"{kind}_committed"] += record["committedOperations"]
+            stats[f"{kind}_failed"] += record["failedOperations"]
+            stats[f"{kind}_failed_batches"] += record["failedBatches"]
+            errors.extend((record.get("errorMessages") or {}).keys())
+        if errors or stats["nodes_failed_batches"] or stats["edges_failed_batches"]:
+            stats["success"] = False
+            stats["error"] = "; ".join(errors[:5]) or "部分批次写入失败"
+        clear_kg_read_cache()
+        self.logger.info(f"KG并行存储完成: {stats}")
+        return stats
+    
+    @staticmethod
+    def _group_nodes(nodes: List[KGNode], dynamic: bool = False) -> Dict[Optional[str], List[KGNode]]:
+        """按标签分组；dynamic 时非标准标签的节点归入 None 组，标签随行传入"""
+        nodes_by_label: Dict[Optional[str], List[KGNode]] = {}
+        for node in nodes:
+            label = _node_label(node.type)
+            if dynamic and label not in NODE_LABELS:
+                label = None
+            nodes_by_label.setdefault(label, []).append(node)
+        return nodes_by_label
+    
+    def _group_edges(self, edges: List[KGEdge], labels_by_id: Dict[str, str], dynamic: bool = False
+                     ) -> Dict[Tuple[Optional[str], Optional[str], Optional[str]], List[KGEdge]]:
         """
+        按 (关系类型, 起点标签, 终点标签) 分组；端点不在本批节点中时其标签为 None
         
-        params = {
+        dynamic 时关系类型随行传入、分组键中的关系类型为 None，只按端点标签分组。
+        """
+        edges_by_key: Dict[Tuple[Optional[str], Optional[str], Optional[str]], List[KGEdge]] = {}
+        for edge in edges:
+            rel_type = _sanitize_rel_type(edge.type)
+            if dynamic:
+                self._ensure_rel_indexes(rel_type)
+            key = (None if dynamic else rel_type, labels_by_id.get(edge.source), labels_by_id.get(edge.target))
+            edges_by_key.setdefault(key, []).append(edge)
+        return edges_by_key
+    
+    @staticmethod
+    def _node_store_row(node: KGNode) -> Dict[str, Any]:
+        return {
             "id": node.id,
             "name": node.name,
             "desc": node.desc or "",
             "aliases": node.aliases or [],
             "scope": node.scope or "",
-            "created_at": node.created_at.isoformat() if node.created_at else "",
-            "updated_at": node.updated_at.isoformat() if node.updated_at else ""
+            "created_at": _epoch_millis(node.created_at),
+            "updated_at": _epoch_millis(node.updated_at),
         }
-        
-        result = self.neo4j_client.execute_cypher(query, params)
-        record = result[0] if result else None
-        return {"created": record["created"] if record else False}
-    
-    def _store_edge(self, edge: KGEdge) -> Dict[str, Any]:
-        """存储单个边"""
-        # 动态关系类型需要特殊处理
-        query = f"""
-        MATCH (source {{id: $source_id}})
-        MATCH (target {{id: $target_id}})
-        MERGE (source)-[r:{edge.type} {{rid: $rid}}]->(target)
-        SET r.desc = $desc,
-            r.confidence = $confidence,
-            r.weight = $weight,
-            r.scope = $scope,
-            r.src_section = $src_section,
-            r.updated_at = datetime($updated_at)
-        ON CREATE SET r.created_at = datetime($created_at)
-        RETURN r,
-               CASE WHEN r.created_at = datetime($created_at) THEN true ELSE false END as created
-        """
-        
-        params = {
+    
+    @classmethod
+    def _node_store_row_with_label(cls, node: KGNode) -> Dict[str, Any]:
+        row = cls._node_store_row(node)
+        row["label"] = str(node.type or "Concept")
+        return row
+    
+    @staticmethod
+    def _edge_store_row(edge: KGEdge) -> Dict[str, Any]:
+        created_at = _epoch_millis(edge.created_at)
+        return {
+            "rel_type": _sanitize_rel_type(edge.type),
             "source_id": edge.source,
             "target_id": edge.target,
             "rid": edge.rid,
@@ -197,13 +650,62 @@ class Neo4jKGStore(BaseKGStore):
             "weight": edge.weight,
             "scope": edge.scope or "",
             "src_section": edge.src_section or "",
-            "created_at": edge.created_at.isoformat() if edge.created_at else "",
-            "updated_at": edge.created_at.isoformat() if edge.created_at else ""  # 使用created_at作为updated_at的初始值
+            "created_at": created_at,
+            "updated_at": created_at,  # 使用created_at作为updated_at的初始值
         }
-        
-        result = self.neo4j_client.execute_cypher(query, params)
-        record = result[0] if result else None
-        return {"created": record["created"] if record else False}
+    
+    def _node_store_rows(self, nodes: List[KGNode]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+        """按标签分组的完整参数行（apoc.periodic.iterate 需要一次性传入全部行）"""
+        return {label: [self._node_store_row(node) for node in items]
+                for label, items in self._group_nodes(nodes).items()}
+    
+    def _edge_store_rows(self, edges: List[KGEdge], labels_by_id: Dict[str, str]
+                         ) -> Dict[Tuple[Optional[str], Optional[str], Optional[str]], List[Dict[str, Any]]]:
+        """按 (关系类型, 起点标签, 终点标签) 分组的完整参数行，供 apoc.periodic.iterate 使用"""
+        return {key: [self._edge_store_row(edge) for edge in items]
+                for key, items in self._group_edges(edges, labels_by_id).items()}
+    
+    def _node_store_query(self, label: Optional[str]) -> str:
+        if label is None:
+            return _APOC_STORE_NODES_QUERY
+        query = self._node_store_queries.get(label)
+        if query is None:
+            query = self._node_store_queries[label] = _STORE_NODES_TEMPLATE.format(label=label)
+        return query
+    
+    def _edge_store_query(self, key: Tuple[Optional[str], Optional[str], Optional[str]]) -> str:
+        query = self._edge_store_queries.get(key)
+        if query is None:
+            rel_type, source_label, target_label = key
+            source_match = _endpoint_match("source", source_label, "row.source_id")
+            target_match = _endpoint_match("target", target_label, "row.target_id")
+            if rel_type is None:
+                query = _APOC_STORE_EDGES_TEMPLATE.format(source_match=source_match, target_match=target_match)
+            else:
+                query = _STORE_EDGES_TEMPLATE.format(rel_type=rel_type, source_match=source_match,
+                                                     target_match=target_match)
+                self._ensure_rel_indexes(rel_type)
+            self._edge_store_queries[key] = query
+        return query
+    
+    def _ensure_rel_indexes(self, rel_type: str) -> None:
+        # 本实例首次写入该关系类型时补建其 rid/scope 索引（IF NOT EXISTS，重复执行无副作用）
+        if rel_type not in self._indexed_rel_types:
+            self._indexed_rel_types.add(rel_type)
+            self._run_ddl(_rel_index_statements(rel_type))
+    
+    def _batched(self, rows_by_key: Dict[str, List[Dict[str, Any]]], query_for,
+                 extra_params: Optional[Dict[str, Any]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """按分组键生成语句，每组按 batch_size 切分为多条 (query, params)"""
+        size = self.batch_size
+        statements = []
+        for key, rows in rows_by_key.items():
+            query = query_for(key)
+            statements.extend(
+                (query, {"rows": rows[i:i + size], **(extra_params or {})})
+                for i in range(0, len(rows), size)
+            )
+        return statements
     
     def get_stats(self) -> Dict[str, int]:
         """获取Neo4j中的统计信息"""
@@ -211,17 +713,11 @@ class Neo4jKGStore(BaseKGStore):
             return {"total_nodes": 0, "total_edges": 0}
         
         try:
-            # 统计节点
-            nodes_query = "MATCH (n) RETURN count(n) as total_nodes"
-            nodes_result = self.neo4j_client.execute_cypher(nodes_query)
-            total_nodes = nodes_result[0]["total_nodes"] if nodes_result else 0
-            
-            # 统计关系
-            edges_query = "MATCH ()-[r]->() RETURN count(r) as total_edges"
-            edges_result = self.neo4j_client.execute_cypher(edges_query)
-            total_edges = edges_result[0]["total_edges"] if edges_result else 0
-            
-            return {"total_nodes": total_nodes, "total_edges": total_edges}
+            # 节点与关系计数在同一条语句的两个子查询中完成，一次往返
+            record = self._single(_STATS_QUERY)
+            if record is None:
+                return {"total_nodes": 0, "total_edges": 0}
+            return {"total_nodes": record["total_nodes"], "total_edges": record["total_edges"]}
             
         except Exception as e:
             self.logger.error(f"获取统计信息失败: {e}")
@@ -231,30 +727,39 @@ class Neo4jKGStore(BaseKGStore):
         """按scope删除节点和关系"""
         if not self.neo4j_client or not scope:
             return 0
+        if scope in self._cleared_scopes:
+            return 0
 
         try:
-            # 删除关系
-            edges_query = "MATCH ()-[r]-() WHERE r.scope = $scope DELETE r RETURN count(r) as deleted_edges"
-            edges_result = self.neo4j_client.execute_cypher(edges_query, {"scope": scope})
-            deleted_edges = edges_result[0]["deleted_edges"] if edges_result else 0
-            
-            # 删除孤立节点
-            nodes_query = """
-            MATCH (n) 
-            WHERE n.scope = $scope AND NOT (n)-[]-() 
-            DELETE n 
-            RETURN count(n) as deleted_nodes
-            """
-            nodes_result = self.neo4j_client.execute_cypher(nodes_query, {"scope": scope})
-            deleted_nodes = nodes_result[0]["deleted_nodes"] if nodes_result else 0
+            # 先删除关系，再删除因此孤立的节点；均按 batch_size 分批提交，单个事务的状态有上限
+            params = {"scope": scope, "batch": self.batch_size}
+            deleted_edges = self._delete_in_batches(_DELETE_SCOPE_EDGES_QUERY, params)
+            deleted_nodes = self._delete_in_batches(_DELETE_SCOPE_NODES_QUERY, params)
             
             self.logger.info(f"按scope删除: {deleted_edges} edges, {deleted_nodes} nodes")
+            clear_kg_read_cache()
+            self._cleared_scopes.add(scope)
             return deleted_edges + deleted_nodes
             
         except Exception as e:
             self.logger.error(f"按scope删除失败: {e}")
         return 0
 
+    def _forget_cleared_scopes(self, scopes) -> None:
+        """写入前调用：被写入的 scope 不再视为已清空"""
+        if self._cleared_scopes:
+            self._cleared_scopes.difference_update(scopes)
+    
+    def _delete_in_batches(self, query: str, params: Dict[str, Any]) -> int:
+        """重复执行带 LIMIT 的删除语句直到不足一批，返回删除总数"""
+        total = 0
+        while True:
+            record = self._single(query, params)
+            deleted = record["deleted"] if record else 0
+            total += deleted
+            if deleted < params["batch"]:
+                return total
+    
     def delete_edges_by_src(self, section_id: str) -> int:
         """按src删除边（向后兼容方法）"""
         if not self.neo4j_client or not section_id:
@@ -263,10 +768,11 @@ class Neo4jKGStore(BaseKGStore):
         try:
             # 删除指定src的关系
             query = "MATCH ()-[r]-() WHERE r.src = $section_id DELETE r RETURN count(r) as deleted_edges"
-            result = self.neo4j_client.execute_cypher(query, {"section_id": section_id})
-            deleted_edges = result[0]["deleted_edges"] if result else 0
+            record = self._single(query, {"section_id": section_id})
+            deleted_edges = record["deleted_edges"] if record else 0
             
             self.logger.info(f"按src删除: {deleted_edges} edges")
+            clear_kg_read_cache()
             return deleted_edges
             
         except Exception as e:
@@ -279,17 +785,20 @@ class Neo4jKGStore(BaseKGStore):
             return False
         
         try:
-            query = """
-            MERGE (n {id: $id})
+            query = f"""
+            MERGE (n {{id: $id}})
             SET n += $properties
+            {_SET_LOWERCASE_MIRRORS}
             RETURN n.id as node_id
             """
             params = {
                 "id": node.get("id"),
                 "properties": node
             }
-            result = self.neo4j_client.execute_cypher(query, params)
-            return bool(result)
+            self._forget_cleared_scopes([node.get("scope")])
+            record = self._single(query, params)
+            clear_kg_read_cache()
+            return record is not None
             
         except Exception as e:
             self.logger.error(f"节点合并失败: {e}")
@@ -315,20 +824,142 @@ class Neo4jKGStore(BaseKGStore):
                 "rid": edge.get("rid"),
                 "properties": edge
             }
-            result = self.neo4j_client.execute_cypher(query, params)
-            return bool(result)
+            self._forget_cleared_scopes([edge.get("scope")])
+            record = self._single(query, params)
+            clear_kg_read_cache()
+            return record is not None
             
         except Exception as e:
             self.logger.error(f"边合并失败: {e}")
             return False
 
 
+    def merge_nodes_bulk(self, nodes: List[Dict[str, Any]]) -> int:
+        """
+        以 UNWIND 分批合并节点，所有批次在同一个写事务中提交
+        
+        已知类型按标签分组，使用启动时生成的带标签语句；未知类型使用通用语句。
+        """
+        if not self.neo4j_client:
+            return 0
+        
+        rows_by_query: Dict[str, List[Dict[str, Any]]] = {}
+        for node in nodes:
+            if not node:
+                continue
+            label = _LABEL_BY_TYPE.get(str(node.get("type") or "").lower())
+            query = _MERGE_NODES_BULK_QUERIES[label] if label else _MERGE_NODES_BULK_QUERY
+            rows_by_query.setdefault(query, []).append({"id": node.get("id"), "properties": node})
+        statements = self._batched(rows_by_query, lambda query: query)
+        self._forget_cleared_scopes([node.get("scope") for node in nodes if node])
+        try:
+            return self._execute_write_batches(statements)
+        except Exception as e:
+            self.logger.error(f"批量节点合并失败: {e}")
+            return 0
+    
+    def merge_edges_bulk(self, edges: List[Dict[str, Any]], rids: Optional[List[str]] = None,
+                         extra_properties: Optional[Dict[str, Any]] = None) -> int:
+        """
+        以 UNWIND 分批合并边；关系类型不能参数化，按类型分组后各自成批
+        
+        rid 与共享属性作为查询参数在服务端写入，无需为每条边复制字典。
+        """
+        if not self.neo4j_client:
+            return 0
+        
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for i, edge in enumerate(edges):
+            if not edge:
+                continue
+            rows_by_type.setdefault(_sanitize_rel_type(edge.get("type")), []).append({
+                "source_id": edge.get("source_id"),
+                "target_id": edge.get("target_id"),
+                "rid": rids[i] if rids is not None else edge.get("rid"),
+                "properties": edge
+            })
+        statements = self._batched(rows_by_type, self._edge_bulk_query,
+                                   {"extra_properties": extra_properties or {}})
+        self._forget_cleared_scopes([edge.get("scope") for edge in edges if edge]
+                                    + [(extra_properties or {}).get("scope")])
+        try:
+            return self._execute_write_batches(statements)
+        except Exception as e:
+            self.logger.error(f"批量边合并失败: {e}")
+            return 0
+    
+    def _edge_bulk_query(self, rel_type: str) -> str:
+        query = self._edge_bulk_queries.get(rel_type)
+        if query is None:
+            query = self._edge_bulk_queries[rel_type] = _MERGE_EDGES_BULK_TEMPLATE.format(rel_type=rel_type)
+            self._ensure_rel_indexes(rel_type)
+        return query
+    
+    def _run_write_batches(self, statements: List[Tuple[str, Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """在单个写事务中执行批量语句，返回每条语句的记录列表"""
+        if not statements:
+            return []
+        
+        execute_write_batch = getattr(self.neo4j_client, "execute_write_batch", None)
+        if execute_write_batch is not None:
+            results = execute_write_batch(statements)
+        else:
+            results = [self.neo4j_client.execute_cypher(query, params) for query, params in statements]
+        clear_kg_read_cache()
+        return results
+    
+    def _run_write_groups(self, groups: List[_LazyBatches]) -> Optional[List[List[Dict[str, Any]]]]:
+        """
+        各分组在独立写事务中并发执行，返回所有语句的记录列表；任一分组失败时返回 None
+        
+        不同分组写入的节点/关系互不重叠，可安全并行；边分组之间可能争用同一端点节点的锁，
+        驱动的托管事务会对死锁等瞬时错误自动重试。并发度受连接池大小约束。
+        """
+        groups = [group for group in groups if group]
+        if not groups:
+            return []
+        
+        execute_write_batch = getattr(self.neo4j_client, "execute_write_batch", None)
+        
+        def run_group(statements):
+            if execute_write_batch is not None:
+                return execute_write_batch(statements)
+            return [self.neo4j_client.execute_cypher(query, params) for query, params in statements]
+        
+        try:
+            workers = min(self.max_write_workers, len(groups))
+            if workers <= 1:
+                group_results = [run_group(group) for group in groups]
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kg-store") as executor:
+                    group_results = list(executor.map(run_group, groups))
+        finally:
+            # 即使部分分组失败，已提交的分组也会改变图数据
+            clear_kg_read_cache()
+        
+        results = []
+        for group, group_result in zip(groups, group_results):
+            if not group_result:
+                return None
+            results.extend(group_result)
+        return results
+    
+    def _execute_write_batches(self, statements: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """在单个写事务中执行批量语句，汇总各批次返回的 written 计数"""
+        return sum(result[0]["written"] for result in self._run_write_batches(statements) if result)
+
+
 class MemoryKGStore(BaseKGStore):
     """内存KG存储实现（用于测试和开发）"""
     
     def __init__(self):
-        self.nodes: Dict[str, Dict[str, Any]] = {}
-        self.edges: Dict[str, Dict[str, Any]] = {}
+        self.nodes: Dict[str, KGNode] = {}
+        self.edges: Dict[str, KGEdge] = {}
+        # scope -> 曾写入该 scope 的节点ID/边rid；条目改写到其他 scope 后旧桶中的记录在删除时校验跳过
+        self._nodes_by_scope: Dict[str, Set[str]] = {}
+        self._edges_by_scope: Dict[str, Set[str]] = {}
+        # 每次写入/删除后递增，供查询侧判断其派生索引是否过期
+        self.version = 0
         self.logger = logging.getLogger(__name__)
     
     def store_kg(self, kg_data: KGDict, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -342,44 +973,24 @@ class MemoryKGStore(BaseKGStore):
                 "success": True
             }
             
-            # 存储节点
-            for node in kg_data.nodes:
-                if node.id in self.nodes:
-                    stats["nodes_updated"] += 1
-                else:
-                    stats["nodes_created"] += 1
-                
-                self.nodes[node.id] = {
-                    "id": node.id,
-                    "name": node.name,
-                    "type": node.type,
-                    "desc": node.desc,
-                    "aliases": node.aliases,
-                    "scope": node.scope,
-                    "created_at": node.created_at,
-                    "updated_at": node.updated_at
-                }
+            # 新建数 = 本批中此前不存在的不同ID数（与逐条判断、批内重复ID记为更新的结果一致）
+            nodes, edges = kg_data.nodes, kg_data.edges
+            new_node_ids = {node.id for node in nodes} - self.nodes.keys()
+            stats["nodes_created"] = len(new_node_ids)
+            stats["nodes_updated"] = len(nodes) - len(new_node_ids)
+            # 直接保存 slots 数据类对象，不再为每个节点/边复制一份同构字典；读取时再转换
+            self.nodes.update((node.id, node) for node in nodes)
+            for node in nodes:
+                self._nodes_by_scope.setdefault(node.scope, set()).add(node.id)
             
-            # 存储边
-            for edge in kg_data.edges:
-                if edge.rid in self.edges:
-                    stats["edges_updated"] += 1
-                else:
-                    stats["edges_created"] += 1
-                
-                self.edges[edge.rid] = {
-                    "rid": edge.rid,
-                    "type": edge.type,
-                    "source": edge.source,
-                    "target": edge.target,
-                    "desc": edge.desc,
-                    "confidence": edge.confidence,
-                    "weight": edge.weight,
-                    "scope": edge.scope,
-                    "src_section": edge.src_section,
-                    "created_at": edge.created_at
-                }
+            new_rids = {edge.rid for edge in edges} - self.edges.keys()
+            stats["edges_created"] = len(new_rids)
+            stats["edges_updated"] = len(edges) - len(new_rids)
+            self.edges.update((edge.rid, edge) for edge in edges)
+            for edge in edges:
+                self._edges_by_scope.setdefault(edge.scope, set()).add(edge.rid)
             
+            self.version += 1
             return stats
             
         except Exception as e:
@@ -395,16 +1006,18 @@ class MemoryKGStore(BaseKGStore):
         if not scope:
             return 0
         
-        # 删除边
-        edges_to_delete = [rid for rid, edge in self.edges.items() if edge.get("scope") == scope]
+        # 只遍历该 scope 的反向索引桶，而非全部节点/边
+        edges_to_delete = [rid for rid in self._edges_by_scope.pop(scope, ())
+                           if (edge := self.edges.get(rid)) is not None and edge.scope == scope]
         for rid in edges_to_delete:
             del self.edges[rid]
         
-        # 删除节点
-        nodes_to_delete = [nid for nid, node in self.nodes.items() if node.get("scope") == scope]
+        nodes_to_delete = [nid for nid in self._nodes_by_scope.pop(scope, ())
+                           if (node := self.nodes.get(nid)) is not None and node.scope == scope]
         for nid in nodes_to_delete:
             del self.nodes[nid]
         
+        self.version += 1
         return len(edges_to_delete) + len(nodes_to_delete)
 
 
@@ -425,4 +1038,7 @@ class KGStore(Protocol):
     def delete_edges_by_src(self, section_id: str) -> int: ...
     def get_stats(self) -> Dict[str, int]: ...
     def delete_edges_by_scope(self, scope: str) -> int: ...
+    def merge_nodes_bulk(self, nodes: List[Dict[str, Any]]) -> int: ...
+    def merge_edges_bulk(self, edges: List[Dict[str, Any]], rids: Optional[List[str]] = None,
+                         extra_properties: Optional[Dict[str, Any]] = None) -> int: ...
 
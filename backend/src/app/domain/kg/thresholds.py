@@ -1,11 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import logging
-from typing import Dict, List, Any
+from dataclasses import replace
+from typing import Callable, Dict, List, Any, Optional
+
+from .schemas import KGDict, KGEdge
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
 
 
 logger = logging.getLogger(__name__)
 
+# 边数达到该值且安装了 numpy 时，展示过滤改用向量化掩码；更少的边逐条比较更快
+_VECTORIZE_MIN_EDGES = 512
+
 DEFAULT_THRESHOLDS = {
     "theta_add": 0.55,
     "theta_show": 0.60,
@@ -19,25 +30,31 @@ class KGThresholds:
         self.thresholds = DEFAULT_THRESHOLDS.copy()
         kg_config = self.config.get("kg", {})
         self.thresholds.update(kg_config.get("thresholds", {}))
+        # 过滤热路径直接读取预先转换好的阈值属性，不再逐次查字典
+        self._theta_add = float(self.get_threshold("theta_add"))
+        self._theta_show = float(self.get_threshold("theta_show"))
+        self._min_evidence = float(self.get_threshold("min_evidence_count"))
 
     def get_threshold(self, name: str) -> float:
         return self.thresholds.get(name, DEFAULT_THRESHOLDS.get(name, 0.0))
 
     def filter_edges_for_storage(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        theta_add = self.get_threshold("theta_add")
+        theta_add = self._theta_add
         return [e for e in edges if e.get("confidence", 0.0) >= theta_add]
 
     def filter_edges_for_display(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        theta_show = self.get_threshold("theta_show")
-        min_evidence_count = self.get_threshold("min_evidence_count")
-        filtered: List[Dict[str, Any]] = []
-        for e in edges:
-            conf = e.get("confidence", 0.0)
-            ev = e.get("evidence", "")
-            cnt = len(ev.split(";")) if ev else 1
-            if conf >= theta_show and cnt >= min_evidence_count:
-                filtered.append(e)
-        return filtered
+        theta_show = self._theta_show
+        min_evidence_count = self._min_evidence
+        if np is not None and len(edges) >= _VECTORIZE_MIN_EDGES:
+            conf, cnt = _build_arrays(edges)
+            mask = (conf >= theta_show) & (cnt >= min_evidence_count)
+            return [edges[i] for i in np.flatnonzero(mask)]
+        # 分号计数 + 1 与 len(ev.split(";")) 相同，但不分配子串列表
+        return [
+            e for e in edges
+            if e.get("confidence", 0.0) >= theta_show
+            and ((ev.count(";") + 1) if (ev := e.get("evidence", "")) else 1) >= min_evidence_count
+        ]
     
     def apply_thresholds(self, kg_data: Dict[str, Any]) -> Dict[str, Any]:
         """应用阈值过滤到知识图谱数据"""
@@ -62,3 +79,34 @@ class KGThresholds:
             logger.error(f"应用阈值失败: {e}")
             return kg_data
 
+    def filter_kg_dict(self, kg_data: KGDict) -> KGDict:
+        """直接对KGDict应用阈值过滤，无需与旧格式互相转换（节点暂时全部保留）"""
+        theta_add = self._theta_add
+        edges = kg_data.edges
+        filtered_edges = [e for e in edges if e.confidence >= theta_add]
+        logger.info(f"阈值过滤: 节点 {len(kg_data.nodes)}, 边 {len(filtered_edges)}/{len(edges)}")
+        return replace(kg_data, edges=filtered_edges, total_edges=len(filtered_edges))
+    
+    def storage_edge_stage(self) -> Callable[[KGEdge], Optional[KGEdge]]:
+        """返回供 KGDict.transform 使用的逐边存储阈值函数：未达 theta_add 的边返回 None"""
+        theta_add = self._theta_add
+        
+        def passes_threshold(edge: KGEdge) -> Optional[KGEdge]:
+            return edge if edge.confidence >= theta_add else None
+        
+        return passes_threshold
+
+
+def _build_arrays(edges: List[Dict[str, Any]]):
+    """
+    一次性取出各边的置信度与证据条数，供向量化过滤使用
+    
+    置信度用 float64，与逐条比较的浮点语义一致；证据条数以分号计数 + 1 得到，不分配子串列表。
+    """
+    n = len(edges)
+    conf = np.fromiter((e.get("confidence", 0.0) for e in edges), dtype=np.float64, count=n)
+    cnt = np.fromiter(
+        ((ev.count(";") + 1) if ev else 1 for ev in (e.get("evidence", "") for e in edges)),
+        dtype=np.int64, count=n,
+    )
+    return conf, cnt
@@ -1,8 +1,52 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, Tag, field_serializer, model_validator
+
+
+class TextbookParams(BaseModel):
+    """textbook 工作流参数，字段与其 input_schema 对应"""
+    model_config = ConfigDict(extra="forbid")
+
+    workflow_type: Literal["textbook"] = "textbook"
+    target_audience: Optional[str] = None
+    language: Optional[str] = None
+    chapter_count: Optional[int] = None
+    enable_qa: Optional[bool] = None
+    enable_kg: Optional[bool] = None
+
+
+class QuizMakerParams(BaseModel):
+    """quiz_maker 工作流参数，字段与其 input_schema 对应"""
+    model_config = ConfigDict(extra="forbid")
+
+    workflow_type: Literal["quiz_maker"] = "quiz_maker"
+    difficulty: Optional[str] = None
+    question_count: Optional[int] = None
+    question_types: Optional[List[str]] = None
+    language: Optional[str] = None
+
+
+_TYPED_WORKFLOW_PARAMS = ("textbook", "quiz_maker")
+# 没有专用参数模型的工作流（如新注册的工作流），参数按字典原样透传
+_GENERIC_PARAMS_TAG = "generic"
+
+
+def _workflow_params_tag(value: Any) -> str:
+    workflow_type = value.get("workflow_type") if isinstance(value, dict) else getattr(value, "workflow_type", None)
+    return workflow_type if workflow_type in _TYPED_WORKFLOW_PARAMS else _GENERIC_PARAMS_TAG
+
+
+# 按 workflow_type 判别的参数联合：已知工作流直接选中对应子模型，不再逐个尝试；其余工作流走通用字典分支
+WorkflowParams = Annotated[
+    Union[
+        Annotated[TextbookParams, Tag("textbook")],
+        Annotated[QuizMakerParams, Tag("quiz_maker")],
+        Annotated[Dict[str, Any], Tag(_GENERIC_PARAMS_TAG)],
+    ],
+    Discriminator(_workflow_params_tag),
+]
 
 
 class RunCreate(BaseModel):
@@ -10,7 +54,27 @@ class RunCreate(BaseModel):
     language: str = Field("中文", description="生成语言")
     chapter_count: int = Field(8, ge=1, le=20, description="章节数（教材工作流适用）")
     workflow_id: str = Field("textbook", description="工作流ID，默认为textbook以保持向后兼容")
-    workflow_params: Optional[Dict[str, Any]] = Field(None, description="工作流特定参数")
+    workflow_params: Optional[WorkflowParams] = Field(None, description="工作流特定参数")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _tag_workflow_params(cls, data: Any) -> Any:
+        # 客户端只在顶层提供 workflow_id，这里把它补为参数的判别字段
+        if isinstance(data, dict) and isinstance(data.get("workflow_params"), dict):
+            params = data["workflow_params"]
+            if "workflow_type" not in params:
+                workflow_id = data.get("workflow_id") or "textbook"
+                data = {**data, "workflow_params": {**params, "workflow_type": workflow_id}}
+        return data
+
+    @field_serializer("workflow_params")
+    def _dump_workflow_params(self, params: Optional[Union[TextbookParams, QuizMakerParams, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        # 只导出客户端实际提供的参数，未提供的字段不以 None 覆盖工作流的默认值
+        if params is None:
+            return None
+        if isinstance(params, dict):
+            return {key: value for key, value in params.items() if key != "workflow_type"}
+        return params.model_dump(exclude_unset=True, exclude={"workflow_type"})
 
 
 class RunCreated(BaseModel):
@@ -24,4 +88,3 @@ class RunStatus(BaseModel):
     error: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
     updated_at: Optional[int] = None
-
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作流检查点模式 - 控制 LangGraph 在运行期间何时持久化状态
+"""
+
+import inspect
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# 每个节点执行后都写检查点（便于调试/断点续跑）
+CHECKPOINT_EVERY_NODE = "every_node"
+# 仅在工作流结束时写一次检查点；线性且不会中途恢复的流水线使用
+CHECKPOINT_END_OF_WORKFLOW = "end_of_workflow"
+
+
+def checkpoint_invoke_kwargs(app: Any, mode: str) -> Dict[str, Any]:
+    """
+    按检查点模式生成 app.invoke 的附加参数
+
+    end_of_workflow 在新版 LangGraph 中对应 durability="exit"，较早版本对应 checkpoint_during=False；
+    两者都不支持时退回每个节点写检查点的默认行为。
+    """
+    if mode != CHECKPOINT_END_OF_WORKFLOW:
+        return {}
+    try:
+        parameters = inspect.signature(app.invoke).parameters
+    except (TypeError, ValueError):
+        return {}
+    if "durability" in parameters:
+        return {"durability": "exit"}
+    if "checkpoint_during" in parameters:
+        return {"checkpoint_during": False}
+    logger.debug("当前 LangGraph 版本不支持延迟检查点，按节点写入")
+    return {}
@@ -11,6 +11,9 @@ from dataclasses import dataclass
 from langgraph.graph import StateGraph
 from langgraph.checkpoint.memory import MemorySaver
 
+from ..checkpointing import CHECKPOINT_END_OF_WORKFLOW, checkpoint_invoke_kwargs
+from ....core.concurrency import default_concurrency_config
+
 logger = logging.getLogger(__name__)
 
 
@@ -113,10 +116,46 @@ def get_metadata():
     }
 
 
+def _generate_question(topic: str, index: int, question_type: str) -> Dict[str, Any]:
+    """
+    生成单道题目
+    
+    各题目互不依赖，由 question_generator_node 并发调用；接入LLM时在此处发起单题请求。
+    """
+    # 这里应该调用LLM服务生成真实的问答题目
+    # 为演示目的，我们创建示例问题
+    if question_type == 'multiple_choice':
+        return {
+            "id": index + 1,
+            "type": "multiple_choice",
+            "question": f"关于{topic}的第{index+1}个选择题？",
+            "options": ["选项A", "选项B", "选项C", "选项D"],
+            "correct_answer": "A",
+            "explanation": f"这是关于{topic}的解释"
+        }
+    if question_type == 'short_answer':
+        return {
+            "id": index + 1,
+            "type": "short_answer",
+            "question": f"请简述{topic}的第{index+1}个概念？",
+            "sample_answer": f"这是关于{topic}的简答题参考答案",
+            "keywords": [f"关键词{index+1}", f"概念{index+1}"]
+        }
+    return {
+        "id": index + 1,
+        "type": question_type,
+        "question": f"关于{topic}的第{index+1}个{question_type}题目？",
+        "answer": "示例答案"
+    }
+
+
 def question_generator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     问题生成节点 - 生成问答题目
     
+    先确定每道题的类型，再将各题的生成请求并发提交（并发度受 qa_generator 的 max_workers 限制），
+    网络/LLM 等待相互重叠；结果按题号顺序汇总。
+    
     Args:
         state: 工作流状态
         
@@ -127,42 +166,15 @@ def question_generator_node(state: Dict[str, Any]) -> Dict[str, Any]:
         # 模拟问题生成（实际应调用LLM）
         logger.info(f"Generating {state.get('question_count', 10)} questions for topic: {state.get('topic')}")
         
-        # 这里应该调用LLM服务生成真实的问答题目
-        # 为演示目的，我们创建示例问题
-        questions = []
         topic = state.get('topic', '示例主题')
         question_count = state.get('question_count', 10)
         question_types = state.get('question_types', ['multiple_choice', 'short_answer'])
+        specs = [(i, question_types[i % len(question_types)]) for i in range(question_count)]
         
-        for i in range(question_count):
-            question_type = question_types[i % len(question_types)]
-            
-            if question_type == 'multiple_choice':
-                question = {
-                    "id": i + 1,
-                    "type": "multiple_choice",
-                    "question": f"关于{topic}的第{i+1}个选择题？",
-                    "options": ["选项A", "选项B", "选项C", "选项D"],
-                    "correct_answer": "A",
-                    "explanation": f"这是关于{topic}的解释"
-                }
-            elif question_type == 'short_answer':
-                question = {
-                    "id": i + 1,
-                    "type": "short_answer",
-                    "question": f"请简述{topic}的第{i+1}个概念？",
-                    "sample_answer": f"这是关于{topic}的简答题参考答案",
-                    "keywords": [f"关键词{i+1}", f"概念{i+1}"]
-                }
-            else:
-                question = {
-                    "id": i + 1,
-                    "type": question_type,
-                    "question": f"关于{topic}的第{i+1}个{question_type}题目？",
-                    "answer": "示例答案"
-                }
-                
-            questions.append(question)
+        timeout = default_concurrency_config.get_timeout("qa_generator")
+        with default_concurrency_config.create_thread_pool("qa_generator", len(specs)) as executor:
+            futures = [executor.submit(_generate_question, topic, i, question_type) for i, question_type in specs]
+            questions = [future.result(timeout=timeout) for future in futures]
         
         return {
             **state,
@@ -254,6 +266,8 @@ class QuizMakerWorkflow:
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.app = None
+        # 线性流水线不会中途恢复，默认只在结束时写检查点；调试时可设为 "every_node"
+        self.checkpoint_mode = self.config.get("checkpoint_mode", CHECKPOINT_END_OF_WORKFLOW)
         self._build_graph()
     
     def _build_graph(self):
@@ -297,7 +311,8 @@ class QuizMakerWorkflow:
                 del safe_state["vector_store"]
             
             # 执行工作流
-            result = self.app.invoke(safe_state, config=config)
+            result = self.app.invoke(safe_state, config=config,
+                                     **checkpoint_invoke_kwargs(self.app, self.checkpoint_mode))
             return result
             
         except Exception as e:
@@ -5,6 +5,7 @@
 """
 
 import logging
+import threading
 from importlib import import_module
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -12,6 +13,9 @@ from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# 扫描工作流目录时跳过的子目录
+_SKIP_DIRS = frozenset({'__pycache__', '.pytest_cache'})
+
 
 @dataclass
 class WorkflowMetadata:
@@ -32,6 +36,14 @@ class WorkflowRegistry:
         self._cache: Dict[str, Any] = {}
         self._metadata_cache: Dict[str, WorkflowMetadata] = {}
         self.base_path = Path(__file__).parent
+        # list_workflows 结果缓存；工作流目录的 mtime 变化（增删子目录）时重新扫描
+        self._list_cache: Optional[List[WorkflowMetadata]] = None
+        self._list_mtime = 0
+        # workflow_id -> graph 模块；元数据与实例两条路径共用一次导入
+        self._modules: Dict[str, Any] = {}
+        # workflow_id -> 构建锁，并发的首次请求只编译一次工作流图
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._build_locks_guard = threading.Lock()
         
     def list_workflows(self) -> List[WorkflowMetadata]:
         """
@@ -40,12 +52,16 @@ class WorkflowRegistry:
         Returns:
             工作流元数据列表
         """
+        mtime = self.base_path.stat().st_mtime_ns
+        if self._list_cache is not None and mtime == self._list_mtime:
+            return list(self._list_cache)
+        
         workflows = []
         
         # 扫描工作流目录
         for workflow_dir in self.base_path.iterdir():
-            if (workflow_dir.is_dir() and 
-                workflow_dir.name not in ['__pycache__', '.pytest_cache'] and
+            if (workflow_dir.name not in _SKIP_DIRS and
+                workflow_dir.is_dir() and
                 (workflow_dir / 'graph.py').exists()):
                 
                 try:
@@ -54,8 +70,10 @@ class WorkflowRegistry:
                         workflows.append(metadata)
                 except Exception as e:
                     logger.warning(f"Failed to load workflow {workflow_dir.name}: {e}")
-                    
-        return workflows
+        
+        self._list_cache = workflows
+        self._list_mtime = mtime
+        return list(workflows)
     
     def get_workflow(self, workflow_id: str):
         """
@@ -72,22 +90,55 @@ class WorkflowRegistry:
         """
         if workflow_id in self._cache:
             return self._cache[workflow_id]
+        
+        with self._build_lock(workflow_id):
+            # 等锁期间其他线程可能已完成构建
+            if workflow_id in self._cache:
+                return self._cache[workflow_id]
             
-        try:
-            # 动态导入工作流模块
-            module_path = f'app.domain.workflows.{workflow_id}.graph'
-            module = import_module(module_path)
-            
-            # 获取工作流实例
-            if hasattr(module, 'get_workflow'):
-                workflow = module.get_workflow()
-                self._cache[workflow_id] = workflow
-                return workflow
-            else:
-                raise ValueError(f"Workflow {workflow_id} does not export get_workflow() function")
+            try:
+                # 动态导入工作流模块
+                module = self._import_graph_module(workflow_id)
                 
-        except ImportError as e:
-            raise ValueError(f"Workflow {workflow_id} not found: {e}")
+                # 获取工作流实例
+                if hasattr(module, 'get_workflow'):
+                    workflow = module.get_workflow()
+                    self._cache[workflow_id] = workflow
+                    return workflow
+                else:
+                    raise ValueError(f"Workflow {workflow_id} does not export get_workflow() function")
+                    
+            except ImportError as e:
+                raise ValueError(f"Workflow {workflow_id} not found: {e}")
+    
+    def warmup(self, ids: Optional[List[str]] = None) -> None:
+        """
+        预先导入并构建工作流（含图编译），避免首个请求承担冷启动开销
+        
+        Args:
+            ids: 需要预热的工作流ID；为None时预热目录中发现的全部工作流
+        """
+        if ids is None:
+            ids = [metadata.id for metadata in self.list_workflows()]
+        for workflow_id in ids:
+            try:
+                self._get_workflow_metadata(workflow_id)
+                self.get_workflow(workflow_id)
+            except Exception as e:
+                logger.warning(f"Failed to warm up workflow {workflow_id}: {e}")
+    
+    def _build_lock(self, workflow_id: str) -> threading.Lock:
+        with self._build_locks_guard:
+            lock = self._build_locks.get(workflow_id)
+            if lock is None:
+                lock = self._build_locks[workflow_id] = threading.Lock()
+            return lock
+    
+    def _import_graph_module(self, workflow_id: str):
+        module = self._modules.get(workflow_id)
+        if module is None:
+            module = self._modules[workflow_id] = import_module(f'app.domain.workflows.{workflow_id}.graph')
+        return module
             
     def get_workflow_metadata(self, workflow_id: str) -> Optional[WorkflowMetadata]:
         """
@@ -116,8 +167,7 @@ class WorkflowRegistry:
             
         try:
             # 动态导入工作流模块
-            module_path = f'app.domain.workflows.{workflow_id}.graph'
-            module = import_module(module_path)
+            module = self._import_graph_module(workflow_id)
             
             # 获取元数据
             if hasattr(module, 'get_metadata'):
@@ -162,11 +212,14 @@ class WorkflowRegistry:
         """
         self._cache[workflow_id] = workflow_instance
         self._metadata_cache[workflow_id] = metadata
+        self._list_cache = None
         
     def clear_cache(self):
         """清空缓存"""
         self._cache.clear()
         self._metadata_cache.clear()
+        self._modules.clear()
+        self._list_cache = None
 
 
 # 全局单例
@@ -11,6 +11,7 @@ from langgraph.graph import StateGraph
 from langgraph.checkpoint.memory import MemorySaver
 
 from ...state.textbook_state import TextbookState
+from ..checkpointing import CHECKPOINT_END_OF_WORKFLOW, checkpoint_invoke_kwargs
 from .nodes.planner_node import planner_node
 from .nodes.researcher_node import researcher_node
 from .nodes.writer_node import writer_node
@@ -122,6 +123,8 @@ class TextbookWorkflow:
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.app = None
+        # 线性流水线不会中途恢复，默认只在结束时写检查点；调试时可设为 "every_node"
+        self.checkpoint_mode = self.config.get("checkpoint_mode", CHECKPOINT_END_OF_WORKFLOW)
         self._build_graph()
 
     def _build_graph(self):
@@ -181,7 +184,8 @@ class TextbookWorkflow:
             safe_state = initial_state.copy()
             if "vector_store" in safe_state:
                 del safe_state["vector_store"]
-            result = self.app.invoke(safe_state, config=config)
+            result = self.app.invoke(safe_state, config=config,
+                                     **checkpoint_invoke_kwargs(self.app, self.checkpoint_mode))
             return result
         finally:
             try:
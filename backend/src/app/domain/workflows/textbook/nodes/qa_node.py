@@ -2,12 +2,23 @@
 # -*- coding: utf-8 -*-
 import logging
 from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 
 from app.domain.agents.qa_generator import QAGenerator
+from app.core.concurrency import get_concurrency_config
 
 logger = logging.getLogger(__name__)
 
 
+def _generate_missing_qa(qa_generator: QAGenerator, state: Dict[str, Any], subchapter_title: str) -> Dict[str, Any]:
+    """在独立的状态副本上为单个子章节生成 QA；副本自带输出字典，并发任务之间不共享可变状态"""
+    qa_state = state.copy()
+    qa_state["current_subchapter"] = subchapter_title
+    qa_state["qa_content"] = {}
+    qa_state["qa_metadata"] = {}
+    return qa_generator.execute(qa_state)
+
+
 def qa_node(state: Dict[str, Any]) -> Dict[str, Any]:
     try:
         if state.get("error"):
@@ -26,35 +37,40 @@ def qa_node(state: Dict[str, Any]) -> Dict[str, Any]:
         if missing_qa:
             logger.info(f"发现 {len(missing_qa)} 个子章节需要补充 QA")
             qa_generator = QAGenerator()
-            for subchapter_title in missing_qa:
-                try:
-                    qa_state = state.copy()
-                    qa_state["current_subchapter"] = subchapter_title
-                    qa_result_state = qa_generator.execute(qa_state)
-                    sub_qa_results = qa_result_state.get("qa_results", {})
-                    if sub_qa_results and subchapter_title in sub_qa_results:
-                        qa_entry = sub_qa_results[subchapter_title]
-                        text = qa_entry.get("qa_content") or qa_entry.get("content") or ""
-                        meta = qa_entry.get("qa_metadata") or qa_entry.get("meta") or {}
-                        if text:
-                            qa_content[subchapter_title] = text
-                        if meta:
-                            qa_metadata[subchapter_title] = meta
-                        qa_results[subchapter_title] = qa_entry
-                    else:
-                        text_map = qa_result_state.get("qa_content", {}) or {}
-                        meta_map = qa_result_state.get("qa_metadata", {}) or {}
-                        if subchapter_title in text_map:
-                            qa_content[subchapter_title] = text_map[subchapter_title]
-                            qa_results[subchapter_title] = {
-                                "qa_content": text_map[subchapter_title],
-                                "qa_metadata": meta_map.get(subchapter_title, {}),
-                            }
-                        if subchapter_title in meta_map:
-                            qa_metadata[subchapter_title] = meta_map[subchapter_title]
-                    logger.info(f"为子章节 '{subchapter_title}' 补充生成 QA")
-                except Exception as e:
-                    logger.error(f"为子章节 '{subchapter_title}' 生成 QA 失败: {e}")
+            max_workers = get_concurrency_config()["qa_generator"]["max_workers"]
+            # 各子章节的补充生成互不依赖，并发提交；结果在当前线程中按提交顺序合并，输出字典的顺序与子章节顺序一致
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing_qa)))) as executor:
+                future_to_title = {
+                    executor.submit(_generate_missing_qa, qa_generator, state, subchapter_title): subchapter_title
+                    for subchapter_title in missing_qa
+                }
+                for future, subchapter_title in future_to_title.items():
+                    try:
+                        qa_result_state = future.result()
+                        sub_qa_results = qa_result_state.get("qa_results", {})
+                        if sub_qa_results and subchapter_title in sub_qa_results:
+                            qa_entry = sub_qa_results[subchapter_title]
+                            text = qa_entry.get("qa_content") or qa_entry.get("content") or ""
+                            meta = qa_entry.get("qa_metadata") or qa_entry.get("meta") or {}
+                            if text:
+                                qa_content[subchapter_title] = text
+                            if meta:
+                                qa_metadata[subchapter_title] = meta
+                            qa_results[subchapter_title] = qa_entry
+                        else:
+                            text_map = qa_result_state.get("qa_content", {}) or {}
+                            meta_map = qa_result_state.get("qa_metadata", {}) or {}
+                            if subchapter_title in text_map:
+                                qa_content[subchapter_title] = text_map[subchapter_title]
+                                qa_results[subchapter_title] = {
+                                    "qa_content": text_map[subchapter_title],
+                                    "qa_metadata": meta_map.get(subchapter_title, {}),
+                                }
+                            if subchapter_title in meta_map:
+                                qa_metadata[subchapter_title] = meta_map[subchapter_title]
+                        logger.info(f"为子章节 '{subchapter_title}' 补充生成 QA")
+                    except Exception as e:
+                        logger.error(f"为子章节 '{subchapter_title}' 生成 QA 失败: {e}")
             result_state = state.copy()
             result_state["qa_results"] = qa_results
             result_state["qa_content"] = qa_content
@@ -7,8 +7,10 @@ Neo4j 客户端（基础设施层）
 
 from __future__ import annotations
 
+import atexit
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 try:
     from neo4j import GraphDatabase, Driver
@@ -22,15 +24,59 @@ except Exception:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+# 进程内共享的客户端（各自持有一个 Bolt 连接池），键为 (uri, user, database)
+_DRIVER_REGISTRY: Dict[Tuple[Optional[str], Optional[str], Optional[str]], "Neo4jClient"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+class QueryResult(NamedTuple):
+    """execute_query 的结果；records 为 neo4j.Record 列表，与 neo4j 5 的 EagerResult.records 一致"""
+    records: List[Any]
+
+
+# 驱动默认参数，可由 Neo4jClient(**driver_options) 覆盖
+_DEFAULT_DRIVER_OPTIONS: Dict[str, Any] = {
+    "max_connection_lifetime": 3600,
+    "max_connection_pool_size": 50,
+    "connection_acquisition_timeout": 60,
+    "user_agent": "sopilot-kg/1.0",
+    # 服务端只回传 WARNING 及以上的通知，减少结果摘要中的冗余载荷
+    "notifications_min_severity": "WARNING",
+}
+
+# URI 协议已隐含加密配置时，驱动不允许再传 encrypted
+_SECURE_URI_SCHEMES = ("+s://", "+ssc://")
+
+
+def driver_options_from_settings(neo4j_settings: Any) -> Dict[str, Any]:
+    """把 settings.neo4j 中的连接池/超时/加密配置转换为 GraphDatabase.driver 参数"""
+    options: Dict[str, Any] = {
+        "max_connection_pool_size": neo4j_settings.pool_size,
+        "connection_acquisition_timeout": neo4j_settings.acq_timeout,
+        "max_transaction_retry_time": neo4j_settings.retry_time,
+    }
+    if neo4j_settings.liveness_timeout is not None:
+        options["liveness_check_timeout"] = neo4j_settings.liveness_timeout
+    uri = neo4j_settings.uri or ""
+    if neo4j_settings.tls is not None and not any(scheme in uri for scheme in _SECURE_URI_SCHEMES):
+        options["encrypted"] = neo4j_settings.tls
+    return options
+
 
 class Neo4jClient:
-    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
+    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j", **driver_options: Any):
+        """
+        Args:
+            driver_options: 透传给 GraphDatabase.driver 的参数（如 max_connection_pool_size、
+                connection_acquisition_timeout、max_transaction_retry_time），覆盖默认值
+        """
         if GraphDatabase is None:
             raise ImportError("neo4j 包未安装。请运行: pip install neo4j")
         self.uri = uri
         self.user = user
         self.password = password
         self.database = database
+        self.driver_options = {**_DEFAULT_DRIVER_OPTIONS, **driver_options}
         self.driver: Optional[Driver] = None
 
     def connect(self) -> bool:
@@ -38,9 +84,7 @@ class Neo4jClient:
             self.driver = GraphDatabase.driver(
                 self.uri,
                 auth=(self.user, self.password),
-                max_connection_lifetime=3600,
-                max_connection_pool_size=50,
-                connection_acquisition_timeout=60,
+                **self.driver_options,
             )
             with self.driver.session(database=self.database) as session:
                 _ = session.run("RETURN 1 as test").single()["test"]
@@ -52,6 +96,7 @@ class Neo4jClient:
     def close(self) -> None:
         if self.driver:
             self.driver.close()
+            self.driver = None
 
     def merge_node(self, node: Dict[str, Any]) -> bool:
         if not self.driver:
@@ -64,10 +109,12 @@ class Neo4jClient:
                     "subchapter": ":SubchapterNode",
                     "concept": ":ConceptNode",
                 }.get(str(node_type).lower(), ":Node")
+                # 与 KG 存储一致地维护名称/别名的小写镜像，名称搜索依赖它们
                 cypher = f"""
                 MERGE (n{labels} {{id: $id}})
                 SET n += $properties
                 SET n.updated_at = datetime()
+                SET n.name_lc = toLower(n.name), n.aliases_lc = [a IN coalesce(n.aliases, []) | toLower(a)]
                 RETURN n.id as node_id
                 """
                 props = dict(node)
@@ -223,6 +270,89 @@ class Neo4jClient:
             logger.error(f"执行 Cypher 失败: {e}")
             return []
 
+    def execute_cypher_single(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        执行只返回一行的 Cypher（计数、单条 MERGE 等），直接返回该行的字典；无结果或失败时返回 None。
+
+        与 execute_cypher 相比不再为单条记录构造列表，也不会继续拉取多余的记录。
+        """
+        if not self.driver:
+            return None
+        try:
+            with self.driver.session(database=self.database) as session:
+                record = session.run(query, params or {}).single()
+                return record.data() if record is not None else None
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"执行 Cypher 失败: {e}")
+            return None
+
+    def execute_cypher_many(self, statements: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+        """
+        在同一个会话中依次以自动提交方式执行多条 Cypher，返回每条语句的记录字典列表。
+
+        适合 DDL、统计等无需同一事务的连续语句：只借出一次连接，省去逐条建会话的开销。
+        单条语句失败时记录日志并返回空列表，不影响后续语句。
+        """
+        results: List[List[Dict[str, Any]]] = []
+        if self.driver and statements:
+            try:
+                with self.driver.session(database=self.database) as session:
+                    for query, params in statements:
+                        try:
+                            results.append(session.run(query, params or {}).data() or [])
+                        except Exception as e:  # noqa: BLE001
+                            logger.error(f"执行 Cypher 失败: {e}")
+                            results.append([])
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"执行 Cypher 失败: {e}")
+        results.extend([] for _ in range(len(statements) - len(results)))
+        return results
+
+    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None,
+                      database: Optional[str] = None) -> QueryResult:
+        """
+        执行读查询并返回原始记录（保留 Node/Relationship 对象，供服务层解析标签与端点）
+
+        会话显式指定数据库（默认使用客户端配置的数据库），驱动无需先向 system 库查询路由；
+        未连接或查询失败时抛出异常，由调用方决定如何降级。
+        """
+        if not self.driver:
+            raise RuntimeError("Neo4j 驱动未连接")
+        with self.driver.session(database=database or self.database) as session:
+            return QueryResult(list(session.run(query, params or {})))
+
+    def execute_query_stream(self, query: str, params: Optional[Dict[str, Any]] = None,
+                             database: Optional[str] = None) -> Iterator[Any]:
+        """
+        逐条产出查询记录而不整体物化，处理完的记录即可释放
+
+        会话在生成器耗尽或被关闭时结束，调用方应完整消费或显式 close()；
+        未连接时在首次迭代时抛出异常。
+        """
+        if not self.driver:
+            raise RuntimeError("Neo4j 驱动未连接")
+        with self.driver.session(database=database or self.database) as session:
+            yield from session.run(query, params or {})
+
+    def execute_write_batch(self, statements: List[Tuple[str, Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """
+        在同一个写事务中依次执行多条 Cypher（通常为 UNWIND 批量写入），返回每条语句的记录列表。
+
+        任一语句失败时整个事务回滚，返回空列表。
+        """
+        if not self.driver or not statements:
+            return []
+
+        def _work(tx) -> List[List[Dict[str, Any]]]:
+            return [tx.run(query, params).data() for query, params in statements]
+
+        try:
+            with self.driver.session(database=self.database) as session:
+                return session.execute_write(_work)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"批量写入 Cypher 失败: {e}")
+            return []
+
 
 def create_neo4j_client(config: Dict[str, Any]) -> Optional[Neo4jClient]:
     neo = (config or {}).get("neo4j", {})
@@ -237,3 +367,34 @@ def create_neo4j_client(config: Dict[str, Any]) -> Optional[Neo4jClient]:
     return client if client.connect() else None
 
 
+def get_shared_client(uri: str, user: str, password: str, database: str = "neo4j", **driver_options: Any) -> Optional[Neo4jClient]:
+    """
+    获取按 (uri, user, database) 共享的已连接客户端
+    
+    驱动创建需要握手、获取路由表并建立连接池，同一进程内的服务/存储实例复用同一个。
+    driver_options 仅在首次创建时生效；连接失败时关闭已创建的驱动并返回 None（不登记，下次调用时重试）。
+    """
+    key = (uri, user, database)
+    with _REGISTRY_LOCK:
+        client = _DRIVER_REGISTRY.get(key)
+        if client is None:
+            client = Neo4jClient(uri=uri, user=user, password=password, database=database, **driver_options)
+            if not client.connect():
+                client.close()
+                return None
+            _DRIVER_REGISTRY[key] = client
+        return client
+
+
+def _close_all_drivers() -> None:
+    with _REGISTRY_LOCK:
+        clients = list(_DRIVER_REGISTRY.values())
+        _DRIVER_REGISTRY.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"关闭 Neo4j 驱动失败: {e}")
+
+
+atexit.register(_close_all_drivers)
@@ -21,6 +21,15 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    # KG 请求级读缓存：同一请求内重复的子图/详情查询只访问一次 Neo4j
+    from .domain.kg.cache import kg_request_scope
+
+    @app.middleware("http")
+    async def _kg_request_scope(request, call_next):
+        with kg_request_scope():
+            return await call_next(request)
+
     app.include_router(api_router)
     register_lifecycle(app)
     # 启动日志诊断（简要）
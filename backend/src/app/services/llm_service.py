@@ -10,6 +10,7 @@ from typing import Dict, Any, Optional, Union
 from dataclasses import dataclass
 
 from .prompt_service import prompt_service
+from ..core.llm_cache import PROMPT_VERSION, get_llm_cache, request_hash
 from ..infrastructure.llm.router import llm_router
 from ..infrastructure.llm.router.types import LLMRequest, LLMResponse, LLMException
 
@@ -96,10 +97,8 @@ class LLMService:
                 "prompt_id": rendered_prompt.binding.prompt_file
             })
             
-            # Execute with retry
-            response = self.llm_router.generate_with_retry(
-                request, max_retries=max_retries
-            )
+            # Execute with retry (served from the response cache when enabled)
+            response = self._generate(request, max_retries)
             
             # Log successful call
             logger.info(
@@ -167,9 +166,7 @@ class LLMService:
                 "prompt_id": rendered_prompt.binding.prompt_file
             })
             
-            response = self.llm_router.generate_with_retry(
-                request, max_retries=kwargs.get('max_retries', 3)
-            )
+            response = self._generate(request, kwargs.get('max_retries', 3))
             
             return LLMCallResult(
                 content=response.content,
@@ -188,6 +185,47 @@ class LLMService:
             )
             raise
     
+    def _generate(self, request: LLMRequest, max_retries: int) -> LLMResponse:
+        """
+        Execute a request with retry, consulting the persistent response cache first.
+        
+        The cache key covers everything that shapes the output (provider, model,
+        messages and sampling parameters) but not timeouts or tags.
+        """
+        cache = get_llm_cache()
+        if cache is None:
+            return self.llm_router.generate_with_retry(request, max_retries=max_retries)
+        
+        input_hash = request_hash({
+            "provider": request.provider,
+            "model": request.model,
+            "messages": request.messages,
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+            "top_p": request.top_p,
+            "frequency_penalty": request.frequency_penalty,
+            "presence_penalty": request.presence_penalty,
+            "stop": request.stop,
+        })
+        cached = cache.check(input_hash, PROMPT_VERSION)
+        # Entries with blank content (possibly saved by older versions) count as misses
+        if cached is not None and cached.strip():
+            logger.info(f"LLM cache hit: {request.provider}:{request.model} ({input_hash[:12]})")
+            return LLMResponse(
+                content=cached,
+                model=request.model,
+                provider=request.provider,
+                usage={},
+                latency_ms=0,
+                metadata={"cached": True}
+            )
+        
+        response = self.llm_router.generate_with_retry(request, max_retries=max_retries)
+        # Never persist empty/whitespace-only output, or a transient failure would be replayed on every run
+        if response.content and response.content.strip():
+            cache.save(input_hash, PROMPT_VERSION, response.content)
+        return response
+    
     def validate_template(self, agent_name: str, variables: Dict[str, Any],
                          locale: str = "zh") -> Dict[str, Any]:
         """
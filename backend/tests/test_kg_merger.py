@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""KGMerger.merge_incremental 的索引复用与失效"""
+
+from app.domain.kg.merger import KGMerger
+from app.domain.kg.schemas import KGDict, KGEdge, KGNode
+
+
+def _node(node_id, name=None):
+    return KGNode(id=node_id, name=name or node_id, type="Concept", scope="book")
+
+
+def _edge(rid, source, target):
+    return KGEdge(rid=rid, type="related_to", source=source, target=target, scope="book")
+
+
+def _names(kg):
+    return sorted(node.name for node in kg.nodes)
+
+
+def test_merge_incremental_reuses_untouched_book():
+    merger = KGMerger()
+    book = merger.merge_book_kg([("s1", KGDict(nodes=[_node("a")], edges=[]))], {"book_id": "book"})
+    merged = merger.merge_incremental(book, KGDict(nodes=[_node("b")], edges=[]), {"book_id": "book"})
+    assert _names(merged) == ["a", "b"]
+
+
+def test_merge_incremental_rebuilds_after_in_place_edit():
+    merger = KGMerger()
+    book = merger.merge_book_kg(
+        [("s1", KGDict(nodes=[_node("a"), _node("b")], edges=[_edge("e1", "a", "b")]))], {"book_id": "book"})
+
+    # 调用方原地删除节点/边后，不能再复用内部索引把它们带回来
+    book.nodes.pop()
+    book.edges.clear()
+    merged = merger.merge_incremental(book, KGDict(nodes=[_node("c")], edges=[]), {"book_id": "book"})
+    assert _names(merged) == ["a", "c"]
+    assert merged.edges == []
+
+    # 替换列表对象同样触发重建
+    merged.nodes = [_node("x")]
+    merged = merger.merge_incremental(merged, KGDict(nodes=[_node("y")], edges=[]), {"book_id": "book"})
+    assert _names(merged) == ["x", "y"]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""search_nodes 的全文索引/CONTAINS 回退策略（同步与异步服务一致）"""
+
+import asyncio
+
+import pytest
+
+from app.domain.kg.service import AsyncNeo4jKGService, Neo4jKGService
+
+_MISSING_INDEX = RuntimeError("There is no such fulltext schema index: node_name_fts")
+
+
+class _FakeClient:
+    database = "neo4j"
+    driver = object()
+
+
+def _kind(query):
+    return "fulltext" if "db.index.fulltext" in query else "contains"
+
+
+class _SyncService(Neo4jKGService):
+    def __init__(self, error=None):
+        super().__init__(_FakeClient(), cache_size=0)
+        self.error = error
+        self.calls = []
+
+    def _stream(self, query, params=None):
+        self.calls.append(_kind(query))
+        if self.error is not None and _kind(query) == "fulltext":
+            raise self.error
+        return []
+
+
+class _AsyncService(AsyncNeo4jKGService):
+    def __init__(self, error=None):
+        super().__init__(driver=object(), database="neo4j", cache_size=0)
+        self.error = error
+        self.calls = []
+
+    async def _run(self, query, params=None):
+        self.calls.append(_kind(query))
+        if self.error is not None and _kind(query) == "fulltext":
+            raise self.error
+        return []
+
+
+def _search(service, query):
+    result = service.search_nodes(query)
+    return asyncio.run(result) if asyncio.iscoroutine(result) else result
+
+
+@pytest.mark.parametrize("service_cls", [_SyncService, _AsyncService])
+def test_empty_fulltext_result_does_not_scan(service_cls):
+    service = service_cls()
+    assert _search(service, "abc") == []
+    assert service.calls == ["fulltext"]
+
+
+@pytest.mark.parametrize("service_cls", [_SyncService, _AsyncService])
+def test_missing_index_falls_back_to_contains_until_retry(service_cls):
+    service = service_cls(_MISSING_INDEX)
+    _search(service, "abc")
+    _search(service, "abd")
+    assert service.calls == ["fulltext", "contains", "contains"]
+
+    # 冷却结束后重新尝试全文索引
+    service.error = None
+    service._fulltext_retry_at = 0.0
+    _search(service, "abe")
+    assert service.calls[-1] == "fulltext"
+
+
+@pytest.mark.parametrize("service_cls", [_SyncService, _AsyncService])
+def test_transient_error_keeps_fulltext_enabled(service_cls):
+    service = service_cls(ConnectionResetError("connection reset"))
+    assert _search(service, "abc") == []
+    service.error = None
+    _search(service, "abd")
+    assert service.calls == ["fulltext", "fulltext"]
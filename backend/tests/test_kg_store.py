@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Neo4jKGStore.store_kg 写入路径测试：使用记录语句的假客户端，校验生成的 Cypher、参数与计数"""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.kg import store as kg_store
+from app.domain.kg.schemas import KGDict, KGEdge, KGNode
+from app.domain.kg.cypher import APOC_PROBE_QUERIES, KG_SCHEMA_STATEMENTS
+from app.domain.kg.store import Neo4jKGStore
+
+
+class FakeNeo4jClient:
+    """
+    模拟 Neo4jClient 的写入接口
+
+    execute_write_batch 按行的 id/rid 记住已写入的实体，返回与真实语句相同形状的 written/created 计数。
+    """
+
+    def __init__(self, apoc=(), uri="bolt://fake"):
+        self.uri = uri
+        self.database = "neo4j"
+        self.driver = object()
+        self.apoc = set(apoc)
+        self.lock = threading.Lock()
+        self.existing = set()
+        # 每次 execute_write_batch 调用收到的 (原始参数对象, [(query, params), ...])
+        self.write_calls = []
+        self.single_calls = []
+        self.ddl = []
+        self.fail_queries = set()
+        self.write_hook = None
+
+    def execute_cypher(self, query, params=None):
+        if query in APOC_PROBE_QUERIES:
+            return [{"name": params["name"]}] if params["name"] in self.apoc else []
+        self.ddl.append(query)
+        return []
+
+    def execute_cypher_many(self, statements):
+        return [self.execute_cypher(query, params) for query, params in statements]
+
+    def execute_cypher_single(self, query, params=None):
+        self.single_calls.append((query, params))
+        return {"committedOperations": len(params["rows"]), "failedOperations": 0,
+                "failedBatches": 0, "errorMessages": {}}
+
+    def execute_write_batch(self, statements):
+        if self.write_hook is not None:
+            self.write_hook(statements)
+        executed = list(statements)
+        with self.lock:
+            self.write_calls.append((statements, executed))
+            if any(query in self.fail_queries for query, _ in executed):
+                return []
+            results = []
+            for _, params in executed:
+                keys = [row.get("rid") or row["id"] for row in params["rows"]]
+                created = sum(1 for key in keys if key not in self.existing)
+                self.existing.update(keys)
+                results.append([{"written": len(keys), "created": created}])
+            return results
+
+    def statements(self):
+        return [statement for _, executed in self.write_calls for statement in executed]
+
+
+def _node(node_id, node_type="Concept", **kwargs):
+    return KGNode(id=node_id, name=node_id, type=node_type, scope="book", **kwargs)
+
+
+def _edge(rid, source, target, edge_type="related_to", **kwargs):
+    return KGEdge(rid=rid, type=edge_type, source=source, target=target, scope="book", **kwargs)
+
+
+def _kg(nodes, edges=()):
+    return KGDict(nodes=list(nodes), edges=list(edges))
+
+
+def test_store_kg_groups_by_label_and_counts_created_and_updated():
+    client = FakeNeo4jClient()
+    store = Neo4jKGStore(client)
+    kg = _kg([_node("c1"), _node("c2"), _node("ch1", "chapter")],
+             [_edge("e1", "c1", "c2"), _edge("e2", "ch1", "c1", "contains")])
+
+    first = store.store_kg(kg, {})
+    assert first == {"nodes_created": 3, "nodes_updated": 0, "edges_created": 2, "edges_updated": 0,
+                     "success": True}
+
+    node_queries = {query for query, _ in client.statements() if "MERGE (n:" in query}
+    assert len(node_queries) == 2
+    assert any("MERGE (n:Concept {id: row.id})" in query for query in node_queries)
+    assert any("MERGE (n:Chapter {id: row.id})" in query for query in node_queries)
+
+    second = store.store_kg(kg, {})
+    assert second == {"nodes_created": 0, "nodes_updated": 3, "edges_created": 0, "edges_updated": 2,
+                      "success": True}
+
+
+def test_edges_use_index_hints_only_for_known_endpoint_labels():
+    client = FakeNeo4jClient()
+    store = Neo4jKGStore(client)
+    store.store_kg(_kg([_node("c1"), _node("c2")],
+                       [_edge("e1", "c1", "c2"), _edge("e2", "outside", "c1")]), {})
+
+    edge_queries = [query for query, _ in client.statements() if "RELATED_TO" in query]
+    inside = next(query for query in edge_queries if "MATCH (source:Concept" in query)
+    assert "MATCH (source:Concept {id: row.source_id}) USING INDEX source:Concept(id)" in inside
+    assert "MATCH (target:Concept {id: row.target_id}) USING INDEX target:Concept(id)" in inside
+
+    outside = next(query for query in edge_queries if "MATCH (source {id: row.source_id})" in query)
+    assert "USING INDEX source" not in outside
+    assert "USING INDEX target:Concept(id)" in outside
+    # 新出现的关系类型补建 rid/scope 索引
+    assert any("rel_related_to_rid" in query for query in client.ddl)
+
+
+def test_nonstandard_labels_without_apoc_are_backquoted():
+    client = FakeNeo4jClient()
+    Neo4jKGStore(client).store_kg(_kg([_node("t1", "Theorem")]), {})
+
+    (query, params), = client.statements()
+    assert "MERGE (n:`Theorem` {id: row.id})" in query
+    assert "label" not in params["rows"][0]
+
+
+def test_nonstandard_labels_and_rel_types_use_apoc_merge():
+    client = FakeNeo4jClient(apoc=kg_store._APOC_MERGE_PROCEDURES)
+    stats = Neo4jKGStore(client).store_kg(
+        _kg([_node("t1", "Theorem"), _node("c1")], [_edge("e1", "t1", "c1", "proves")]), {})
+    assert stats["success"] and stats["nodes_created"] == 2 and stats["edges_created"] == 1
+
+    statements = client.statements()
+    apoc_nodes = [params for query, params in statements if query == kg_store._APOC_STORE_NODES_QUERY]
+    assert [row["label"] for params in apoc_nodes for row in params["rows"]] == ["Theorem"]
+    # 标准标签仍使用带标签的 MERGE
+    assert any("MERGE (n:Concept {id: row.id})" in query for query, _ in statements)
+
+    (edge_query, edge_params), = [(q, p) for q, p in statements if "apoc.merge.relationship" in q]
+    assert "MATCH (source:`Theorem` {id: row.source_id})" in edge_query
+    assert "USING INDEX target:Concept(id)" in edge_query
+    assert edge_params["rows"][0]["rel_type"] == "PROVES"
+
+
+def test_timestamps_are_sent_as_epoch_millis():
+    client = FakeNeo4jClient()
+    aware = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    naive = datetime(2024, 1, 1)
+    Neo4jKGStore(client).store_kg(
+        _kg([_node("c1", created_at=aware, updated_at=naive), _node("c2")],
+            [_edge("e1", "c1", "c2", created_at=aware)]), {})
+
+    (node_query, node_params), (edge_query, edge_params) = client.statements()
+    assert "datetime({epochMillis: row.created_at})" in node_query
+    rows = {row["id"]: row for row in node_params["rows"]}
+    assert rows["c1"]["created_at"] == rows["c1"]["updated_at"] == 1704067200000
+    assert rows["c2"]["created_at"] is None and rows["c2"]["updated_at"] is None
+    assert edge_params["rows"][0]["created_at"] == edge_params["rows"][0]["updated_at"] == 1704067200000
+
+
+def test_groups_are_written_concurrently_and_edges_after_nodes():
+    client = FakeNeo4jClient()
+    node_barrier = threading.Barrier(2, timeout=5)
+    order = []
+
+    def hook(statements):
+        kind = "edges" if "source" in statements.query else "nodes"
+        order.append(kind)
+        if kind == "nodes":
+            # 两个节点分组必须同时在写，串行执行时会在此超时
+            node_barrier.wait()
+
+    client.write_hook = hook
+    stats = Neo4jKGStore(client, max_write_workers=4).store_kg(
+        _kg([_node("c1"), _node("ch1", "chapter")], [_edge("e1", "ch1", "c1", "contains")]), {})
+
+    assert stats["success"] and stats["nodes_created"] == 2 and stats["edges_created"] == 1
+    assert order == ["nodes", "nodes", "edges"]
+
+
+def test_batches_are_built_lazily_and_can_be_replayed():
+    client = FakeNeo4jClient()
+    Neo4jKGStore(client, batch_size=2).store_kg(_kg([_node(f"c{i}") for i in range(5)]), {})
+
+    (batches, executed), = client.write_calls
+    assert not isinstance(batches, list)
+    assert len(batches) == 3
+    assert [len(params["rows"]) for _, params in executed] == [2, 2, 1]
+    # 托管事务重试时重新迭代得到相同的语句与参数
+    assert list(batches) == executed
+
+
+def test_failed_group_reports_failure():
+    client = FakeNeo4jClient()
+    store = Neo4jKGStore(client)
+    client.fail_queries.add(store._node_store_query("Chapter"))
+
+    stats = store.store_kg(_kg([_node("c1"), _node("ch1", "chapter")]), {})
+    assert stats["success"] is False
+    assert "nodes" in stats["error"]
+
+
+def test_large_graphs_use_periodic_iterate():
+    client = FakeNeo4jClient(apoc=[kg_store._PERIODIC_ITERATE_PROCEDURE])
+    stats = Neo4jKGStore(client, parallel_threshold=1).store_kg(
+        _kg([_node("c1"), _node("c2")], [_edge("e1", "c1", "c2")]), {})
+
+    assert not client.write_calls
+    assert stats["success"] and stats["nodes_committed"] == 2 and stats["edges_committed"] == 1
+    (node_query, node_params), (edge_query, edge_params) = client.single_calls
+    assert node_query == edge_query == kg_store._PERIODIC_ITERATE_QUERY
+    assert "MERGE (n:Concept {id: row.id})" in node_params["inner"] and node_params["parallel"] is True
+    assert "USING INDEX source:Concept(id)" in edge_params["inner"] and edge_params["parallel"] is False
+
+
+@pytest.mark.parametrize("created", [False, True])
+def test_ensure_indexes_marks_done_only_after_schema_exists(created):
+    client = FakeNeo4jClient(uri=f"bolt://ensure-{created}")
+    names = [name for name, _ in KG_SCHEMA_STATEMENTS]
+
+    def execute_cypher_many(statements):
+        results = []
+        for query, _ in statements:
+            if query.startswith("SHOW"):
+                ran_ddl = any(ddl.startswith("CREATE") for ddl in client.ddl)
+                results.append([{"name": name} for name in names] if created and ran_ddl else [])
+            else:
+                results.append(client.execute_cypher(query))
+        return results
+
+    client.execute_cypher_many = execute_cypher_many
+    Neo4jKGStore(client).ensure_indexes()
+
+    target = (client.uri, client.database)
+    assert (target in kg_store._indexed_databases) is created
+    assert len([query for query in client.ddl if query.startswith("CREATE")]) == len(names)
+
+
+def test_async_service_reuses_store_schema_routine():
+    import asyncio
+
+    from app.domain.kg.service import AsyncNeo4jKGService
+
+    names = [name for name, _ in KG_SCHEMA_STATEMENTS]
+
+    class _Service(AsyncNeo4jKGService):
+        def __init__(self):
+            super().__init__(driver=object(), database="neo4j", cache_size=0)
+            self.ddl = []
+
+        async def _run(self, query, params=None):
+            if query.startswith("SHOW"):
+                return [{"name": name} for name in names] if self.ddl else []
+            if query.startswith("CREATE"):
+                self.ddl.append(query)
+            return []
+
+    service = _Service()
+
+    async def run_twice():
+        await service.ensure_indexes()
+        await service.ensure_indexes()
+
+    asyncio.run(run_twice())
+    # 与同步存储相同：只执行缺失项，校验通过后登记，同一目标不再重复执行
+    assert len(service.ddl) == len(names)
+    assert (f"async-driver:{id(service.driver)}", "neo4j") in kg_store._indexed_databases
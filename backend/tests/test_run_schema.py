@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""RunCreate.workflow_params 的判别校验与导出"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.domain.schemas.run import QuizMakerParams, RunCreate, TextbookParams
+
+
+def test_known_workflows_validate_against_their_models():
+    run = RunCreate(topic="t", workflow_id="quiz_maker", workflow_params={"question_count": 5})
+    assert isinstance(run.workflow_params, QuizMakerParams)
+    assert run.model_dump()["workflow_params"] == {"question_count": 5}
+
+    run = RunCreate(topic="t", workflow_params={"chapter_count": 3})
+    assert isinstance(run.workflow_params, TextbookParams)
+    assert run.model_dump()["workflow_params"] == {"chapter_count": 3}
+
+
+def test_known_workflow_rejects_unknown_fields():
+    with pytest.raises(ValidationError):
+        RunCreate(topic="t", workflow_id="textbook", workflow_params={"unknown": 1})
+
+
+def test_other_workflows_pass_params_through():
+    run = RunCreate(topic="t", workflow_id="custom_flow", workflow_params={"foo": 1, "bar": [1, 2]})
+    assert run.workflow_params == {"foo": 1, "bar": [1, 2], "workflow_type": "custom_flow"}
+    assert run.model_dump()["workflow_params"] == {"foo": 1, "bar": [1, 2]}
+    assert '"workflow_params":{"foo":1,"bar":[1,2]}' in run.model_dump_json()
+
+
+def test_missing_params_stay_none():
+    assert RunCreate(topic="t").model_dump()["workflow_params"] is None